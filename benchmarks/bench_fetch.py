@@ -0,0 +1,58 @@
+"""
+bench_fetch.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file benchmarks the whole fetch path (`get_playlist` and `search`:
+transport, parsing and sorting) against the fake iTunes, so it runs on any
+platform.
+
+Run it with `python -m benchmarks.bench_fetch [--latency S] [size ...]`.
+"""
+
+import argparse
+import time
+
+from itunes import itunes, transport
+from itunes.fake import FakeITunes
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+def timed(func, *args, **kwargs):
+    """
+    Call `func` and return how long (in seconds) it took.
+    """
+
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_fetch")
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    print("{0:>8} {1:>14} {2:>12} {3:>16}".format("tracks", "playlist (s)",
+        "search (s)", "all fields (s)"))
+
+    for size in args.sizes:
+        transport.set_transport(FakeITunes(size, latency=args.latency,
+            jitter=args.jitter))
+
+        # warm up the fake's formatting cache
+        itunes.get_playlist("Music", fields=None)
+
+        playlist = timed(itunes.get_playlist, "Music", key="artist")
+        search = timed(itunes.search, "love", keys=["artist", "album"])
+        full = timed(itunes.get_playlist, "Music", key="artist", fields=None)
+
+        print("{0:>8} {1:>14.4f} {2:>12.4f} {3:>16.4f}".format(size, playlist,
+            search, full))
+
+    transport.set_transport(None)
+
+if __name__ == '__main__':
+    main()
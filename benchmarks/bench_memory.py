@@ -0,0 +1,62 @@
+"""
+bench_memory.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file benchmarks the memory held by a parsed library: every property of
+every track, as dictionaries (what the parser built before tracks.py) and as
+`Track` records, for growing library sizes. Only the memory that stays
+allocated after parsing is counted.
+
+Run it with `python -m benchmarks.bench_memory [size ...]`.
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from itunes.fake import make_tracks, format_response
+from itunes.parser import parse_literal, parse_response
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+def retained(func, arg):
+    """
+    Return the number of bytes still allocated by what `func(arg)` returns.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    result = func(arg)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+
+    tracemalloc.stop()
+    del result
+
+    return size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_memory")
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    args = parser.parse_args(argv)
+
+    print("{0:>8} {1:>11} {2:>11} {3:>12} {4:>12} {5:>8}".format("tracks",
+        "dicts (MB)", "tracks (MB)", "dict (B/tr)", "track (B/tr)",
+        "saving"))
+
+    for size in args.sizes:
+        response = format_response(make_tracks(size))
+
+        as_dicts = retained(parse_literal, response)
+        as_tracks = retained(parse_response, response)
+
+        print("{0:>8} {1:>11.1f} {2:>11.1f} {3:>12.0f} {4:>12.0f} {5:>7.1f}x"
+                .format(size, as_dicts / 2**20, as_tracks / 2**20, as_dicts /
+                    size, as_tracks / size, as_dicts / as_tracks))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+bench_parallel.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file benchmarks parsing whole-library responses in several processes
+(`parser.parse_parallel`) against parsing them in one, for growing numbers of
+workers. The pool is started before timing, as it is when the TUI has parsed
+its first big response.
+
+Run it with `python -m benchmarks.bench_parallel [size ...] [-w workers ...]`.
+"""
+
+import argparse
+import os
+import time
+
+from itunes.fake import make_tracks, format_value
+from itunes.parser import parse_parallel, split_records
+
+DEFAULT_SIZES = [50000, 200000]
+
+"""Tracks are made (and formatted) this many at a time, to bound memory."""
+BATCH_SIZE = 10000
+
+def make_response(size):
+    """
+    Return the `-ss` response to fetching every property of `size` tracks.
+    """
+
+    parts = []
+
+    for first in range(0, size, BATCH_SIZE):
+        tracks = make_tracks(min(BATCH_SIZE, size - first), seed=first)
+        parts.append(format_value(tracks)[1:-1])
+
+    return "{" + ", ".join(parts) + "}\n"
+
+def best_time(func, repeat):
+    """
+    Return the best wall clock time (in seconds) of `repeat` calls to `func`.
+    """
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_parallel")
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=sorted(
+        {2 ** i for i in range(cpus.bit_length())} | {cpus}))
+    parser.add_argument("-r", "--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print("{0} CPUs".format(cpus))
+    print("{0:>8} {1:>11} {2:>8} {3:>10} {4:>9} {5:>8}".format("tracks", "MB",
+        "workers", "split (s)", "parse (s)", "speedup"))
+
+    warm_up = make_response(100)
+
+    for size in args.sizes:
+        response = make_response(size)
+        serial = None
+
+        for workers in args.workers:
+            parse_parallel(warm_up, workers)
+
+            split = best_time(lambda: split_records(response, workers), 1)
+            parse = best_time(lambda: parse_parallel(response, workers),
+                    args.repeat)
+
+            if serial is None:
+                serial = parse
+
+            print("{0:>8} {1:>11.1f} {2:>8} {3:>10.3f} {4:>9.3f} {5:>7.2f}x"
+                    .format(size, len(response) / 2**20, workers, split, parse,
+                        serial / parse))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+bench_parse.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file benchmarks the `-ss` response parser against the original
+regex-based implementation and against decoding the JXA backend's JSON, for
+growing library sizes. The current parser decodes values when they are read
+(see tracks.py); `eager` decodes every value while parsing, as it used to.
+
+Run it with `python -m benchmarks.bench_parse [size ...]`.
+"""
+
+import sys
+import time
+
+from itunes.parser import parse_literal, parse_response
+from itunes.jxa import parse_json_response
+from . import legacy
+from itunes.fake import make_tracks, format_response, format_json_response
+
+DEFAULT_SIZES = [100, 1000, 5000, 20000]
+
+def best_time(func, arg, repeat=3):
+    """
+    Return the best wall clock time (in seconds) of `repeat` calls to `func`.
+    """
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main(argv=None):
+    sizes = [int(arg) for arg in (argv or sys.argv[1:])] or DEFAULT_SIZES
+
+    print("{0:>8} {1:>10} {2:>12} {3:>11} {4:>12} {5:>8} {6:>10}".format(
+        "tracks", "bytes", "legacy (s)", "eager (s)", "current (s)",
+        "speedup", "json (s)"))
+
+    for size in sizes:
+        tracks = make_tracks(size)
+        response = format_response(tracks)
+
+        old = best_time(legacy.parse_response, response)
+        eager = best_time(parse_literal, response)
+        new = best_time(parse_response, response)
+        from_json = best_time(parse_json_response, format_json_response(tracks))
+
+        print("{0:>8} {1:>10} {2:>12.4f} {3:>11.4f} {4:>12.4f} {5:>7.1f}x "
+            "{6:>10.4f}".format(size, len(response), old, eager, new, old /
+                new, from_json))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_render.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file benchmarks drawing the track list (`tui.TrackListView`): the time
+to first paint of a new list and the time per scroll step, for growing list
+sizes. It draws to the terminal, so run it in one:
+`python -m benchmarks.bench_render [size ...]`.
+"""
+
+import argparse
+import curses
+import statistics
+import time
+
+from itunes.fake import make_tracks
+from tui.tui import TrackListView
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000, 200000]
+
+"""The number of cursor moves timed for every size."""
+STEPS = 200
+
+def measure(stdscr, tracks, sizes):
+    """
+    Time first paint and scrolling for each size, under curses.
+    """
+
+    results = []
+    view = TrackListView(curses.newwin(curses.LINES, curses.COLS - 1, 0, 0))
+
+    for size in sizes:
+        track_list = tracks[:size]
+
+        start = time.perf_counter()
+        view.set_tracks(track_list)
+        paint = time.perf_counter() - start
+
+        steps = []
+        for i in range(1, min(STEPS, size)):
+            start = time.perf_counter()
+            view.move_cursor(i)
+            steps.append(time.perf_counter() - start)
+
+        # jump far away, where nothing has been formatted yet
+        start = time.perf_counter()
+        view.move_cursor(size // 2)
+        jump = time.perf_counter() - start
+
+        results.append((size, paint, statistics.median(steps), jump))
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_render")
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    args = parser.parse_args(argv)
+
+    tracks = make_tracks(max(args.sizes))
+    results = curses.wrapper(measure, tracks, args.sizes)
+
+    print("{0:>8} {1:>16} {2:>12} {3:>10}".format("tracks",
+        "first paint (ms)", "scroll (ms)", "jump (ms)"))
+
+    for size, paint, step, jump in results:
+        print("{0:>8} {1:>16.2f} {2:>12.3f} {3:>10.2f}".format(size,
+            paint * 1000, step * 1000, jump * 1000))
+
+if __name__ == '__main__':
+    main()
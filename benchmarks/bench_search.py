@@ -0,0 +1,79 @@
+"""
+bench_search.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file benchmarks searching the library: the in-process search index
+(itunes/index.py), the SQLite cache (itunes/store.py) and the fake iTunes,
+for growing library sizes.
+
+Run it with `python -m benchmarks.bench_search [size ...]`.
+"""
+
+import argparse
+import statistics
+import time
+
+from itunes import itunes, store, transport
+from itunes.fake import FakeITunes
+from itunes.index import SearchIndex
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+"""Searches run for every size: common, rare, short, multi-word and
+missing words."""
+TERMS = ["love", "the national", "a", "he", "friend away", "just a friend",
+        "zzz"]
+
+def query_time(func, repeat=3):
+    """
+    Return the median time (in milliseconds) `func` takes for one of `TERMS`.
+    """
+
+    times = []
+
+    for term in TERMS:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(term)
+            times.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(times)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_search")
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    args = parser.parse_args(argv)
+
+    print("{0:>8} {1:>10} {2:>11} {3:>11} {4:>12}".format("tracks",
+        "build (s)", "index (ms)", "cache (ms)", "itunes (ms)"))
+
+    for size in args.sizes:
+        fake = FakeITunes(size)
+        transport.set_transport(fake)
+
+        cache = store.LibraryStore(":memory:")
+        store.sync(cache)
+
+        start = time.perf_counter()
+        index = SearchIndex(fake.tracks)
+        build = time.perf_counter() - start
+
+        keys = ["artist", "album"]
+        indexed = query_time(lambda term: itunes.search(term, keys=keys,
+            index=index))
+        cached = query_time(lambda term: itunes.search(term, keys=keys,
+            store=cache), repeat=1)
+        remote = query_time(lambda term: itunes.search(term, keys=keys),
+                repeat=1)
+
+        print("{0:>8} {1:>10.3f} {2:>11.2f} {3:>11.2f} {4:>12.2f}".format(size,
+            build, indexed, cached, remote))
+
+        cache.close()
+
+    transport.set_transport(None)
+
+if __name__ == '__main__':
+    main()
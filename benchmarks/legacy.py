@@ -0,0 +1,144 @@
+"""
+legacy.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file keeps the original regex-based response parser so that the
+benchmarks can compare the current parser against it. It is not used by the
+program itself.
+"""
+
+from datetime import datetime
+import re
+
+def parse_response(response):
+    """
+    Parse the result of an applescript call into a python dictionary.
+
+    Parameters
+    ----------
+    response : str
+        A string containing the unprocessed applescript output.
+
+    Returns
+    -------
+    list
+        A list of dictionaries which contain the information in `response`.
+
+    Raises
+    ------
+    ValueError
+        If a record is malformed.
+    """
+
+    records = []
+
+    response = response.strip()
+
+    # more than one opening brace = list of records
+    if response.startswith("{{") and response.endswith("}}"):
+        response = "[" + response[1:]
+        response = response[:-1] + "]"
+
+    #print("RAW:", response)
+
+    record_regex = re.compile(r'{(?P<record>.*?)}')
+
+    #log_file = open("out.log", "w")
+
+    # go through each record
+    for match in record_regex.finditer(response):
+        record = {}
+        record_str = match.group("record")
+        #print("RECORD_STR:",record_str, "\n")
+
+        # remove escaped quotes from records
+        if '\\"' in record_str:
+            record_str = record_str.replace('\\"', "&quot;")
+
+        # matches commas not in quotes
+        #
+        # works because a comma in quotes can never be followed ONLY by
+        # nonquotes or correctly quoted strings until the end of the line (since
+        # one quote has by necessity already passed if it's in a quote)
+        item_regex = re.compile(r',(?=(?:[^"]|"[^"]*")*$)')
+
+        # go through each key value pair in the record
+        for item in item_regex.split(record_str):
+
+            item = item.strip()
+            #print(repr(item))
+
+            # never a `:` in key, so use that to split
+            colon_pos = item.find(":")
+            if colon_pos != -1:
+                key = item[:colon_pos].strip()
+                value = item[colon_pos + 1:].strip()
+
+            else:
+                raise ValueError("Unable to parse item: {0}".format(item))
+
+            parsed = parse_value(value)
+            record["{0}".format(key)] = parsed
+            #log_file.write(("{!r} -> {!r}\n".format(value, parsed)))
+
+        records.append(record)
+
+    #log_file.close()
+    return records
+
+def parse_value(str_value):
+    """
+    Parse a string (from AppleScript response) into an equivalent Python type.
+
+    This function parses a string into whatever Python type it looks most like.
+    The patters it checks are based on what AppleScript spits out when it
+    returns responses. It currently supports int, float, bool, date, and None.
+
+    Parameters
+    ----------
+    str_value : str
+        A string containing the value to be parsed.
+
+    Returns
+    -------
+    <t>
+        A Python type (int, float, bool, etc) with the same value as
+        `str_value`. If no suitable match is found, `str_value` is returned.
+    """
+
+    # check for None, int, float, bool, and date
+    if (not str_value or str_value == "missing value" or str_value == '""' or
+            str_value == "none"):
+        result = None
+
+    elif str_value.isdigit():
+        result = int(str_value)
+
+    elif ("." in str_value and str_value.strip().count(" ") == 0 and
+            str_value.count(".") == 1 and '"' not in str_value): # might be a float
+        dot_pos = str_value.find(".")
+
+        if (str_value[:dot_pos].isdigit() and str_value[dot_pos +
+                1:].isdigit()):
+            result = float(str_value)
+
+    elif str_value == "true" or str_value == "false":
+        result = True if str_value == "true" else False
+
+    elif str_value.startswith("date"):
+        open_quote = str_value.find('"')
+        close_quote = str_value.rfind('"')
+
+        # make sure there are quotes around the date
+        if open_quote != -1 and close_quote != -1:
+            date_str = str_value[open_quote + 1:close_quote]
+            date_fmt = "%A, %B %d, %Y at %I:%M:%S %p" # wkday, m d, y at time
+            result = datetime.strptime(date_str, date_fmt)
+
+    else: # assumed to be a string, remove any quotes (and add back escaped)
+        result = str_value.replace('"', "")
+        result = result.replace("&quot;", '"')
+
+    return result
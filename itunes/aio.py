@@ -0,0 +1,80 @@
+"""
+aio.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements the asyncio flavor of the iTunes "API". The coroutines
+take the same parameters and return (or raise) the same as their blocking
+counterparts in itunes.py, but wait for iTunes with the transport's
+`run_async` (an `asyncio.create_subprocess_exec` osascript for the spawn
+transport), so an event loop keeps running while they do.
+
+Cancelling a coroutine cancels the script in flight: a spawned osascript is
+killed, and the output of any other transport is dropped.
+"""
+
+from . import itunes, transport
+from .itunes import DEFAULT_FIELDS
+
+async def search(search_term, keys=["name"], fields=DEFAULT_FIELDS, store=None,
+        index=None):
+    """
+    Search the iTunes library. See `itunes.search`.
+    """
+
+    return await transport.run_steps_async(itunes._search(search_term, keys,
+        fields, store, index))
+
+async def get_playlist(name="Music", key="name", fields=DEFAULT_FIELDS,
+        store=None):
+    """
+    Get all the songs in the playlist specified. See `itunes.get_playlist`.
+    """
+
+    return await transport.run_steps_async(itunes._get_playlist(name, key,
+        fields, store))
+
+async def get_tracks(persistent_ids, fields=DEFAULT_FIELDS):
+    """
+    Get the tracks with the given persistent IDs. See `itunes.get_tracks`.
+    """
+
+    return await transport.run_steps_async(itunes._get_tracks(persistent_ids,
+        fields))
+
+async def play():
+    """
+    Play the current track.
+    """
+
+    await transport.run_steps_async(itunes._play())
+
+async def pause():
+    """
+    Pause the current track.
+    """
+
+    await transport.run_steps_async(itunes._pause())
+
+async def playpause():
+    """
+    Toggle play state of iTunes.
+    """
+
+    await transport.run_steps_async(itunes._playpause())
+
+async def play_track(title, persistent_id=None):
+    """
+    Play the track indicated by `title`, or by `persistent_id` if given. See
+    `itunes.play_track`.
+    """
+
+    await transport.run_steps_async(itunes._play_track(title, persistent_id))
+
+async def run_applescript(script):
+    """
+    Run the given piece of AppleScript. See `itunes.run_applescript`.
+    """
+
+    return await transport.get_transport().run_async(script)
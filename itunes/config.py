@@ -0,0 +1,70 @@
+"""
+config.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file holds the settings for the iTunes interface. Every setting can be
+overridden by an environment variable with the same name prefixed by
+`ITUNESTUI_` (e.g. `ITUNESTUI_BACKEND=jxa`), or changed at runtime by
+assigning to the attribute in this module.
+"""
+
+import os
+
+def _env(name, default):
+    return os.environ.get("ITUNESTUI_" + name, default)
+
+"""Backends that can be used to talk to iTunes."""
+BACKENDS = ("applescript", "jxa")
+
+"""The backend used to talk to iTunes. `applescript` sends AppleScript and
+parses the `-ss` output, `jxa` sends JavaScript for Automation which answers
+in JSON."""
+BACKEND = _env("BACKEND", "applescript")
+
+"""The number of persistent osascript workers used to run AppleScript. Set to
+0 to start a new osascript process for every script instead."""
+WORKERS = int(_env("WORKERS", "2"))
+
+"""The command that starts a persistent worker. Empty means the bundled
+`worker.js` run by osascript."""
+WORKER_COMMAND = _env("WORKER_COMMAND", "")
+
+"""Transports that can carry scripts to iTunes (see transport.py)."""
+TRANSPORTS = ("worker", "spawn", "fake")
+
+"""How scripts are run: `worker` uses persistent osascript workers, `spawn`
+starts an osascript process per script and `fake` answers from a synthetic
+in-process library (see fake.py), which also works off macOS."""
+TRANSPORT = _env("TRANSPORT", "worker")
+
+"""The number of tracks in the fake iTunes library."""
+FAKE_TRACKS = int(_env("FAKE_TRACKS", "1000"))
+
+"""The time (in seconds) the fake iTunes takes to answer each script, and the
+maximum random deviation from it."""
+FAKE_LATENCY = float(_env("FAKE_LATENCY", "0"))
+FAKE_JITTER = float(_env("FAKE_JITTER", "0"))
+
+"""The number of tracks in the first chunk of a streamed playlist, and the
+time (in seconds) each later chunk should take to fetch."""
+CHUNK_SIZE = int(_env("CHUNK_SIZE", "500"))
+CHUNK_LATENCY = float(_env("CHUNK_LATENCY", "0.1"))
+
+"""The number of processes that parse long responses (a whole library) in
+parallel. 0 means one per CPU, 1 parses every response in this process."""
+PARSE_WORKERS = int(_env("PARSE_WORKERS", "0"))
+
+"""The playlist that holds the whole library."""
+LIBRARY_PLAYLIST = _env("LIBRARY_PLAYLIST", "Music")
+
+"""The SQLite file that caches the library between runs (see store.py). Empty
+disables the cache."""
+CACHE_PATH = _env("CACHE_PATH", os.path.join(os.path.expanduser("~"),
+    ".cache", "itunestui", "library.sqlite3"))
+
+"""The directory that holds compiled AppleScript (see scripts.py). Empty
+disables compiling, so scripts are sent as source every time."""
+SCRIPT_CACHE = _env("SCRIPT_CACHE", os.path.join(os.path.expanduser("~"),
+    ".cache", "itunestui", "scripts"))
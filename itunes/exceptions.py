@@ -80,3 +80,18 @@ class PlaylistError(ITunesError):
 
         super(PlaylistError, self).__init__(message)
         self.title = title
+
+class WorkerError(AppleScriptError):
+    """
+    Represents a failure of a persistent script worker (e.g. the worker
+    process crashed or broke the protocol) rather than of the script itself.
+
+    Parameters
+    ----------
+    message : str
+        The message that the exception will hold.
+    script : str
+        The script that was running when the worker failed (default "").
+    """
+
+    pass
@@ -0,0 +1,710 @@
+"""
+fake.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements a fake iTunes for testing and benchmarking off macOS.
+
+`FakeITunes` is a transport (see transport.py) that answers the scripts sent
+by the iTunes "API" from a synthetic library of any size, in exactly the form
+`osascript -ss` (or the JXA backend) would print, with configurable latency.
+The module can also be run as a stand-in for the osascript executable:
+
+    python -m itunes.fake [--tracks N] [--latency S] [--jitter S] -ss -e ...
+
+or, with `--worker`, as a persistent worker (see worker.py).
+"""
+
+from datetime import datetime, timedelta
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+from . import scripts
+from .exceptions import AppleScriptError
+from .parser import parse_literal
+from .transport import Transport, APPLESCRIPT, JAVASCRIPT
+
+_JS_ARGS_REGEX = re.compile(r'var args = (.*);\n')
+_RANGE_REGEX = re.compile(r'tracks (\d+) thru (\d+)')
+_ESCAPE_REGEX = re.compile(r'\\(.)')
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t"}
+
+# the parameter lines of a template's run handler (see scripts.py)
+_ARGV_REGEX = re.compile(r'set (\w+) to (?:item (\d+) of argv|' \
+        r'\(item (\d+) of argv\) as integer|items (\d+) thru -1 of argv)$')
+
+ARTISTS = ["Biz Markie", "The Beatles", "Daft Punk", "Nina Simone",
+        "Sigur Rós", "Beyoncé", "Radiohead", "The National", "Björk",
+        "A Tribe Called Quest", "Miles Davis", "Kendrick Lamar"]
+
+GENRES = ["Hip-Hop/Rap", "Rock", "Electronic", "Jazz", "Pop", "Alternative",
+        "Classical", "R&B/Soul"]
+
+WORDS = ["just", "a", "friend", "love", "night", "blue", "song", "river",
+        "city", "dream", "heart", "fire", "light", "time", "home", "away"]
+
+# names that broke the regex parser
+NASTY_NAMES = ['Say "Hello", Goodbye', "Curly {Braces}", "Back\\slash",
+        "Commas, commas, commas", "Tabs\tand \"quotes\"", "ありがとう",
+        "Пётр", "Emoji \U0001F3B5", "Colon: The Sequel", "{{Double}}"]
+
+BASE_DATE = datetime(2010, 3, 13, 17, 2, 22)
+
+class Constant(str):
+    """
+    An AppleScript constant (e.g. `file track`), printed without quotes.
+    """
+    pass
+
+def make_track(i, rng=None, nasty=False):
+    """
+    Make a dictionary with the properties iTunes reports for a file track.
+
+    Parameters
+    ----------
+    i : int
+        The index of the track, used to derive its IDs.
+    rng : random.Random, optional
+        The random number generator to use. Defaults to one seeded with `i`.
+    nasty : bool, optional
+        Whether to use names with quotes, commas, braces and unicode in them.
+        Defaults to False.
+
+    Returns
+    -------
+    dict
+        The properties of the synthetic track.
+    """
+
+    if rng is None:
+        rng = random.Random(i)
+
+    if nasty and i % 3 == 0:
+        name = rng.choice(NASTY_NAMES)
+    else:
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        name = name.title()
+
+    artist = rng.choice(ARTISTS)
+    album = "{0} {1}".format(rng.choice(WORDS).title(), rng.randint(1, 30))
+    duration = round(rng.uniform(60, 600), 3)
+    added = BASE_DATE + timedelta(seconds=rng.randint(0, 10 ** 8))
+
+    return {
+        "class": Constant("file track"),
+        "id": 1000 + i,
+        "index": i + 1,
+        "name": name,
+        "persistent ID": "{0:016X}".format(0x5A5A000000000000 + i),
+        "database ID": 500 + i,
+        "date added": added,
+        "time": "{0}:{1:02}".format(int(duration) // 60, int(duration) % 60),
+        "duration": duration,
+        "artist": artist,
+        "album artist": artist if rng.random() < 0.7 else "",
+        "composer": "",
+        "album": album,
+        "genre": rng.choice(GENRES),
+        "bit rate": rng.choice([128, 192, 256, 320]),
+        "sample rate": 44100,
+        "track count": 12,
+        "track number": rng.randint(1, 12),
+        "disc count": 1,
+        "disc number": 1,
+        "size": rng.randint(10 ** 6, 2 * 10 ** 7),
+        "volume adjustment": 0,
+        "year": rng.randint(1960, 2015),
+        "comment": "",
+        "EQ": "",
+        "kind": "MPEG audio file",
+        "media kind": Constant("song"),
+        "video kind": Constant("none"),
+        "modification date": added + timedelta(days=rng.randint(0, 400)),
+        "enabled": True,
+        "start": 0.0,
+        "finish": duration,
+        "played count": rng.randint(0, 200),
+        "played date": added + timedelta(days=rng.randint(0, 800)),
+        "skipped count": rng.randint(0, 5),
+        "skipped date": None,
+        "compilation": False,
+        "gapless": False,
+        "rating": rng.choice([0, 20, 40, 60, 80, 100]),
+        "bpm": 0,
+        "grouping": "",
+        "podcast": False,
+        "bookmarkable": False,
+        "bookmark": 0.0,
+        "shufflable": True,
+        "category": "",
+        "description": "",
+        "unplayed": False,
+        "sort name": "",
+        "sort album": "",
+        "sort artist": "",
+        "rating kind": Constant("user"),
+        "album rating": 0,
+        "loved": False,
+        "cloud status": Constant("matched"),
+    }
+
+def make_tracks(count, seed=0, nasty=False):
+    """
+    Make `count` synthetic tracks.
+
+    Parameters
+    ----------
+    count : int
+        The number of tracks to make.
+    seed : int, optional
+        The seed for the random number generator (default 0).
+    nasty : bool, optional
+        Passed on to `make_track` (default False).
+
+    Returns
+    -------
+    list
+        A list of track dictionaries.
+    """
+
+    rng = random.Random(seed)
+    return [make_track(i, rng, nasty) for i in range(count)]
+
+def format_value(value):
+    """
+    Format a Python value the way `osascript -ss` prints it.
+
+    Parameters
+    ----------
+    value : <t>
+        The value to format: str, int, float, bool, None, datetime, list,
+        dict or `Constant`.
+
+    Returns
+    -------
+    str
+        The AppleScript source form of `value`.
+    """
+
+    if isinstance(value, Constant):
+        return value
+
+    if isinstance(value, str):
+        return '"{0}"'.format(value.replace("\\", "\\\\").replace('"', '\\"'))
+
+    if value is None:
+        return "missing value"
+
+    if value is True or value is False:
+        return "true" if value else "false"
+
+    if isinstance(value, datetime):
+        return 'date "{0:%A, %B} {0.day}, {0.year} at {1}:{0:%M:%S %p}"'.format(
+                value, (value.hour - 1) % 12 + 1)
+
+    if isinstance(value, dict):
+        return "{" + ", ".join("{0}:{1}".format(key, format_value(item)) for
+                key, item in value.items()) + "}"
+
+    if isinstance(value, (list, tuple)):
+        return "{" + ", ".join(format_value(item) for item in value) + "}"
+
+    return repr(value)
+
+def format_response(tracks):
+    """
+    Format a list of tracks as the `-ss` response to `properties of tracks`.
+
+    Parameters
+    ----------
+    tracks : list
+        A list of track dictionaries.
+
+    Returns
+    -------
+    str
+        The response text, including the trailing newline osascript prints.
+    """
+
+    return format_value(tracks) + "\n"
+
+def format_json_response(tracks):
+    """
+    Format a list of tracks the way the JXA backend's scripts print them.
+
+    Parameters
+    ----------
+    tracks : list
+        A list of track dictionaries.
+
+    Returns
+    -------
+    str
+        The JSON response text, with dates as seconds since the epoch and empty
+        strings and `none` as null.
+    """
+
+    return json.dumps(_json_value(tracks), ensure_ascii=False) + "\n"
+
+def _json_value(value):
+    """
+    Convert `value` to what the JXA backend's scripts would send for it.
+    """
+
+    if isinstance(value, datetime):
+        return value.timestamp()
+
+    if value == "" or (isinstance(value, Constant) and value == "none"):
+        return None
+
+    if isinstance(value, dict):
+        return {key: _json_value(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+
+    return value
+
+def matches(track, words):
+    """
+    Return whether `track` matches a search the way iTunes matches it.
+
+    Every word of the search must appear (ignoring case) in the track's name,
+    album, artist, composer or genre.
+
+    Parameters
+    ----------
+    track : dict
+        The track to check.
+    words : list
+        The lowercased words of the search.
+
+    Returns
+    -------
+    bool
+        Whether every word is found.
+    """
+
+    text = "\n".join(track.get(key) or "" for key in SEARCH_KEYS).lower()
+    return all(word in text for word in words)
+
+"""Track properties searched by iTunes."""
+SEARCH_KEYS = ("name", "album", "artist", "composer", "genre")
+
+class FakeITunes(Transport):
+    """
+    A transport that pretends to be iTunes.
+
+    It understands the scripts sent by the iTunes "API" (matching them by
+    their text), keeps a player state, and raises `AppleScriptError` for
+    anything else, like AppleScript would for an invalid script.
+
+    Parameters
+    ----------
+    tracks : int or list, optional
+        The number of synthetic tracks in the library (default 1000), or the
+        track dictionaries themselves.
+    latency : float, optional
+        The time (in seconds) each script takes to run (default 0).
+    jitter : float, optional
+        The maximum random deviation from `latency` (default 0).
+    seed : int, optional
+        The seed used to make the library and the jitter (default 0).
+
+    Attributes
+    ----------
+    tracks : list
+        The tracks in the library.
+    playlists : dict
+        Maps playlist names to lists of track indices. `Music` and `Library`
+        hold every track, `Favorites` the highly rated ones and `ITC` every
+        seventh track.
+    state : str
+        The player state: `stopped`, `playing` or `paused`.
+    current : int or None
+        The index of the current track.
+    calls : int
+        The number of scripts run so far.
+    """
+
+    def __init__(self, tracks=1000, latency=0.0, jitter=0.0, seed=0):
+
+        if isinstance(tracks, int):
+            tracks = make_tracks(tracks, seed)
+
+        self.tracks = tracks
+        self.latency = latency
+        self.jitter = jitter
+        self.state = "stopped"
+        self.current = None
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._records = [None] * len(tracks)
+        self._by_id = None
+
+        every = list(range(len(tracks)))
+        self.playlists = {
+            "Music": every,
+            "Library": every,
+            "Favorites": [i for i in every if tracks[i].get("rating", 0) >= 80],
+            "ITC": every[::7],
+        }
+
+        self._handlers = [
+            (APPLESCRIPT, re.compile(r'tell playlist named "(?P<name>.*)"\s*' \
+                r'repeat with pid in (?P<ids>\{.*\})\s*$.*?copy ' \
+                r'\{(?P<columns>.*?)\} to the end', re.DOTALL | re.MULTILINE),
+                self._get_tracks),
+            (APPLESCRIPT, re.compile(r'search playlist "(?P<name>.*)" for ' \
+                r'"(?P<term>.*)"(?:.*?copy \{(?P<columns>.*?)\} to the end)?',
+                re.DOTALL), self._search),
+            (APPLESCRIPT, re.compile(r'properties of tracks in playlist ' \
+                r'named "(?P<name>.*)"'), self._playlist),
+            (APPLESCRIPT, re.compile(r'tell playlist named "(?P<name>.*)"\s*' \
+                r'return (?P<query>.*)'), self._playlist_query),
+            (APPLESCRIPT, re.compile(r'play track "(?P<title>.*)"'),
+                self._play_track),
+            (APPLESCRIPT, re.compile(r'play \(first track of library ' \
+                r'playlist 1 whose persistent ID is "(?P<pid>.*)"\)'),
+                self._play_track_id),
+            (APPLESCRIPT, re.compile(r'^\s*(?P<command>play|pause|playpause)' \
+                r'\s*$', re.MULTILINE), self._transport),
+            (JAVASCRIPT, re.compile(r'whose\(\{persistentID: pid\}\)'),
+                self._get_tracks),
+            (JAVASCRIPT, re.compile(r'app\.search\('), self._search),
+            (JAVASCRIPT, re.compile(r'app\.playlists\.byName\(args\.name\)' \
+                r'\.tracks'), self._playlist),
+            (JAVASCRIPT, re.compile(r'whose\(\{name: args\.title\}\)'),
+                self._play_track),
+            (JAVASCRIPT, re.compile(r'whose\(\s*\{persistentID: ' \
+                r'args\.pid\}\)'), self._play_track_id),
+            (JAVASCRIPT, re.compile(r'\.(?P<command>play|pause|playpause)' \
+                r'\(\);\s*$'), self._transport),
+        ]
+
+    def run(self, script, language=APPLESCRIPT):
+
+        self.calls += 1
+        delay = self.latency
+
+        if self.jitter:
+            delay += self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        for handler_language, regex, handler in self._handlers:
+            if handler_language != language:
+                continue
+
+            match = regex.search(script)
+            if match:
+                args = {key: value for key, value in match.groupdict().items()
+                        if value is not None}
+
+                # AppleScript projections list "<field> of tracks, ..."
+                if "columns" in args:
+                    args["fields"] = [column.rsplit(" of ", 1)[0] for column in
+                            args.pop("columns").split(", ")]
+
+                # AppleScript strings are quoted
+                if language == APPLESCRIPT:
+                    for key in ("name", "term", "title", "pid"):
+                        if key in args:
+                            args[key] = _unquote(args[key])
+
+                # JavaScript parameters are in the `args` object
+                arg_line = _JS_ARGS_REGEX.match(script)
+                if language == JAVASCRIPT and arg_line:
+                    args.update(json.loads(arg_line.group(1)))
+
+                return handler(language=language, **args)
+
+        raise AppleScriptError("Fake iTunes can't run script: {0}".format(
+            script), script)
+
+    def _format(self, indices, language, fields=None, by_column=False):
+        tracks = self.tracks
+
+        if fields is not None:
+            for field in fields:
+                if indices and field not in tracks[indices[0]]:
+                    raise AppleScriptError("Can't get {0}.".format(field))
+
+            if by_column:
+                value = [[tracks[i].get(field) for i in indices] for field in
+                        fields]
+            else:
+                value = [[tracks[i].get(field) for field in fields] for i in
+                        indices]
+
+            if language != APPLESCRIPT:
+                return json.dumps(_json_value(value), ensure_ascii=False)
+            return format_value(value) + "\n"
+
+        if language != APPLESCRIPT:
+            return format_json_response([tracks[i] for i in indices])
+
+        records = self._records
+
+        # formatting is slow, so every track is only formatted once
+        for i in indices:
+            if records[i] is None:
+                records[i] = format_value(tracks[i])
+
+        return "{" + ", ".join(records[i] for i in indices) + "}\n"
+
+    def _get_playlist(self, name):
+        try:
+            return self.playlists[name]
+        except KeyError:
+            raise AppleScriptError("Can't get playlist \"{0}\".".format(name))
+
+    def _search(self, term, language, name=None, playlist=None, fields=None):
+        words = term.lower().split()
+        tracks = self.tracks
+        hits = [i for i in self._get_playlist(name or playlist) if
+                matches(tracks[i], words)]
+        return self._format(hits, language, fields)
+
+    def _playlist(self, name, language, fields=None):
+        return self._format(self._get_playlist(name), language, fields,
+                by_column=True)
+
+    def _playlist_query(self, name, query, language):
+        indices = self._get_playlist(name)
+
+        if query == "count of tracks":
+            return "{0}\n".format(len(indices))
+
+        # tracks A thru B (1-based, inclusive)
+        track_range = _RANGE_REGEX.search(query)
+        if track_range:
+            start, end = map(int, track_range.groups())
+            if not 1 <= start <= end <= len(indices):
+                raise AppleScriptError("Can't get tracks {0} thru {1}.".format(
+                    start, end))
+            indices = indices[start - 1:end]
+
+        if query.startswith("properties of tracks"):
+            return self._format(indices, APPLESCRIPT)
+
+        if query.startswith("{") and query.endswith("}"):
+            fields = [column.split(" of tracks", 1)[0] for column in
+                    query[1:-1].split(", ")]
+            return self._format(indices, APPLESCRIPT, fields, by_column=True)
+
+        raise AppleScriptError("Fake iTunes can't run: {0}".format(query))
+
+    def _get_tracks(self, ids, fields, language, name=None, playlist=None):
+        if isinstance(ids, str):
+            ids = parse_literal(ids) or []
+
+        members = set(self._get_playlist(name or playlist))
+        by_id = self.index_by_id()
+        found = [by_id[pid] for pid in ids if by_id.get(pid) in members]
+
+        return self._format(found, language, fields)
+
+    def add_track(self, track):
+        """
+        Add a track to the library (and the `Music` and `Library` playlists).
+
+        Returns
+        -------
+        int
+            The index of the new track.
+        """
+
+        index = len(self.tracks)
+        self.tracks.append(track)
+        self._records.append(None)
+        self._by_id = None
+
+        # `Music` and `Library` share their list
+        self.playlists["Music"].append(index)
+        if self.playlists["Library"] is not self.playlists["Music"]:
+            self.playlists["Library"].append(index)
+
+        return index
+
+    def modify_track(self, index, **fields):
+        """
+        Change properties of a track and bump its modification date.
+
+        Property names with spaces can be given with underscores (e.g.
+        `played_count=3`).
+        """
+
+        track = self.tracks[index]
+
+        for key, value in fields.items():
+            track[key.replace("_", " ")] = value
+
+        track["modification date"] = datetime.now().replace(microsecond=0)
+        self._records[index] = None
+
+    def delete_track(self, index):
+        """
+        Remove a track from the library and every playlist.
+        """
+
+        for indices in self.playlists.values():
+            if index in indices:
+                indices.remove(index)
+
+        self._by_id = None
+
+    def index_by_id(self):
+        """
+        Return a dictionary mapping persistent IDs to track indices.
+        """
+
+        if self._by_id is None:
+            self._by_id = {track["persistent ID"]: i for i, track in
+                    enumerate(self.tracks)}
+        return self._by_id
+
+    def _play_track(self, title, language):
+        for i, track in enumerate(self.tracks):
+            if track["name"] == title:
+                self.current = i
+                self.state = "playing"
+                return ""
+
+        raise AppleScriptError("Can't get track \"{0}\".".format(title))
+
+    def _play_track_id(self, pid, language, title=None):
+        index = self.index_by_id().get(pid)
+
+        if index is None:
+            raise AppleScriptError("Can't get track whose persistent ID is " \
+                    "\"{0}\".".format(pid))
+
+        self.current = index
+        self.state = "playing"
+        return ""
+
+    def _transport(self, command, language):
+        if command == "play" or (command == "playpause" and
+                self.state != "playing"):
+            self.state = "playing"
+        else:
+            self.state = "paused"
+        return ""
+
+def main(argv=None):
+    """
+    Run the fake iTunes as a stand-in for the osascript executable.
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m itunes.fake",
+            description="Fake osascript that answers from a synthetic " \
+                    "iTunes library.")
+    parser.add_argument("--tracks", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--worker", action="store_true",
+            help="speak the persistent worker protocol on stdin/stdout")
+    parser.add_argument("-l", dest="language", default=APPLESCRIPT)
+    parser.add_argument("-s", dest="flags", default="")
+    parser.add_argument("-e", dest="lines", action="append", default=[])
+    parser.add_argument("argv", nargs="*",
+            help="a script file (without -e), then the arguments of the " \
+                    "script's run handler")
+    args = parser.parse_args(argv)
+
+    # like osascript, run a script file if no -e lines are given; here it has
+    # to be source text
+    if not args.lines and args.argv:
+        with open(args.argv.pop(0), encoding="utf-8") as script_file:
+            args.lines = [line.strip() for line in
+                    script_file.read().split("\n")]
+
+    itunes = FakeITunes(args.tracks, latency=args.latency, jitter=args.jitter)
+
+    if args.worker:
+        return _serve_worker(itunes)
+
+    script = "\n".join(args.lines)
+
+    if args.lines and args.lines[0] == "on run argv":
+        script = _bind(args.lines, args.argv)
+
+    try:
+        out = itunes.run(script, args.language)
+    except AppleScriptError as ae:
+        sys.stderr.write("execution error: {0}\n".format(ae))
+        return 1
+
+    sys.stdout.write(out)
+    return 0
+
+def _unquote(text):
+    """
+    Undo the escapes of an AppleScript string literal.
+    """
+
+    return _ESCAPE_REGEX.sub(lambda match: _ESCAPES.get(match.group(1),
+        match.group(1)), text)
+
+def _bind(lines, argv):
+    """
+    Put the arguments of a template's run handler into its body, the way
+    `scripts.Script.inline` does.
+    """
+
+    literals = {}
+    body = []
+
+    for line in lines[1:-1]:
+        match = _ARGV_REGEX.match(line)
+
+        if match is None:
+            body.append(line)
+            continue
+
+        name, text, integer, rest = match.groups()
+        if text:
+            literals[name] = scripts.quote(argv[int(text) - 1])
+        elif integer:
+            literals[name] = str(int(argv[int(integer) - 1]))
+        else:
+            literals[name] = "{" + ", ".join(scripts.quote(item) for item in
+                    argv[int(rest) - 1:]) + "}"
+
+    if not literals:
+        return "\n".join(body)
+
+    names = re.compile(r'\b({0})\b'.format("|".join(literals)))
+    return names.sub(lambda match: literals[match.group(1)], "\n".join(body))
+
+def _serve_worker(itunes):
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    while True:
+        header = stdin.readline().split()
+
+        if not header:
+            return 0
+
+        request_id, length = header
+        script = stdin.read(int(length)).decode("utf-8")
+
+        try:
+            status, result = b"ok", itunes.run(script)
+        except AppleScriptError as ae:
+            status, result = b"error", str(ae)
+
+        data = result.encode("utf-8")
+        stdout.write(request_id + b" " + status + b" " +
+                str(len(data)).encode("ascii") + b"\n" + data)
+        stdout.flush()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+index.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements an in-process search index over the tracks of the
+library, so searches don't have to go through iTunes at all.
+
+iTunes matches a track if every word of the search appears (ignoring case)
+somewhere in its name, album, artist, composer or genre. A word never holds
+whitespace, so it appears in that text exactly when it appears inside one of
+its whitespace separated tokens. The index maps every token to the tracks
+holding it, and every trigram (three character substring) to the tokens
+holding it. The tokens containing a word of three or more characters are
+found by intersecting the tokens of its trigrams (and checking each of
+those), the tokens containing a shorter word by scanning the distinct tokens,
+which are far fewer than the tracks. The tracks of those tokens are exactly
+the tracks iTunes would match.
+"""
+
+from operator import itemgetter
+
+"""Track properties matched by searches (like iTunes' own search)."""
+SEARCH_FIELDS = ("name", "album", "artist", "composer", "genre")
+
+class SearchIndex(object):
+    """
+    A token and trigram index of tracks.
+
+    Tracks are identified by their persistent ID: adding a track whose ID is
+    already indexed replaces it (in place, so results stay in the order the
+    tracks were first added).
+
+    Parameters
+    ----------
+    tracks : iterable, optional
+        Track dictionaries to index. They should hold `persistent ID` and the
+        properties in `SEARCH_FIELDS`.
+    """
+
+    def __init__(self, tracks=()):
+
+        self._tracks = []
+        self._texts = []
+        self._ids = {}
+        self._tokens = {}
+        self._trigrams = {}
+        self._words = {}
+        self._count = 0
+
+        self.add(tracks)
+
+    def __len__(self):
+        return self._count
+
+    def covers(self, fields):
+        """
+        Return whether the indexed tracks hold every property in `fields`.
+        """
+
+        for track in self._tracks:
+            if track is not None:
+                return fields is not None and all(field in track for field in
+                        fields)
+
+        return False
+
+    def add(self, tracks):
+        """
+        Add tracks to the index, replacing indexed tracks with the same ID.
+
+        Parameters
+        ----------
+        tracks : iterable
+            The track dictionaries to add.
+        """
+
+        for track in tracks:
+            pid = track["persistent ID"]
+            doc = self._ids.get(pid)
+
+            if doc is None:
+                doc = len(self._tracks)
+                self._ids[pid] = doc
+                self._tracks.append(None)
+                self._texts.append(None)
+            else:
+                self._unlink(doc)
+
+            text = _text(track)
+            self._tracks[doc] = track
+            self._texts[doc] = text
+            self._count += 1
+
+            for token in set(text.split()):
+                docs = self._tokens.get(token)
+
+                if docs is None:
+                    docs = self._tokens[token] = set()
+                    self._words.clear()
+
+                    for trigram in _trigrams(token):
+                        self._trigrams.setdefault(trigram, set()).add(token)
+
+                docs.add(doc)
+
+    def remove(self, persistent_ids):
+        """
+        Remove tracks from the index. Unknown IDs are ignored.
+        """
+
+        for pid in persistent_ids:
+            doc = self._ids.pop(pid, None)
+
+            if doc is not None:
+                self._unlink(doc)
+                self._tracks[doc] = None
+                self._texts[doc] = None
+
+    def search(self, search_term, fields=None):
+        """
+        Search the indexed tracks the way iTunes would.
+
+        Parameters
+        ----------
+        search_term : str
+            The string to search for.
+        fields : sequence, optional
+            The track properties to return. Defaults to None, which returns
+            the indexed dictionaries themselves.
+
+        Returns
+        -------
+        list
+            The matching track dictionaries, in the order they were added.
+        """
+
+        words = search_term.lower().split()
+
+        if not words:
+            docs = [doc for doc, track in enumerate(self._tracks) if track is
+                    not None]
+            return self._results(docs, fields)
+
+        # the rarest words narrow the results the most
+        matches = sorted((self._matches(word) for word in set(words)), key=len)
+
+        docs = matches[0]
+        for other in matches[1:]:
+            if not docs:
+                break
+            docs = docs.intersection(other)
+
+        return self._results(sorted(docs), fields)
+
+    def _results(self, docs, fields):
+        tracks = [self._tracks[doc] for doc in docs]
+
+        if fields is None:
+            return tracks
+
+        values = itemgetter(*fields)
+
+        if len(fields) == 1:
+            return [{fields[0]: values(track)} for track in tracks]
+
+        return [dict(zip(fields, values(track))) for track in tracks]
+
+    def _matches(self, word):
+        docs = set()
+
+        for token in self._containing(word):
+            docs.update(self._tokens[token])
+
+        return docs
+
+    def _containing(self, word):
+        # the tokens holding a word are kept until the vocabulary changes
+        tokens = self._words.get(word)
+
+        if tokens is not None:
+            return tokens
+
+        if len(word) < 3:
+            tokens = [token for token in self._tokens if word in token]
+        else:
+            found = None
+
+            for trigram in sorted(_trigrams(word), key=lambda trigram:
+                    len(self._trigrams.get(trigram, ()))):
+                grams = self._trigrams.get(trigram)
+
+                if not grams:
+                    found = set()
+                    break
+
+                found = set(grams) if found is None else \
+                        found.intersection(grams)
+
+            tokens = [token for token in found if word in token]
+
+        self._words[word] = tokens
+        return tokens
+
+    def _unlink(self, doc):
+        self._count -= 1
+
+        for token in set(self._texts[doc].split()):
+            if _discard(self._tokens, token, doc):
+                self._words.clear()
+
+                for trigram in _trigrams(token):
+                    _discard(self._trigrams, trigram, token)
+
+def _text(track):
+    return "\n".join(str(track.get(field) or "") for field in
+            SEARCH_FIELDS).lower()
+
+def _trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+def _discard(postings, key, value):
+    # returns whether `key` is gone from `postings`
+    values = postings.get(key)
+
+    if values is not None:
+        values.discard(value)
+
+        if not values:
+            del postings[key]
+            return True
+
+    return False
@@ -5,17 +5,38 @@ Copyright © 2015 Alex Danoff. All Rights Reserved.
 2015-07-31
 
 This file implements the iTunes "API" methods (in AppleScript)that will be
-required by the program.
+required by the program. If `config.BACKEND` is "jxa", the methods are run as
+JavaScript for Automation instead (see jxa.py).
+
+Each method is written as a generator of the scripts it needs run (see
+`transport.run_steps`); aio.py drives the same generators under asyncio.
 """
 
-from subprocess import Popen, PIPE
-from datetime import datetime
-import json
-import re
+import time
+
+from . import config, jxa, scripts, transport
+from .exceptions import AppleScriptError, TrackError, PlaylistError
+from .parser import parse_response, parse_literal, parse_value, zip_columns
+from .tracks import from_rows
+
+"""Track properties fetched by default: what the TUI shows, plus an ID."""
+DEFAULT_FIELDS = ("persistent ID", "name", "album", "artist", "time")
 
-from .exceptions import AppleScriptError, TrackError
+"""Parameters of the AppleScript templates (see scripts.py)."""
+_TERM = (("searchTerm", scripts.TEXT),)
+_PLAYLIST = (("playlistName", scripts.TEXT),)
+_RANGE = _PLAYLIST + (("firstIndex", scripts.INTEGER), ("lastIndex",
+    scripts.INTEGER))
+_IDS = _PLAYLIST + (("trackIds", scripts.LIST),)
+_TITLE = (("trackTitle", scripts.TEXT),)
+_TRACK_ID = (("trackId", scripts.TEXT),)
 
-def search(search_term, keys=["name"]):
+"""Bounds for the adaptive chunk size of `iter_playlist`."""
+MIN_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 20000
+
+def search(search_term, keys=["name"], fields=DEFAULT_FIELDS, store=None,
+        index=None):
     """
     Search the iTunes library.
 
@@ -31,6 +52,18 @@ def search(search_term, keys=["name"]):
         Defaults to `name` (the track's title). If none of the items in `keys`
         is a valid key in the track dictionaries, or if `None` is passed, the
         current iTunes sorting order will be used.
+    fields : sequence, optional
+        The track properties to fetch (e.g. `name`, `date added`). Defaults to
+        `DEFAULT_FIELDS`. If `None` is passed, all properties are fetched,
+        which is much slower.
+    store : LibraryStore, optional
+        A synced library cache (see store.py). If it holds every field in
+        `fields`, the search is run against it instead of iTunes.
+    index : SearchIndex, optional
+        A search index of the library (see index.py). If its tracks hold every
+        field in `fields`, it answers the search (before `store` and iTunes).
+        The indexed dictionaries are returned as they are, so they may hold
+        more properties than `fields`.
 
     Returns
     -------
@@ -38,10 +71,18 @@ def search(search_term, keys=["name"]):
         A list containing the search results.
     """
 
+    return transport.run_steps(_search(search_term, keys, fields, store,
+        index))
+
+def _search(search_term, keys, fields, store, index):
+    """
+    The requests of `search` (see `transport.run_steps`).
+    """
+
     # use {{}} so as not to break str.format
     search_template = """tell application "iTunes"
     set toRet to {{}}
-    set searchResults to search playlist "Music" for "{term}"
+    set searchResults to search playlist "Music" for {searchTerm}
     repeat with t in searchResults
         set props to get properties of t
         copy props to the end of toRet
@@ -49,22 +90,35 @@ def search(search_term, keys=["name"]):
     return toRet
     end tell"""
 
-    #print(search_template.format(term=search_term) + "\n")
-
-    out = run_applescript(search_template.format(term=search_term))
-
-    track_list = parse_response(out)
-
-    # sort results
-    if track_list:
-        for key in keys:
-            if key in track_list[0]:
-                key_func = lambda track: track.__getitem__(key) or ""
-                track_list = sorted(track_list, key=key_func)
-
-    return track_list
+    # one row (a list of values in `fields` order) per track
+    projection_template = """tell application "iTunes"
+    set toRet to {{}}
+    set searchResults to search playlist "Music" for {searchTerm}
+    repeat with t in searchResults
+        copy {{{columns}}} to the end of toRet
+    end repeat
+    return toRet
+    end tell"""
 
-def get_playlist(name="Music", key="name"):
+    if index is not None and index.covers(fields):
+        track_list = index.search(search_term)
+    elif store is not None and store.synced and store.covers(fields):
+        track_list = store.search(search_term, fields)
+    elif _backend() == "jxa":
+        track_list = yield from jxa._search(search_term, fields)
+    elif fields is None:
+        out = yield scripts.template(search_template, _TERM).bind(
+                searchTerm=search_term)
+        track_list = parse_response(out)
+    else:
+        columns = ", ".join("{0} of t".format(field) for field in fields)
+        out = yield scripts.template(projection_template, _TERM,
+                columns=columns).bind(searchTerm=search_term)
+        track_list = from_rows(fields, parse_literal(out) or [])
+
+    return sort_tracks(track_list, keys)
+
+def get_playlist(name="Music", key="name", fields=DEFAULT_FIELDS, store=None):
     """
     Get all the songs in the playlist specified.
 
@@ -78,6 +132,13 @@ def get_playlist(name="Music", key="name"):
         Defaults to `name` (the track's title). If `key` is not a valid key in
         the track dictionaries, or if `None` is passed, the current iTunes
         sorting order will be used.
+    fields : sequence, optional
+        The track properties to fetch (e.g. `name`, `date added`). Defaults to
+        `DEFAULT_FIELDS`. If `None` is passed, all properties are fetched,
+        which is much slower.
+    store : LibraryStore, optional
+        A library cache (see store.py). If it holds the playlist and every
+        field in `fields`, the tracks are read from it instead of iTunes.
 
     Returns
     -------
@@ -91,22 +152,234 @@ def get_playlist(name="Music", key="name"):
         If the playlist cannot be loaded.
     """
 
+    return transport.run_steps(_get_playlist(name, key, fields, store))
+
+def _get_playlist(name, key, fields, store):
+    """
+    The requests of `get_playlist`.
+    """
+
     playlist_template = """tell application "iTunes"
-    return properties of tracks in playlist named "{name}"
+    return properties of tracks in playlist named {playlistName}
+    end tell"""
+
+    # one column (a list with a value per track) per field
+    projection_template = """tell application "iTunes"
+    tell playlist named {playlistName}
+    return {{{columns}}}
+    end tell
+    end tell"""
+
+    if store is not None and store.covers(fields):
+        track_list = store.playlist(name, fields)
+
+        if track_list is not None:
+            return sort_tracks(track_list, key)
+
+    try:
+        if _backend() == "jxa":
+            track_list = yield from jxa._get_playlist(name, fields)
+        elif fields is None:
+            out = yield scripts.template(playlist_template, _PLAYLIST).bind(
+                    playlistName=name)
+            track_list = parse_response(out)
+        else:
+            columns = ", ".join("{0} of tracks".format(field) for field in
+                    fields)
+            out = yield scripts.template(projection_template, _PLAYLIST,
+                    columns=columns).bind(playlistName=name)
+            track_list = zip_columns(fields, parse_literal(out))
+    except AppleScriptError as ae:
+        raise PlaylistError("No playlist named: {0}".format(name), name)
+
+    return sort_tracks(track_list, key)
+
+def iter_playlist(name="Music", fields=DEFAULT_FIELDS, chunk_size=None):
+    """
+    Get the songs in the playlist specified, a chunk at a time.
+
+    The tracks are fetched in ranges (`tracks 1 thru N`, `tracks N+1 thru
+    2N`, ...) and each chunk is yielded as soon as it has been parsed, so the
+    first tracks can be shown long before the whole playlist has arrived. The
+    size of each chunk adapts to how long the previous one took, aiming for
+    `config.CHUNK_LATENCY` seconds per call.
+
+    The tracks are in iTunes' order; use `sort_tracks` once everything has
+    arrived. With the JXA backend the whole playlist is a single chunk.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the playlist (defaults to "Music", which contains all
+        music).
+    fields : sequence, optional
+        The track properties to fetch, as for `get_playlist`.
+    chunk_size : int, optional
+        The number of tracks in the first chunk. Defaults to
+        `config.CHUNK_SIZE`.
+
+    Yields
+    ------
+    list
+        Lists of track dictionaries.
+
+    Raises
+    ------
+    PlaylistError
+        If the playlist cannot be loaded.
+    """
+
+    count_template = """tell application "iTunes"
+    tell playlist named {playlistName}
+    return count of tracks
+    end tell
+    end tell"""
+
+    chunk_template = """tell application "iTunes"
+    tell playlist named {playlistName}
+    return {columns}
+    end tell
     end tell"""
 
+    if _backend() == "jxa":
+        yield get_playlist(name, key=None, fields=fields)
+        return
+
     try:
-        out = run_applescript(playlist_template.format(name=name))
+        count = parse_literal(_run_script(scripts.template(count_template,
+            _PLAYLIST).bind(playlistName=name)))
     except AppleScriptError as ae:
         raise PlaylistError("No playlist named: {0}".format(name), name)
 
-    track_list = parse_response(out)
+    # the range is a parameter, so every chunk runs the same script
+    tracks = "tracks {firstIndex} thru {lastIndex}"
+
+    if fields is None:
+        columns = "properties of " + tracks
+    else:
+        columns = "{{" + ", ".join(field + " of " + tracks for field in
+                fields) + "}}"
+
+    chunk_script = scripts.template(chunk_template, _RANGE, columns=columns)
+
+    size = chunk_size or config.CHUNK_SIZE
+    start = 1
+
+    while start <= count:
+        end = min(start + size - 1, count)
+
+        began = time.perf_counter()
+
+        try:
+            out = _run_script(chunk_script.bind(playlistName=name,
+                firstIndex=start, lastIndex=end))
+        except AppleScriptError as ae:
+            raise PlaylistError("No playlist named: {0}".format(name), name)
+
+        if fields is None:
+            chunk = parse_response(out)
+        else:
+            chunk = zip_columns(fields, parse_literal(out))
+
+        # aim for config.CHUNK_LATENCY seconds per chunk
+        elapsed = max(time.perf_counter() - began, 1e-3)
+        size = int(size * config.CHUNK_LATENCY / elapsed)
+        size = min(max(size, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+
+        start = end + 1
+        yield chunk
+
+def get_tracks(persistent_ids, fields=DEFAULT_FIELDS):
+    """
+    Get the tracks with the given persistent IDs.
+
+    Parameters
+    ----------
+    persistent_ids : sequence
+        The persistent IDs of the tracks to fetch.
+    fields : sequence, optional
+        The track properties to fetch. Defaults to `DEFAULT_FIELDS`.
+        `persistent ID` is always fetched.
+
+    Returns
+    -------
+    list
+        A list of track dictionaries, in the order of `persistent_ids`.
+        Tracks that no longer exist are left out.
+    """
+
+    return transport.run_steps(_get_tracks(persistent_ids, fields))
+
+def _get_tracks(persistent_ids, fields):
+    """
+    The requests of `get_tracks`.
+    """
+
+    # the try block skips tracks that have been deleted
+    tracks_template = """tell application "iTunes"
+    set toRet to {{}}
+    tell playlist named {playlistName}
+    repeat with pid in {trackIds}
+        try
+            set t to first track whose persistent ID is (contents of pid)
+            copy {{{columns}}} to the end of toRet
+        end try
+    end repeat
+    end tell
+    return toRet
+    end tell"""
+
+    fields = list(fields)
+    if "persistent ID" not in fields:
+        fields.insert(0, "persistent ID")
+
+    if not persistent_ids:
+        return []
+
+    if _backend() == "jxa":
+        return (yield from jxa._get_tracks(persistent_ids, fields))
+
+    columns = ", ".join("{0} of t".format(field) for field in fields)
+    out = yield scripts.template(tracks_template, _IDS, columns=columns).bind(
+            playlistName=config.LIBRARY_PLAYLIST, trackIds=persistent_ids)
+
+    return from_rows(fields, parse_literal(out) or [])
+
+def sort_tracks(track_list, keys):
+    """
+    Sort tracks by the given key(s).
+
+    Parameters
+    ----------
+    track_list : list
+        A list of track dictionaries.
+    keys : str or list
+        The item(s) in the track dictionary to sort by. Each key is applied in
+        turn with a stable sort, so the last key is the primary one. Keys that
+        are not in the track dictionaries (and `None`) are ignored.
+
+    Returns
+    -------
+    list
+        A new, sorted list (or `track_list` itself if nothing was sorted).
+    """
 
-    # sort results
+    if isinstance(keys, str) or keys is None:
+        keys = [keys]
+
+    # sort results; copy once, then sort the copy in place
     if track_list:
-        if key in track_list[0]:
-            key_func = lambda track: track.__getitem__(key) or ""
-            track_list = sorted(track_list, key=key_func)
+        copied = False
+
+        for key in keys:
+            if key in track_list[0]:
+                key_func = lambda track, key=key: track[key] or ""
+
+                if copied:
+                    track_list.sort(key=key_func)
+                else:
+                    track_list = sorted(track_list, key=key_func)
+                    copied = True
 
     return track_list
 
@@ -117,12 +390,22 @@ def play():
     This function does not change what track is playing.
     """
 
+    return transport.run_steps(_play())
+
+def _play():
+    """
+    The requests of `play`.
+    """
+
     play_script = """tell application "iTunes"
     play
     end tell
     """
 
-    run_applescript(play_script)
+    if _backend() == "jxa":
+        yield from jxa._play()
+    else:
+        yield scripts.template(play_script).bind()
 
 def pause():
     """
@@ -131,33 +414,60 @@ def pause():
     This function does not change what track is playing.
     """
 
+    return transport.run_steps(_pause())
+
+def _pause():
+    """
+    The requests of `pause`.
+    """
+
     pause_script = """tell application "iTunes"
     pause
     end tell
     """
 
-    run_applescript(pause_script)
+    if _backend() == "jxa":
+        yield from jxa._pause()
+    else:
+        yield scripts.template(pause_script).bind()
 
 def playpause():
     """
     Toggle play state of iTunes.
     """
 
+    return transport.run_steps(_playpause())
+
+def _playpause():
+    """
+    The requests of `playpause`.
+    """
+
     playpause_script = """tell application "iTunes"
     playpause
     end tell
     """
 
-    run_applescript(playpause_script)
+    if _backend() == "jxa":
+        yield from jxa._playpause()
+    else:
+        yield scripts.template(playpause_script).bind()
 
-def play_track(title):
+def play_track(title, persistent_id=None):
     """
-    Play the track indicated by `title`.
+    Play the track indicated by `title`, or by `persistent_id` if given.
+
+    A title has to be looked up across the whole library, and plays the first
+    track with that name when there are several. A persistent ID names exactly
+    one track and is found through iTunes' ID lookup, so it is the better way
+    to play a track that came from a search or playlist.
 
     Parameter
     ---------
     title : str
         The title of the track to play.
+    persistent_id : str, optional
+        The persistent ID of the track to play (default None).
 
     Raises
     ------
@@ -165,19 +475,42 @@ def play_track(title):
         If `track` cannot be played.
     """
 
+    return transport.run_steps(_play_track(title, persistent_id))
+
+def _play_track(title, persistent_id=None):
+    """
+    The requests of `play_track`.
+    """
+
     script = """tell application "iTunes"
-    play track "{0}"
+    play track {trackTitle}
     end tell
     """
 
+    id_script = """tell application "iTunes"
+    play (first track of library playlist 1 whose persistent ID is {trackId})
+    end tell
+    """
+
+    if _backend() == "jxa":
+        return (yield from jxa._play_track(title, persistent_id))
+
     try:
-        run_applescript(script.format(title))
+        if persistent_id is not None:
+            yield scripts.template(id_script, _TRACK_ID).bind(
+                    trackId=persistent_id)
+        else:
+            yield scripts.template(script, _TITLE).bind(trackTitle=title)
     except AppleScriptError as ae:
         raise TrackError("No track named: {0}".format(title), title)
 
 def run_applescript(script):
     """
-    Run the given piece of AppleScript in a separate process.
+    Run the given piece of AppleScript.
+
+    The script is run by the current transport (see transport.py): by default
+    a persistent osascript worker, or a new osascript process if no worker can
+    be started.
 
     Parameters
     ----------
@@ -198,156 +531,25 @@ def run_applescript(script):
         If `script` causes any AppleScript errors.
     """
 
-    # -ss flag for JSON-like form
-    command = ["osascript", "-ss"]
+    return transport.get_transport().run(script)
 
-    # break script up into different lines
-    for line in script.split('\n'):
-        command.append('-e')
-        command.append(line.strip())
-    #print("COMMAND: {0}".format(' '.join(command)))
-    applescript_call = Popen(command, stdin=PIPE, stdout=PIPE, stderr=PIPE)
-
-    out, err = applescript_call.communicate()
-
-    out = out.decode("utf-8")
-    err = err.decode("utf-8")
-
-    if err:
-        raise AppleScriptError("Error parsing script: {0}".format(err), script)
-
-    return out
-
-def parse_response(response):
+def _run_script(script):
     """
-    Parse the result of an applescript call into a python dictionary.
-
-    Parameters
-    ----------
-    response : str
-        A string containing the unprocessed applescript output.
-
-    Returns
-    -------
-    list
-        A list of dictionaries which contain the information in `response`.
-
-    Raises
-    ------
-    ValueError
-        If a record is malformed.
+    Run a parameterized AppleScript (see scripts.py) on the current transport.
     """
 
-    records = []
-
-    response = response.strip()
-
-    # more than one opening brace = list of records
-    if response.startswith("{{") and response.endswith("}}"):
-        response = "[" + response[1:]
-        response = response[:-1] + "]"
-
-    #print("RAW:", response)
-
-    record_regex = re.compile(r'{(?P<record>.*?)}')
-
-    #log_file = open("out.log", "w")
-
-    # go through each record
-    for match in record_regex.finditer(response):
-        record = {}
-        record_str = match.group("record")
-        #print("RECORD_STR:",record_str, "\n")
-
-        # remove escaped quotes from records
-        if '\\"' in record_str:
-            record_str = record_str.replace('\\"', "&quot;")
+    return transport.get_transport().run_script(script)
 
-        # matches commas not in quotes
-        #
-        # works because a comma in quotes can never be followed ONLY by
-        # nonquotes or correctly quoted strings until the end of the line (since
-        # one quote has by necessity already passed if it's in a quote)
-        item_regex = re.compile(r',(?=(?:[^"]|"[^"]*")*$)')
-
-        # go through each key value pair in the record
-        for item in item_regex.split(record_str):
-
-            item = item.strip()
-            #print(repr(item))
-
-            # never a `:` in key, so use that to split
-            colon_pos = item.find(":")
-            if colon_pos != -1:
-                key = item[:colon_pos].strip()
-                value = item[colon_pos + 1:].strip()
-
-            else:
-                raise ValueError("Unable to parse item: {0}".format(item))
-
-            parsed = parse_value(value)
-            record["{0}".format(key)] = parsed
-            #log_file.write(("{!r} -> {!r}\n".format(value, parsed)))
-
-        records.append(record)
-
-    #log_file.close()
-    return records
-
-def parse_value(str_value):
+def _backend():
     """
-    Parse a string (from AppleScript response) into an equivalent Python type.
-
-    This function parses a string into whatever Python type it looks most like.
-    The patters it checks are based on what AppleScript spits out when it
-    returns responses. It currently supports int, float, bool, date, and None.
-
-    Parameters
-    ----------
-    str_value : str
-        A string containing the value to be parsed.
-
-    Returns
-    -------
-    <t>
-        A Python type (int, float, bool, etc) with the same value as
-        `str_value`. If no suitable match is found, `str_value` is returned.
+    Return the name of the configured backend, checking that it is valid.
     """
 
-    # check for None, int, float, bool, and date
-    if (not str_value or str_value == "missing value" or str_value == '""' or
-            str_value == "none"):
-        result = None
-
-    elif str_value.isdigit():
-        result = int(str_value)
-
-    elif ("." in str_value and str_value.strip().count(" ") == 0 and
-            str_value.count(".") == 1 and '"' not in str_value): # might be a float
-        dot_pos = str_value.find(".")
-
-        if (str_value[:dot_pos].isdigit() and str_value[dot_pos +
-                1:].isdigit()):
-            result = float(str_value)
-
-    elif str_value == "true" or str_value == "false":
-        result = True if str_value == "true" else False
-
-    elif str_value.startswith("date"):
-        open_quote = str_value.find('"')
-        close_quote = str_value.rfind('"')
-
-        # make sure there are quotes around the date
-        if open_quote != -1 and close_quote != -1:
-            date_str = str_value[open_quote + 1:close_quote]
-            date_fmt = "%A, %B %d, %Y at %I:%M:%S %p" # wkday, m d, y at time
-            result = datetime.strptime(date_str, date_fmt)
-
-    else: # assumed to be a string, remove any quotes (and add back escaped)
-        result = str_value.replace('"', "")
-        result = result.replace("&quot;", '"')
+    if config.BACKEND not in config.BACKENDS:
+        raise ValueError("Unknown backend: {0} (expected one of {1})".format(
+            config.BACKEND, ", ".join(config.BACKENDS)))
 
-    return result
+    return config.BACKEND
 
 def main():
     search("just a friend")
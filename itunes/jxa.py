@@ -0,0 +1,431 @@
+"""
+jxa.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements the JavaScript for Automation (JXA) backend of the iTunes
+"API". Every script returns its result as `JSON.stringify` output, so responses
+are decoded with the `json` module instead of the `-ss` parser.
+
+Track records use the same keys as the AppleScript backend (`persistent ID`,
+`date added`, ...). Dates are sent as seconds since the epoch and converted to
+`datetime` objects here; empty strings and the constant `none` are sent as
+null, just like the AppleScript parser turns them into None.
+"""
+
+from datetime import datetime
+import json
+
+from . import config, transport
+from .exceptions import AppleScriptError, TrackError, PlaylistError
+from .parser import zip_columns
+from .tracks import from_records, from_rows
+
+"""Track properties that hold dates."""
+DATE_KEYS = ("date added", "modification date", "played date", "skipped date",
+        "release date")
+
+# converts JXA values into the values of AppleScript records: dates become
+# epoch seconds and enumerated values ("fileTrack") are spelled like
+# AppleScript constants. Scripts built by `_script` start with
+# `var args = <JSON>;`, which holds their parameters.
+_PRELUDE = """
+var app = Application("iTunes");
+var names = {pcls: "class"};
+var enums = {pcls: 1, mediaKind: 1, videoKind: 1, ratingKind: 1,
+    albumRatingKind: 1, cloudStatus: 1};
+function spaced(text) {
+    return text.replace(/([a-z0-9])([A-Z])/g, "$1 $2").split(" ")
+        .map(function (w) { return w === w.toUpperCase() ? w :
+            w.toLowerCase(); }).join(" ");
+}
+function keyName(key) {
+    if (!(key in names)) {
+        names[key] = spaced(key);
+    }
+    return names[key];
+}
+function jxaName(field) {
+    return field.split(" ").map(function (w, i) {
+        if (i === 0) {
+            return w.toLowerCase();
+        }
+        return w === w.toUpperCase() ? w : w[0].toUpperCase() + w.slice(1);
+    }).join("");
+}
+function convert(key, value) {
+    if (value instanceof Date) {
+        return value.getTime() / 1000;
+    } else if (value === "" || value === undefined) {
+        return null;
+    } else if (key in enums) {
+        return value === "none" ? null : spaced(value);
+    }
+    return value;
+}
+function record(props) {
+    var out = {};
+    for (var key in props) {
+        out[keyName(key)] = convert(key, props[key]);
+    }
+    return out;
+}
+function row(track, fields) {
+    return fields.map(function (field) {
+        var key = jxaName(field);
+        return convert(key, track[key]());
+    });
+}
+function columns(tracks, fields) {
+    return fields.map(function (field) {
+        var key = jxaName(field);
+        return tracks[key]().map(function (value) {
+            return convert(key, value);
+        });
+    });
+}
+"""
+
+def search(search_term, fields=None):
+    """
+    Search the iTunes library.
+
+    Parameters
+    ----------
+    search_term : str
+        The string to search for in iTunes.
+    fields : sequence, optional
+        The track properties to fetch. Defaults to None, which fetches all of
+        them.
+
+    Returns
+    -------
+    list
+        A list of track dictionaries, in iTunes' order.
+    """
+
+    return transport.run_steps(_search(search_term, fields))
+
+def _search(search_term, fields):
+    """
+    The requests of `search`.
+    """
+
+    script = """
+    var results = app.search(app.playlists.byName(args.playlist),
+        {for: args.term});
+    JSON.stringify(results.map(function (t) {
+        return args.fields ? row(t, args.fields) : record(t.properties());
+    }));
+    """
+
+    out = yield _request(script, playlist="Music", term=search_term,
+            fields=fields)
+
+    if fields is None:
+        return parse_json_response(out)
+
+    return from_rows(fields, _convert_rows(fields, json.loads(out or "[]")))
+
+def get_playlist(name="Music", fields=None):
+    """
+    Get all the songs in the playlist specified.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the playlist (defaults to "Music").
+    fields : sequence, optional
+        The track properties to fetch. Defaults to None, which fetches all of
+        them.
+
+    Returns
+    -------
+    list
+        A list of track dictionaries, in iTunes' order.
+
+    Raises
+    ------
+    PlaylistError
+        If the playlist cannot be loaded.
+    """
+
+    return transport.run_steps(_get_playlist(name, fields))
+
+def _get_playlist(name, fields):
+    """
+    The requests of `get_playlist`.
+    """
+
+    script = """
+    var tracks = app.playlists.byName(args.name).tracks;
+    JSON.stringify(args.fields ? columns(tracks, args.fields) :
+        tracks.properties().map(record));
+    """
+
+    try:
+        out = yield _request(script, name=name, fields=fields)
+    except AppleScriptError as ae:
+        raise PlaylistError("No playlist named: {0}".format(name), name)
+
+    if fields is None:
+        return parse_json_response(out)
+
+    columns = json.loads(out or "[]")
+    return zip_columns(fields, _convert_columns(fields, columns))
+
+def get_tracks(persistent_ids, fields):
+    """
+    Get the tracks with the given persistent IDs.
+
+    Parameters
+    ----------
+    persistent_ids : sequence
+        The persistent IDs of the tracks to fetch.
+    fields : sequence
+        The track properties to fetch.
+
+    Returns
+    -------
+    list
+        A list of track dictionaries. Tracks that no longer exist are left
+        out.
+    """
+
+    return transport.run_steps(_get_tracks(persistent_ids, fields))
+
+def _get_tracks(persistent_ids, fields):
+    """
+    The requests of `get_tracks`.
+    """
+
+    script = """
+    var tracks = app.playlists.byName(args.playlist).tracks;
+    var rows = [];
+    args.ids.forEach(function (pid) {
+        var found = tracks.whose({persistentID: pid})();
+        if (found.length > 0) {
+            rows.push(row(found[0], args.fields));
+        }
+    });
+    JSON.stringify(rows);
+    """
+
+    out = yield _request(script, playlist=config.LIBRARY_PLAYLIST,
+            ids=list(persistent_ids), fields=list(fields))
+
+    return from_rows(fields, _convert_rows(fields, json.loads(out or "[]")))
+
+def play():
+    """
+    Play the current track.
+    """
+
+    return transport.run_steps(_play())
+
+def _play():
+    """
+    The requests of `play`.
+    """
+
+    yield ('Application("iTunes").play();', transport.JAVASCRIPT)
+
+def pause():
+    """
+    Pause the current track.
+    """
+
+    return transport.run_steps(_pause())
+
+def _pause():
+    """
+    The requests of `pause`.
+    """
+
+    yield ('Application("iTunes").pause();', transport.JAVASCRIPT)
+
+def playpause():
+    """
+    Toggle play state of iTunes.
+    """
+
+    return transport.run_steps(_playpause())
+
+def _playpause():
+    """
+    The requests of `playpause`.
+    """
+
+    yield ('Application("iTunes").playpause();', transport.JAVASCRIPT)
+
+def play_track(title, persistent_id=None):
+    """
+    Play the track indicated by `title`, or by `persistent_id` if given.
+
+    Parameters
+    ----------
+    title : str
+        The title of the track to play.
+    persistent_id : str, optional
+        The persistent ID of the track to play (default None).
+
+    Raises
+    ------
+    TrackError
+        If `track` cannot be played.
+    """
+
+    return transport.run_steps(_play_track(title, persistent_id))
+
+def _play_track(title, persistent_id=None):
+    """
+    The requests of `play_track`.
+    """
+
+    script = """
+    var found = app.libraryPlaylists[0].tracks.whose({name: args.title})();
+    if (found.length === 0) {
+        throw new Error("No track named " + args.title);
+    }
+    app.play(found[0]);
+    """
+
+    id_script = """
+    var found = app.libraryPlaylists[0].tracks.whose(
+        {persistentID: args.pid})();
+    if (found.length === 0) {
+        throw new Error("No track with ID " + args.pid);
+    }
+    app.play(found[0]);
+    """
+
+    try:
+        if persistent_id is not None:
+            yield _request(id_script, title=title, pid=persistent_id)
+        else:
+            yield _request(script, title=title)
+    except AppleScriptError as ae:
+        raise TrackError("No track named: {0}".format(title), title)
+
+def _script(body, **args):
+    """
+    Put the prelude and the JSON-encoded `args` in front of `body`.
+    """
+
+    return "var args = {0};\n{1}\n{2}".format(json.dumps(args), _PRELUDE,
+            body)
+
+def _request(body, **args):
+    """
+    Return the request (see `transport.run_steps`) that runs `_script(body,
+    **args)`.
+    """
+
+    return (_script(body, **args), transport.JAVASCRIPT)
+
+def run_javascript(script):
+    """
+    Run the given piece of JavaScript for Automation.
+
+    The script is run by the current transport (see transport.py).
+
+    Parameters
+    ----------
+    script : str
+        The JavaScript to run. The value of its last expression is the
+        response.
+
+    Returns
+    -------
+    str
+        The raw response from running `script`.
+
+    Raises
+    ------
+    AppleScriptError
+        If `script` causes any errors.
+    """
+
+    return transport.get_transport().run(script, transport.JAVASCRIPT)
+
+def parse_json_response(response):
+    """
+    Decode the JSON list of track records sent by a JXA script.
+
+    Parameters
+    ----------
+    response : str
+        The raw output of the script.
+
+    Returns
+    -------
+    list
+        A list of `Track` mappings (see tracks.py). Date properties are
+        converted to `datetime` objects.
+
+    Raises
+    ------
+    ValueError
+        If `response` is not valid JSON.
+    """
+
+    response = response.strip()
+
+    if not response:
+        return []
+
+    track_list = json.loads(response)
+
+    if isinstance(track_list, dict):
+        track_list = [track_list]
+
+    return from_records(_convert_dates(track_list))
+
+def _convert_dates(track_list):
+    """
+    Convert the date properties of each track from epoch seconds to datetime.
+    """
+
+    fromtimestamp = datetime.fromtimestamp
+
+    for track in track_list:
+        for key in DATE_KEYS:
+            value = track.get(key)
+            if value is not None:
+                track[key] = fromtimestamp(value)
+
+    return track_list
+
+def _convert_rows(fields, rows):
+    """
+    Convert the date columns of rows of values in `fields` order.
+    """
+
+    dates = [i for i, field in enumerate(fields) if field in DATE_KEYS]
+
+    if not dates:
+        return rows
+
+    fromtimestamp = datetime.fromtimestamp
+
+    for row in rows:
+        for i in dates:
+            if row[i] is not None:
+                row[i] = fromtimestamp(row[i])
+
+    return rows
+
+def _convert_columns(fields, columns):
+    """
+    Convert the date columns of a list of columns in `fields` order.
+    """
+
+    fromtimestamp = datetime.fromtimestamp
+
+    for i, field in enumerate(fields):
+        if field in DATE_KEYS and i < len(columns):
+            columns[i] = [None if value is None else fromtimestamp(value) for
+                    value in columns[i]]
+
+    return columns
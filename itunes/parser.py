@@ -0,0 +1,492 @@
+"""
+parser.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements the parser for the `-ss` ("source") form of AppleScript
+results printed by `osascript`.
+
+The parser works in a single pass over the response: a tokenizer splits the
+text into items (an optional key plus a value or an opening brace), and a
+stack-based parser assembles those items into (possibly nested) Python lists
+and dictionaries. The cost is linear in the length of the response.
+
+Long lists of records (a whole library) are split at record boundaries and
+the pieces are parsed in parallel by a pool of processes (see
+`parse_parallel`).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import functools
+import multiprocessing
+import os
+import re
+import threading
+
+from . import config
+from .tracks import from_raw_records, from_rows
+
+# each match of `_ITEM_REGEX` is one item of a list or record: an optional
+# key, then either an opening brace or a scalar value, then any closing braces
+# and the separating comma. Bare words never start or end with whitespace, so
+# they cover multi-word constants (`missing value`) and keys (`date added`).
+_BARE = r'[^{}",:|«\s](?:[^{}",:|«]*[^{}",:|«\s])?'
+_STRING = r'"(?:[^"\\]|\\.)*"'
+_ITEM_REGEX = re.compile(r'''
+    \s*
+    (?:(?P<key>\|[^|]*\||{bare})\s*:\s*)?
+    (?:
+        (?P<open>\{{)
+      | (?P<value>{string}|«[^»]*»|{bare}(?:\s*{string})?)
+    )?
+    \s*
+    (?P<close>(?:\}}\s*)*)
+    (?P<comma>,?)
+'''.format(bare=_BARE, string=_STRING), re.VERBOSE | re.DOTALL)
+
+# each match of `_RECORD_REGEX` is one record of a list (with up to two
+# levels of lists or records nested in it) and the comma after it. It only
+# finds the record's extent, to split a response between processes. The
+# loops are unrolled (text, then any number of string/raw/nested items each
+# followed by text), so a malformed record fails without backtracking.
+_TEXT = r'[^{}"«]*'
+_ATOM = r'"[^"\\]*(?:\\.[^"\\]*)*"|«[^»]*»'
+_NESTED = r'\{' + _TEXT + r'(?:(?:' + _ATOM + r')' + _TEXT + r')*\}'
+_NESTED = r'\{' + _TEXT + r'(?:(?:' + _ATOM + '|' + _NESTED + r')' + _TEXT + \
+        r')*\}'
+_RECORD_REGEX = re.compile(r'\s*(\{' + _TEXT + r'(?:(?:' + _ATOM + '|' +
+    _NESTED + r')' + _TEXT + r')*\})\s*(?:,|\Z)', re.DOTALL)
+
+_ESCAPE_REGEX = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+_INT_REGEX = re.compile(r'-?\d+$')
+_FLOAT_REGEX = re.compile(r'-?\d+(?:\.\d+)?(?:E[+-]?\d+)?$')
+
+DATE_FORMAT = "%A, %B %d, %Y at %I:%M:%S %p" # wkday, m d, y at time
+
+"""Responses at least this long (in characters) are parsed in parallel, when
+`config.PARSE_WORKERS` allows it. About 4000 tracks with all their
+properties; below that, starting the work in other processes costs more than
+it saves."""
+PARALLEL_THRESHOLD = 4 * 2**20
+
+def parse_response(response):
+    """
+    Parse the result of an applescript call into a list of track records.
+
+    Parameters
+    ----------
+    response : str
+        A string containing the unprocessed applescript output. This should
+        be either a single record or a list of records.
+
+    Returns
+    -------
+    list
+        A list of `Track` mappings (see tracks.py) which contain the
+        information in `response`. Values in each record are converted with
+        `parse_value` when they are first read, nested lists and records
+        become lists and dictionaries.
+
+    Raises
+    ------
+    ValueError
+        If a record is malformed or `response` is not a list of records.
+    """
+
+    if len(response) >= PARALLEL_THRESHOLD and _workers() > 1:
+        return parse_parallel(response)
+
+    return _parse_records(response)
+
+def parse_parallel(response, workers=None):
+    """
+    Parse a list of records like `parse_response`, in several processes.
+
+    `response` is split into one piece per worker, at record boundaries, and
+    the pieces are parsed by a (shared) pool of processes. The result is the
+    same as `parse_response`'s. Responses that can't be split (a single
+    record, or records nested too deeply) are parsed in this process.
+
+    Parameters
+    ----------
+    response : str
+        The unprocessed applescript output.
+    workers : int, optional
+        The number of processes to use. Defaults to `config.PARSE_WORKERS`.
+
+    Returns
+    -------
+    list
+        A list of `Track` mappings, in the order of `response`.
+
+    Raises
+    ------
+    ValueError
+        If a record is malformed or `response` is not a list of records.
+    """
+
+    if workers is None:
+        workers = _workers()
+
+    shards = split_records(response, workers) if workers > 1 else None
+
+    if not shards or len(shards) == 1:
+        return _parse_records(response)
+
+    track_list = []
+    for shard in _pool(workers).map(_parse_records, shards):
+        track_list.extend(shard)
+
+    return track_list
+
+def split_records(response, count):
+    """
+    Split a list of records in `-ss` form into (at most) `count` lists.
+
+    The lists hold consecutive records and have about the same length.
+
+    Parameters
+    ----------
+    response : str
+        The unprocessed applescript output.
+    count : int
+        The number of lists wanted.
+
+    Returns
+    -------
+    list or None
+        The lists, in `-ss` form and in order, or None if `response` isn't a
+        list of records that can be split.
+    """
+
+    start = response.find("{")
+    end = response.rfind("}")
+
+    if start < 0 or response[:start].strip() or response[end + 1:].strip():
+        return None
+
+    match = _RECORD_REGEX.match
+    size = (end - start) / count
+    shards = []
+    first = pos = start + 1
+
+    while pos < end:
+        record = match(response, pos, end)
+
+        if record is None:
+            return None
+
+        pos = record.end()
+
+        if pos - first >= size or pos == end:
+            shards.append("{" + response[first:record.end(1)].lstrip() + "}")
+            first = pos
+
+    return shards or None
+
+def _parse_records(response):
+    """
+    Parse a list of records (or a single record) in this process.
+    """
+
+    # keep the source text of every value; each one is decoded (with
+    # `parse_value`) the first time it is read
+    value = parse_literal(response, decode=str)
+
+    if value is None:
+        return []
+
+    # a single record
+    if isinstance(value, dict):
+        return from_raw_records([value], parse_value)
+
+    if not isinstance(value, list) or not all(isinstance(record, dict) for
+            record in value):
+        raise ValueError("Response is not a list of records: {0}".format(
+            _shorten(response)))
+
+    return from_raw_records(value, parse_value)
+
+def _workers():
+    """
+    Return the number of processes that parse long responses.
+    """
+
+    return config.PARSE_WORKERS or os.cpu_count() or 1
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+def _pool(workers):
+    """
+    Return the (shared) pool of `workers` parsing processes.
+    """
+
+    global _executor, _executor_workers
+
+    with _executor_lock:
+        if _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+
+            # spawned, not forked: the caller may be running threads (and
+            # curses)
+            _executor = ProcessPoolExecutor(workers,
+                    multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+
+        return _executor
+
+def zip_columns(fields, columns):
+    """
+    Turn a list of columns into a list of records.
+
+    Parameters
+    ----------
+    fields : sequence
+        The name of each column.
+    columns : list
+        A list holding one list of values per field, as returned by a script
+        like `{name of tracks, artist of tracks}`. None (an empty response)
+        is treated as no records.
+
+    Returns
+    -------
+    list
+        A list of `Track` mappings, one per row, mapping each field to its
+        value.
+
+    Raises
+    ------
+    ValueError
+        If the number of columns doesn't match `fields` or the columns have
+        different lengths.
+    """
+
+    if not columns:
+        return []
+
+    if len(columns) != len(fields) or len(set(map(len, columns))) != 1:
+        raise ValueError("Columns don't match fields: {0}".format(
+            ", ".join(fields)))
+
+    return from_rows(fields, zip(*columns))
+
+def parse_literal(response, decode=None):
+    """
+    Parse any AppleScript value in `-ss` form into an equivalent Python value.
+
+    Lists become Python lists, records become dictionaries and every other
+    value is handed to `decode`.
+
+    Parameters
+    ----------
+    response : str
+        The unprocessed applescript output.
+    decode : function, optional
+        The function used to convert the source text of a scalar value (e.g.
+        `"a string"`, `42` or `date "..."`) into a Python value. Defaults to
+        `parse_value`.
+
+    Returns
+    -------
+    <t>
+        The parsed value, or None if `response` is empty.
+
+    Raises
+    ------
+    ValueError
+        If `response` is malformed (unbalanced braces, a key with no value,
+        etc.).
+    """
+
+    if decode is None:
+        decode = parse_value
+
+    match = _ITEM_REGEX.match
+    root = []
+    container = root
+    stack = []
+    pos = 0
+    end = len(response)
+
+    while pos < end:
+        item = match(response, pos)
+
+        if item.end() == pos:
+            raise ValueError("Unable to parse response at: {0}".format(
+                _shorten(response[pos:])))
+
+        pos = item.end()
+        key, opened, value, closes, comma = item.groups()
+
+        if key is not None:
+            key = key.strip("|")
+
+            # the first key turns an (empty) list into a record
+            if type(container) is list:
+                if container or container is root:
+                    raise ValueError("Unexpected key: {0}".format(key))
+                container = {}
+
+        elif type(container) is dict and (opened or value is not None):
+            raise ValueError("Record item has no key")
+
+        if opened:
+            stack.append((container, key))
+            container = []
+
+        elif value is not None:
+            if key is None:
+                container.append(decode(value))
+            else:
+                container[key] = decode(value)
+
+        elif key is not None:
+            raise ValueError("Missing value for key: {0}".format(key))
+
+        for _ in range(closes.count("}") if closes else 0):
+            if not stack:
+                raise ValueError("Unbalanced braces in response")
+
+            value = container
+            container, key = stack.pop()
+
+            if key is None:
+                container.append(value)
+            else:
+                container[key] = value
+
+        # items must be separated by commas
+        if not (comma or opened) and pos < end:
+            raise ValueError("Unable to parse response at: {0}".format(
+                _shorten(response[pos:])))
+
+    if stack:
+        raise ValueError("Unbalanced braces in response")
+
+    if not root:
+        return None
+
+    if len(root) > 1:
+        raise ValueError("More than one value in response")
+
+    return root[0]
+
+def parse_value(str_value):
+    """
+    Parse a string (from AppleScript response) into an equivalent Python type.
+
+    This function parses a string into whatever Python type it looks most like.
+    The patters it checks are based on what AppleScript spits out when it
+    returns responses. It currently supports str, int, float, bool, date, and
+    None.
+
+    Parameters
+    ----------
+    str_value : str
+        A string containing the value to be parsed.
+
+    Returns
+    -------
+    <t>
+        A Python type (int, float, bool, etc) with the same value as
+        `str_value`. If no suitable match is found, `str_value` is returned.
+    """
+
+    # quoted strings are by far the most common value
+    if str_value[:1] == '"' and str_value[-1:] == '"' and len(str_value) > 1:
+        return unquote(str_value) or None
+
+    # check for None, int, float, bool, and date
+    if (not str_value or str_value == "missing value" or str_value == "none"):
+        result = None
+
+    elif str_value.isdigit():
+        result = int(str_value)
+
+    elif str_value == "true" or str_value == "false":
+        result = True if str_value == "true" else False
+
+    elif _INT_REGEX.match(str_value):
+        result = int(str_value)
+
+    elif _FLOAT_REGEX.match(str_value):
+        result = float(str_value)
+
+    elif str_value.startswith("date"):
+        open_quote = str_value.find('"')
+        close_quote = str_value.rfind('"')
+
+        # make sure there are quotes around the date
+        if open_quote != -1 and close_quote > open_quote:
+            result = parse_date(str_value[open_quote + 1:close_quote])
+        else:
+            result = str_value
+
+    elif str_value.endswith('"') and '"' in str_value[:-1]:
+        # other tagged literals (file "...", alias "..."): keep the text
+        result = unquote(str_value[str_value.find('"'):])
+
+    else:
+        result = str_value
+
+    return result
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(date_str):
+    """
+    Parse the text of an AppleScript date literal.
+
+    Results are cached: many tracks share dates (e.g. everything imported at
+    once), and `strptime` is slow.
+
+    Parameters
+    ----------
+    date_str : str
+        The text between the quotes of a `date "..."` literal.
+
+    Returns
+    -------
+    datetime.datetime
+        The date represented by `date_str`.
+    """
+
+    return datetime.strptime(date_str, DATE_FORMAT)
+
+def unquote(quoted):
+    """
+    Remove the quotes around an AppleScript string literal and unescape it.
+
+    Parameters
+    ----------
+    quoted : str
+        The string literal, including its surrounding double quotes.
+
+    Returns
+    -------
+    str
+        The contents of the string literal.
+    """
+
+    text = quoted[1:-1]
+
+    if "\\" in text:
+        text = _ESCAPE_REGEX.sub(_unescape_char, text)
+
+    return text
+
+def _unescape_char(match):
+    char = match.group(1)
+    return _ESCAPES.get(char, char)
+
+def _shorten(text, max_len=80):
+
+    if len(text) > max_len:
+        return text[:max_len] + "..."
+    return text
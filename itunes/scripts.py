@@ -0,0 +1,298 @@
+"""
+scripts.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements parameterized AppleScript. A `Template` is a script whose
+parameters are passed to its `on run argv` handler instead of being pasted
+into its source, so user input can't break (or change) the script, and the
+source is the same for every call. That lets it be compiled once, with
+`osacompile`, into a `.scpt` file that osascript runs without compiling it
+again.
+
+Compiled scripts are kept in `config.SCRIPT_CACHE`, named after a hash of
+their source: changing a template changes its file name, so a stale compiled
+script is never run. Files that haven't been used for `PRUNE_AGE` seconds are
+deleted.
+
+Transports that can only send source text use `Script.inline`, which puts the
+parameters into the source as quoted literals.
+"""
+
+from subprocess import Popen, PIPE, DEVNULL
+import functools
+import glob
+import hashlib
+import os
+import threading
+import time
+
+from . import config
+from .exceptions import AppleScriptError
+
+"""Kinds of parameters: a string, an integer and a list of strings. A list
+parameter takes the rest of `argv`, so it has to be the last one."""
+TEXT = "text"
+INTEGER = "integer"
+LIST = "list"
+
+"""Part of every template's hash; bump it to recompile every script."""
+FORMAT_VERSION = "1"
+
+"""Compiled scripts unused for this long (in seconds) are deleted."""
+PRUNE_AGE = 30 * 24 * 60 * 60
+
+class Template(object):
+    """
+    An AppleScript that takes its parameters through `argv`.
+
+    Parameters
+    ----------
+    body : str
+        The script, with a `str.format` field for every parameter (e.g.
+        `play track {trackTitle}`). Literal braces are written `{{` and `}}`.
+    params : sequence, optional
+        `(name, kind)` pairs, in `argv` order. `kind` is `TEXT`, `INTEGER` or
+        `LIST`. Names become AppleScript variables, so they must not clash
+        with iTunes' terms (use `trackTitle`, not `name`).
+
+    Attributes
+    ----------
+    source : str
+        The script run by osascript: `body` inside an `on run argv` handler.
+    digest : str
+        A hash of `source`, which names the compiled script.
+    """
+
+    def __init__(self, body, params=()):
+
+        self.body = body
+        self.params = tuple(params)
+
+        lines = ["on run argv"]
+
+        for i, (name, kind) in enumerate(self.params, 1):
+            if kind == LIST:
+                item = "items {0} thru -1 of argv"
+            elif kind == INTEGER:
+                item = "(item {0} of argv) as integer"
+            else:
+                item = "item {0} of argv"
+            lines.append("set {0} to {1}".format(name, item.format(i)))
+
+        lines.append(body.format(**{name: name for name, _ in self.params}))
+        lines.append("end run")
+
+        self.source = "\n".join(lines)
+        self.digest = hashlib.sha1((FORMAT_VERSION + self.source).encode(
+            "utf-8")).hexdigest()
+
+    def bind(self, **values):
+        """
+        Return a `Script` that runs this template with `values`.
+
+        Raises
+        ------
+        KeyError
+            If a parameter has no value.
+        """
+
+        return Script(self, values)
+
+class Script(object):
+    """
+    A template together with the values of its parameters.
+
+    Attributes
+    ----------
+    template : Template
+        The script to run.
+    values : dict
+        Maps parameter names to their values.
+    """
+
+    def __init__(self, template, values):
+
+        self.template = template
+        self.values = {name: values[name] for name, _ in template.params}
+
+    @property
+    def argv(self):
+        """
+        The parameters as osascript arguments (a list of strings).
+        """
+
+        argv = []
+
+        for name, kind in self.template.params:
+            value = self.values[name]
+
+            if kind == LIST:
+                argv.extend(str(item) for item in value)
+            else:
+                argv.append(str(value))
+
+        return argv
+
+    def inline(self):
+        """
+        Return the source of the script with its parameters as literals.
+        """
+
+        literals = {}
+
+        for name, kind in self.template.params:
+            value = self.values[name]
+
+            if kind == LIST:
+                literals[name] = "{" + ", ".join(quote(str(item)) for item in
+                        value) + "}"
+            elif kind == INTEGER:
+                literals[name] = str(int(value))
+            else:
+                literals[name] = quote(str(value))
+
+        return self.template.body.format(**literals)
+
+@functools.lru_cache(maxsize=256)
+def template(body, params=(), **constants):
+    """
+    Return the (shared) template for `body`.
+
+    Parameters
+    ----------
+    body : str
+        The script, as for `Template`.
+    params : tuple, optional
+        The `(name, kind)` pairs of the parameters, as for `Template`.
+    **constants
+        Format fields of `body` filled in before the template is made (e.g.
+        the properties a projection fetches). They are part of the source,
+        so every set of constants is a separate template.
+
+    Returns
+    -------
+    Template
+        The template. Calls with the same arguments share it.
+    """
+
+    if constants:
+        # keep the parameters' fields (and literal braces) for Template
+        fields = {name: "{{{0}}}".format(name) for name, _ in params}
+        fields.update(constants)
+        body = body.replace("{{", "{{{{").replace("}}", "}}}}").format(
+                **fields)
+
+    return Template(body, params)
+
+def quote(text):
+    """
+    Return `text` as an AppleScript string literal.
+    """
+
+    text = text.replace("\\", "\\\\").replace('"', '\\"')
+    text = text.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+
+    return '"' + text + '"'
+
+_compiled = {}
+_pruned = False
+
+def compile_template(template, compiler=("osacompile",)):
+    """
+    Return the path of the compiled `template`, compiling it if needed.
+
+    Parameters
+    ----------
+    template : Template
+        The template to compile.
+    compiler : sequence, optional
+        The command that compiles a script, given osacompile's arguments
+        (`-o <file>`, `-e <line>`).
+
+    Returns
+    -------
+    str or None
+        The path of the `.scpt` file, or None if `config.SCRIPT_CACHE` is
+        empty.
+
+    Raises
+    ------
+    OSError
+        If the compiler cannot be run.
+    AppleScriptError
+        If `template` does not compile.
+    """
+
+    global _pruned
+
+    path = _compiled.get(template.digest)
+
+    if path is not None:
+        return path
+
+    if not config.SCRIPT_CACHE:
+        return None
+
+    os.makedirs(config.SCRIPT_CACHE, exist_ok=True)
+
+    if not _pruned:
+        _pruned = True
+        prune()
+
+    path = os.path.join(config.SCRIPT_CACHE, template.digest + ".scpt")
+
+    if os.path.exists(path):
+        # mark it as in use (see prune)
+        os.utime(path)
+    else:
+        # compile next to it, then rename, so no one runs a partial file
+        temp = os.path.join(config.SCRIPT_CACHE, "{0}.{1}.{2}.tmp.scpt".format(
+            template.digest, os.getpid(), threading.get_ident()))
+
+        command = list(compiler) + ["-o", temp]
+        for line in template.source.split("\n"):
+            command.append("-e")
+            command.append(line.strip())
+
+        call = Popen(command, stdin=DEVNULL, stdout=PIPE, stderr=PIPE)
+        out, err = call.communicate()
+
+        if call.returncode != 0:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise AppleScriptError("Error compiling script: {0}".format(
+                err.decode("utf-8")), template.source)
+
+        os.replace(temp, path)
+
+    _compiled[template.digest] = path
+    return path
+
+def prune(max_age=PRUNE_AGE):
+    """
+    Delete the compiled scripts that haven't been used for `max_age` seconds.
+
+    Returns
+    -------
+    int
+        The number of files deleted.
+    """
+
+    if not config.SCRIPT_CACHE:
+        return 0
+
+    deleted = 0
+    oldest = time.time() - max_age
+
+    for path in glob.glob(os.path.join(config.SCRIPT_CACHE, "*.scpt")):
+        try:
+            if os.path.getmtime(path) < oldest:
+                os.remove(path)
+                deleted += 1
+        except OSError:
+            # deleted by someone else
+            pass
+
+    return deleted
@@ -0,0 +1,415 @@
+"""
+store.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements the local library cache: an SQLite database of tracks
+(keyed by persistent ID) and playlist contents, so that playlists and searches
+can be served without asking iTunes, plus the sync engine that keeps it up to
+date.
+
+A sync fetches only the persistent IDs and modification dates of the whole
+library (one cheap column query), deletes tracks whose IDs are gone, and
+fetches the tracks that are new or whose modification date changed (or is
+not older than the newest one seen by the previous sync).
+"""
+
+from datetime import datetime
+import os
+import sqlite3
+
+from . import config, itunes
+from .index import SEARCH_FIELDS
+from .tracks import from_rows
+
+"""Track properties kept in the cache."""
+FIELDS = itunes.DEFAULT_FIELDS + ("genre", "composer", "modification date")
+
+"""If more tracks than this changed, a sync refetches the whole library with
+column queries instead of fetching the changed tracks one by one."""
+BULK_THRESHOLD = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    {columns},
+    search_text TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY ("persistent ID")
+);
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    persistent_id TEXT NOT NULL,
+    PRIMARY KEY (playlist, position)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+""".format(columns=", ".join('"{0}"'.format(field) for field in FIELDS))
+
+class SyncResult(object):
+    """
+    What a sync changed in the cache.
+
+    Attributes
+    ----------
+    added : int
+        The number of new tracks.
+    changed : int
+        The number of tracks whose modification date changed.
+    deleted : int
+        The number of deleted tracks.
+    updated : list
+        The persistent IDs of the tracks that were (re)fetched.
+    removed : list
+        The persistent IDs of the deleted tracks.
+    """
+
+    def __init__(self, added=0, changed=0, deleted=0, updated=(), removed=()):
+
+        self.added = added
+        self.changed = changed
+        self.deleted = deleted
+        self.updated = list(updated)
+        self.removed = list(removed)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.deleted)
+
+    def __str__(self):
+        return "+{0} ~{1} -{2}".format(self.added, self.changed, self.deleted)
+
+class LibraryStore(object):
+    """
+    An SQLite cache of the iTunes library.
+
+    A store (like its SQLite connection) must only be used by the thread
+    that created it; open another store on the same file for other threads.
+
+    Parameters
+    ----------
+    path : str, optional
+        The database file. Defaults to `config.CACHE_PATH`. `:memory:` gives
+        a private, temporary cache.
+    """
+
+    def __init__(self, path=None):
+
+        self.path = path or config.CACHE_PATH
+
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM tracks").fetchone()[0]
+
+    @property
+    def synced(self):
+        """
+        Whether the whole library has been synced at least once.
+        """
+
+        return self.get_meta("last_sync") is not None
+
+    def covers(self, fields):
+        """
+        Return whether the cache holds every property in `fields`.
+        """
+
+        return fields is not None and all(field in FIELDS for field in fields)
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?",
+                (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key, value):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    (key, value))
+
+    def modification_dates(self):
+        """
+        Return a dictionary mapping each cached persistent ID to the
+        modification date (in seconds since the epoch) of its track.
+        """
+
+        return dict(self.db.execute('SELECT "persistent ID", ' \
+            '"modification date" FROM tracks'))
+
+    def put_tracks(self, tracks):
+        """
+        Add tracks to the cache, replacing cached tracks with the same ID.
+
+        Parameters
+        ----------
+        tracks : iterable
+            Track dictionaries holding (at least) the properties in `FIELDS`.
+        """
+
+        placeholders = ", ".join("?" * (len(FIELDS) + 1))
+        rows = (_to_row(track) for track in tracks)
+
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO tracks VALUES " \
+                "({0})".format(placeholders), rows)
+
+    def delete_tracks(self, persistent_ids):
+        """
+        Remove tracks from the cache.
+        """
+
+        with self.db:
+            self.db.executemany('DELETE FROM tracks WHERE "persistent ID" = ?',
+                    ((pid,) for pid in persistent_ids))
+
+    def set_playlist(self, name, persistent_ids):
+        """
+        Store the contents of a playlist.
+
+        Parameters
+        ----------
+        name : str
+            The name of the playlist.
+        persistent_ids : sequence
+            The persistent IDs of its tracks, in iTunes' order.
+        """
+
+        with self.db:
+            self.db.execute("DELETE FROM playlist_tracks WHERE playlist = ?",
+                    (name,))
+            self.db.executemany("INSERT INTO playlist_tracks VALUES " \
+                "(?, ?, ?)", ((name, position, pid) for position, pid in
+                    enumerate(persistent_ids)))
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                    ("playlist:" + name, len(persistent_ids)))
+
+    def playlist(self, name, fields=itunes.DEFAULT_FIELDS):
+        """
+        Get the tracks of a cached playlist.
+
+        Parameters
+        ----------
+        name : str
+            The name of the playlist.
+        fields : sequence, optional
+            The track properties to return (default `itunes.DEFAULT_FIELDS`).
+
+        Returns
+        -------
+        list or None
+            The track dictionaries in iTunes' order, or None if the playlist
+            isn't cached (or some of its tracks are missing from the cache).
+        """
+
+        size = self.get_meta("playlist:" + name)
+
+        if size is None:
+            return None
+
+        rows = self.db.execute("SELECT {0} FROM playlist_tracks JOIN tracks " \
+            'ON persistent_id = "persistent ID" WHERE playlist = ? ORDER BY ' \
+            "position".format(_select(fields)), (name,)).fetchall()
+
+        if len(rows) != size:
+            return None
+
+        return _from_rows(fields, rows)
+
+    def tracks(self, persistent_ids, fields=FIELDS):
+        """
+        Get cached tracks by persistent ID.
+
+        Parameters
+        ----------
+        persistent_ids : iterable
+            The persistent IDs of the tracks.
+        fields : sequence, optional
+            The track properties to return (default `FIELDS`).
+
+        Returns
+        -------
+        list
+            The track dictionaries, in the order of `persistent_ids`. IDs that
+            aren't cached are left out.
+        """
+
+        query = 'SELECT {0} FROM tracks WHERE "persistent ID" = ?'.format(
+                _select(fields))
+        rows = (self.db.execute(query, (pid,)).fetchone() for pid in
+                persistent_ids)
+
+        return _from_rows(fields, [row for row in rows if row is not None])
+
+    def search(self, search_term, fields=itunes.DEFAULT_FIELDS):
+        """
+        Search the cached library.
+
+        Every word of `search_term` must appear (ignoring case) in the name,
+        album, artist, composer or genre of a track, like in iTunes.
+
+        Parameters
+        ----------
+        search_term : str
+            The string to search for.
+        fields : sequence, optional
+            The track properties to return (default `itunes.DEFAULT_FIELDS`).
+
+        Returns
+        -------
+        list
+            The matching track dictionaries, in library order.
+        """
+
+        words = search_term.lower().split()
+        conditions = " AND ".join(["instr(search_text, ?) > 0"] * len(words))
+
+        query = "SELECT {0} FROM playlist_tracks JOIN tracks ON " \
+            'persistent_id = "persistent ID" WHERE playlist = ? {1} ORDER BY ' \
+            "position".format(_select(fields), "AND " + conditions if words else
+                    "")
+
+        rows = self.db.execute(query, [config.LIBRARY_PLAYLIST] + words)
+
+        return _from_rows(fields, rows)
+
+def sync(store, full=False):
+    """
+    Bring the cached library up to date with iTunes.
+
+    Parameters
+    ----------
+    store : LibraryStore
+        The cache to update.
+    full : bool, optional
+        Whether to refetch every track, even unmodified ones (default False).
+
+    Returns
+    -------
+    SyncResult
+        The number of added, changed and deleted tracks.
+    """
+
+    library = config.LIBRARY_PLAYLIST
+    current = itunes.get_playlist(library, key=None, fields=("persistent ID",
+        "modification date"))
+    cached = store.modification_dates()
+    last_sync = store.get_meta("last_sync", 0.0)
+
+    ids = [track["persistent ID"] for track in current]
+    deleted = set(cached).difference(ids)
+
+    stale = []
+    added = changed = 0
+
+    for track in current:
+        pid = track["persistent ID"]
+        modified = _timestamp(track["modification date"])
+
+        if pid not in cached:
+            added += 1
+            stale.append(pid)
+        elif modified != cached[pid]:
+            changed += 1
+            stale.append(pid)
+        # dates only have a one second resolution, so tracks modified in the
+        # same second as the last sync are fetched again to be safe
+        elif full or modified >= last_sync:
+            stale.append(pid)
+
+    if len(stale) > BULK_THRESHOLD:
+        store.put_tracks(itunes.get_playlist(library, key=None, fields=FIELDS))
+    elif stale:
+        store.put_tracks(itunes.get_tracks(stale, FIELDS))
+
+    store.delete_tracks(deleted)
+    store.set_playlist(library, ids)
+
+    newest = max([_timestamp(track["modification date"]) for track in
+        current] + [last_sync])
+    store.set_meta("last_sync", newest)
+
+    return SyncResult(added, changed, len(deleted), stale, deleted)
+
+def sync_playlist(store, name):
+    """
+    Bring the cached contents of a playlist up to date with iTunes.
+
+    Only the persistent IDs of the playlist's tracks are fetched, plus any
+    tracks that aren't cached yet.
+
+    Parameters
+    ----------
+    store : LibraryStore
+        The cache to update.
+    name : str
+        The name of the playlist.
+
+    Returns
+    -------
+    bool
+        Whether the contents of the playlist changed.
+
+    Raises
+    ------
+    PlaylistError
+        If the playlist cannot be loaded.
+    """
+
+    ids = [track["persistent ID"] for track in itunes.get_playlist(name,
+        key=None, fields=("persistent ID",))]
+
+    cached = store.modification_dates()
+    missing = [pid for pid in ids if pid not in cached]
+
+    if missing:
+        store.put_tracks(itunes.get_tracks(missing, FIELDS))
+
+    old = store.db.execute("SELECT persistent_id FROM playlist_tracks WHERE " \
+        "playlist = ? ORDER BY position", (name,)).fetchall()
+
+    if [row[0] for row in old] == ids and store.get_meta("playlist:" + name) \
+            is not None:
+        return False
+
+    store.set_playlist(name, ids)
+    return True
+
+def _timestamp(date):
+    return date.timestamp() if date is not None else 0.0
+
+def _to_row(track):
+    row = [track.get(field) for field in FIELDS]
+    row[FIELDS.index("modification date")] = _timestamp(track.get(
+        "modification date"))
+    row.append("\n".join(track.get(field) or "" for field in
+        SEARCH_FIELDS).lower())
+    return row
+
+def _select(fields):
+    return ", ".join('tracks."{0}"'.format(field) for field in fields)
+
+def _from_rows(fields, rows):
+    if "modification date" not in fields:
+        return from_rows(fields, rows)
+
+    date = list(fields).index("modification date")
+    fromtimestamp = datetime.fromtimestamp
+    rows = [row[:date] + (fromtimestamp(row[date]) if row[date] else
+        row[date],) + row[date + 1:] for row in rows]
+
+    return from_rows(fields, rows)
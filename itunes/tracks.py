@@ -0,0 +1,313 @@
+"""
+tracks.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements the compact track records returned by the iTunes "API".
+
+A track fetched with all of its properties has about 60 of them. Held as a
+dictionary, each track carries its own hash table of keys; a `Track` instead
+holds a tuple of values and shares the key positions with every track that
+has the same properties. Values that repeat across the library (artist,
+album, genre, kind, ...) are interned, so each distinct string is stored
+once.
+
+A `Track` is a read-only mapping: `track["name"]`, `track.get("album")`,
+`"artist" in track` and `dict(track)` work as they do for a dictionary, and a
+track compares equal to a dictionary with the same items.
+
+Tracks made by `from_raw_records` keep the source text of their values and
+decode each one the first time it is read, so properties nobody looks at
+(most of the 60) are never decoded.
+"""
+
+from collections.abc import Mapping
+
+"""Properties whose values repeat across the library, and are interned."""
+INTERNED_FIELDS = ("album", "album artist", "artist", "category", "class",
+        "composer", "genre", "grouping", "kind", "media kind", "cloud status",
+        "rating kind", "album rating kind", "video kind", "sort album",
+        "sort album artist", "sort artist", "sort composer")
+
+class Track(Mapping):
+    """
+    A track record: a tuple of values and the shared positions of their keys.
+
+    Use `from_records`, `from_rows` or `from_raw_records` to make tracks; they
+    share the key positions between tracks with the same properties.
+
+    Parameters
+    ----------
+    keys : dict
+        Maps each property to the position of its value.
+    values : tuple or list
+        The values, in the order of `keys`. Values that haven't been decoded
+        yet are their source text (then `values` must be a list).
+    pending : int, optional
+        A bit mask of the positions that still hold source text (default 0).
+    decode : function, optional
+        Turns the source text of a value into the value.
+    """
+
+    __slots__ = ("_keys", "_values", "_pending", "_decode")
+
+    def __init__(self, keys, values, pending=0, decode=None):
+
+        self._keys = keys
+        self._values = values
+        self._pending = pending
+        self._decode = decode
+
+    def __getitem__(self, key):
+
+        position = self._keys[key]
+
+        if self._pending >> position & 1:
+            return self._load(position)
+        return self._values[position]
+
+    def get(self, key, default=None):
+
+        position = self._keys.get(key)
+
+        if position is None:
+            return default
+        if self._pending >> position & 1:
+            return self._load(position)
+        return self._values[position]
+
+    def _load(self, position):
+        """
+        Decode (and keep) the value at `position`.
+        """
+
+        value = self._decode(self._values[position])
+        self._values[position] = value
+        self._pending &= ~(1 << position)
+
+        # a tuple again once everything is decoded
+        if not self._pending:
+            self._values = tuple(self._values)
+
+        return value
+
+    def _load_all(self):
+        """
+        Decode every value that is still source text.
+        """
+
+        for position in range(len(self._values)):
+            if self._pending >> position & 1:
+                self._load(position)
+
+    def __contains__(self, key):
+
+        return key in self._keys
+
+    def __iter__(self):
+
+        return iter(self._keys)
+
+    def __len__(self):
+
+        return len(self._keys)
+
+    def __eq__(self, other):
+
+        if isinstance(other, Track) and other._keys is self._keys:
+            self._load_all()
+            other._load_all()
+            return self._values == other._values
+
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+
+        return "Track({0!r})".format(dict(self))
+
+    def __reduce__(self):
+
+        keys = _names.get(id(self._keys)) or tuple(self._keys)
+
+        # values that haven't been decoded travel as source text
+        if self._pending:
+            return (_rebuild, (keys, self._values, self._pending,
+                self._decode))
+        return (_rebuild, (keys, self._values))
+
+_schemas = {}
+
+# the keys of each schema's positions, by id (schemas live for the life of
+# the process); pickled tracks name their keys with the shared tuple
+_names = {}
+
+# distinct values of `INTERNED_FIELDS`; they are few (one per artist, album,
+# genre, ...), so they are kept for the life of the process
+_strings = {}
+
+def from_records(records):
+    """
+    Turn track dictionaries into tracks.
+
+    Parameters
+    ----------
+    records : iterable
+        Dictionaries mapping properties to values.
+
+    Returns
+    -------
+    list
+        A list of `Track` objects, in the order of `records`.
+    """
+
+    schemas = _schemas
+    track_list = []
+
+    for record in records:
+        keys = tuple(record)
+        schema = schemas.get(keys)
+
+        if schema is None:
+            schema = _schema(keys)
+
+        positions, interned = schema
+        values = tuple(record.values())
+
+        if interned:
+            values = _intern(values, interned)
+
+        track_list.append(Track(positions, values))
+
+    return track_list
+
+def from_raw_records(records, decode):
+    """
+    Turn records of source text into tracks that decode values when read.
+
+    Parameters
+    ----------
+    records : iterable
+        Dictionaries mapping properties to the source text of their values.
+        Nested lists and dictionaries are decoded right away.
+    decode : function
+        Turns the source text of a value into the value (e.g.
+        `parser.parse_value`).
+
+    Returns
+    -------
+    list
+        A list of `Track` objects, in the order of `records`.
+    """
+
+    schemas = _schemas
+    setdefault = _strings.setdefault
+    track_list = []
+
+    for record in records:
+        keys = tuple(record)
+        schema = schemas.get(keys)
+
+        if schema is None:
+            schema = _schema(keys)
+
+        positions, interned = schema
+        values = list(record.values())
+        pending = (1 << len(values)) - 1
+
+        if not all(type(value) is str for value in values):
+            for i, value in enumerate(values):
+                if type(value) is not str:
+                    values[i] = _decode_nested(value, decode)
+                    pending &= ~(1 << i)
+
+        # interned values are shared, so they are decoded now
+        for i in interned:
+            if pending >> i & 1:
+                value = decode(values[i])
+                values[i] = setdefault(value, value) if type(value) is str \
+                        else value
+                pending &= ~(1 << i)
+
+        track_list.append(Track(positions, values if pending else
+            tuple(values), pending, decode))
+
+    return track_list
+
+def from_rows(fields, rows):
+    """
+    Turn rows of values into tracks.
+
+    Parameters
+    ----------
+    fields : sequence
+        The property of each column.
+    rows : iterable
+        Sequences of values, in `fields` order.
+
+    Returns
+    -------
+    list
+        A list of `Track` objects, one per row.
+    """
+
+    positions, interned = _schemas.get(tuple(fields)) or _schema(tuple(
+        fields))
+
+    if interned:
+        return [Track(positions, _intern(tuple(row), interned)) for row in
+                rows]
+
+    return [Track(positions, tuple(row)) for row in rows]
+
+def _schema(keys):
+    """
+    Return (and remember) the key positions and interned positions of `keys`.
+    """
+
+    schema = ({key: i for i, key in enumerate(keys)}, tuple(i for i, key in
+        enumerate(keys) if key in INTERNED_FIELDS))
+    _schemas[keys] = schema
+    _names[id(schema[0])] = keys
+    return schema
+
+def _intern(values, interned):
+    """
+    Replace the values at the `interned` positions with their shared copies.
+    """
+
+    values = list(values)
+    setdefault = _strings.setdefault
+
+    for i in interned:
+        value = values[i]
+        if type(value) is str:
+            values[i] = setdefault(value, value)
+
+    return tuple(values)
+
+def _decode_nested(value, decode):
+    """
+    Decode the source text inside a nested list or dictionary.
+    """
+
+    if type(value) is str:
+        return decode(value)
+    if type(value) is list:
+        return [_decode_nested(item, decode) for item in value]
+    return {key: _decode_nested(item, decode) for key, item in value.items()}
+
+def _rebuild(keys, values, pending=0, decode=None):
+    """
+    Unpickle a track, sharing the key positions and strings of this process.
+    """
+
+    positions, interned = _schemas.get(keys) or _schema(keys)
+
+    if interned:
+        values = _intern(values, interned)
+
+    return Track(positions, list(values) if pending else values, pending,
+            decode)
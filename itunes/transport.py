@@ -0,0 +1,465 @@
+"""
+transport.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements the transports that carry scripts to iTunes. Every
+script the iTunes "API" runs goes through the current transport, so the
+program (and its tests and benchmarks) can run against a real osascript, a
+pool of persistent workers, or a fake iTunes (see fake.py).
+
+Transports are chosen with `config.TRANSPORT` or replaced at runtime with
+`set_transport`.
+
+The iTunes "API" is written as generators of script requests (see
+`run_steps`), so the same code runs blocking or under asyncio
+(see aio.py).
+"""
+
+import asyncio
+from subprocess import Popen, PIPE
+import threading
+
+from . import config, scripts, worker
+from .exceptions import AppleScriptError
+
+"""Languages a script can be written in."""
+APPLESCRIPT = "AppleScript"
+JAVASCRIPT = "JavaScript"
+
+class Transport(object):
+    """
+    Base class for transports.
+
+    A transport runs a script and returns its raw output: `-ss` source text
+    for AppleScript, whatever the script prints for JavaScript.
+    """
+
+    def run(self, script, language=APPLESCRIPT):
+        """
+        Run `script`.
+
+        Parameters
+        ----------
+        script : str
+            The script to run.
+        language : str, optional
+            The language `script` is written in, `APPLESCRIPT` (the default)
+            or `JAVASCRIPT`.
+
+        Returns
+        -------
+        str
+            The raw response from running `script`.
+
+        Raises
+        ------
+        AppleScriptError
+            If `script` causes any errors.
+        """
+
+        raise NotImplementedError
+
+    async def run_async(self, script, language=APPLESCRIPT):
+        """
+        Run `script` without blocking the event loop.
+
+        Takes the same parameters, and returns and raises the same as `run`.
+        By default `run` is called in the loop's default executor, so
+        cancelling the call stops waiting for it but not the script itself.
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, script, language)
+
+    def run_script(self, script):
+        """
+        Run a parameterized AppleScript (see scripts.py).
+
+        By default its source is run with the parameters inlined.
+
+        Parameters
+        ----------
+        script : scripts.Script
+            The template and its parameters.
+
+        Returns
+        -------
+        str
+            The raw response from running `script`.
+
+        Raises
+        ------
+        AppleScriptError
+            If `script` causes any errors.
+        """
+
+        return self.run(script.inline())
+
+    async def run_script_async(self, script):
+        """
+        Like `run_script`, without blocking the event loop.
+        """
+
+        return await self.run_async(script.inline())
+
+    def close(self):
+        """
+        Release any resources (processes, etc.) held by the transport.
+        """
+
+        pass
+
+class SpawnTransport(Transport):
+    """
+    Runs every script in a new osascript process.
+
+    Parameterized scripts are compiled once (see scripts.py) and their
+    parameters are passed as arguments, so osascript doesn't compile them
+    again. Without a compiler they are sent as `-e` lines, still with their
+    parameters as arguments.
+
+    Parameters
+    ----------
+    command : list, optional
+        The program to run instead of `osascript`. It is given osascript's
+        arguments (`-ss`, `-l JavaScript`, `-e <line>`, a compiled script,
+        script arguments).
+    compiler : list, optional
+        The program that compiles scripts, given osacompile's arguments.
+        Defaults to `osacompile` when `command` is osascript, and to no
+        compiler otherwise.
+    """
+
+    def __init__(self, command=None, compiler=None):
+
+        self.command = list(command or ["osascript"])
+
+        if compiler is None and command is None:
+            compiler = ["osacompile"]
+        self.compiler = compiler
+
+    def run(self, script, language=APPLESCRIPT):
+
+        return self._spawn(self._command(script, language), script)
+
+    async def run_async(self, script, language=APPLESCRIPT):
+
+        return await self._spawn_async(self._command(script, language),
+                script)
+
+    def run_script(self, script):
+
+        return self._spawn(self._script_command(script),
+                script.template.source)
+
+    async def run_script_async(self, script):
+
+        # compiling blocks, but only the first time a template is used
+        return await self._spawn_async(self._script_command(script),
+                script.template.source)
+
+    def _spawn(self, command, script):
+        """
+        Run `command` and return its output.
+        """
+
+        call = Popen(command, stdin=PIPE, stdout=PIPE, stderr=PIPE)
+
+        out, err = call.communicate()
+
+        return self._result(script, out, err)
+
+    async def _spawn_async(self, command, script):
+        """
+        Like `_spawn`, with `asyncio.create_subprocess_exec`.
+        """
+
+        call = await asyncio.create_subprocess_exec(*command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+        try:
+            out, err = await call.communicate()
+        except asyncio.CancelledError:
+            # don't leave the script running after nobody wants its result
+            if call.returncode is None:
+                call.kill()
+                await call.wait()
+            raise
+
+        return self._result(script, out, err)
+
+    def _script_command(self, script):
+        """
+        Return the command line that runs the parameterized `script`.
+        """
+
+        path = None
+
+        if self.compiler:
+            try:
+                path = scripts.compile_template(script.template, self.compiler)
+            except OSError:
+                # no osacompile here; send the source from now on
+                self.compiler = None
+
+        if path is None:
+            return self._command(script.template.source, APPLESCRIPT) + \
+                    ["--"] + script.argv
+
+        return self.command + ["-ss", "--", path] + script.argv
+
+    def _command(self, script, language):
+        """
+        Return the command line that runs `script`.
+        """
+
+        if language == APPLESCRIPT:
+            # -ss flag for JSON-like form
+            command = self.command + ["-ss"]
+
+            # break script up into different lines
+            for line in script.split('\n'):
+                command.append('-e')
+                command.append(line.strip())
+        else:
+            command = self.command + ["-l", language, "-e", script]
+
+        return command
+
+    def _result(self, script, out, err):
+        """
+        Decode the output of a finished osascript, raising for any errors.
+        """
+
+        out = out.decode("utf-8")
+        err = err.decode("utf-8")
+
+        if err:
+            raise AppleScriptError("Error parsing script: {0}".format(err),
+                    script)
+
+        return out
+
+class WorkerTransport(Transport):
+    """
+    Runs AppleScript on the shared pool of persistent workers (see worker.py).
+
+    JavaScript, and AppleScript while no worker can be started, is run by
+    `fallback`.
+
+    Parameters
+    ----------
+    fallback : Transport, optional
+        The transport to use when the workers can't. Defaults to a
+        `SpawnTransport`.
+    """
+
+    def __init__(self, fallback=None):
+
+        self.fallback = fallback or SpawnTransport()
+
+    def run(self, script, language=APPLESCRIPT):
+
+        if language == APPLESCRIPT:
+            try:
+                return worker.get_pool().run(script)
+            except OSError:
+                # no worker available, fall back to a process per script
+                pass
+
+        return self.fallback.run(script, language)
+
+    async def run_async(self, script, language=APPLESCRIPT):
+
+        if language == APPLESCRIPT:
+            loop = asyncio.get_running_loop()
+
+            try:
+                return await loop.run_in_executor(None, worker.get_pool().run,
+                        script)
+            except OSError:
+                pass
+
+        return await self.fallback.run_async(script, language)
+
+    def run_script(self, script):
+
+        # workers take source text, so the parameters are inlined
+        try:
+            return worker.get_pool().run(script.inline())
+        except OSError:
+            return self.fallback.run_script(script)
+
+    async def run_script_async(self, script):
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            return await loop.run_in_executor(None, worker.get_pool().run,
+                    script.inline())
+        except OSError:
+            return await self.fallback.run_script_async(script)
+
+    def close(self):
+
+        worker.close_pool()
+        self.fallback.close()
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def make_transport(name=None):
+    """
+    Create the transport called `name`.
+
+    Parameters
+    ----------
+    name : str, optional
+        One of `config.TRANSPORTS`. Defaults to `config.TRANSPORT`.
+
+    Returns
+    -------
+    Transport
+        The new transport.
+
+    Raises
+    ------
+    ValueError
+        If `name` is not a known transport.
+    """
+
+    if name is None:
+        name = config.TRANSPORT
+
+    if name == "worker" and config.WORKERS > 0:
+        return WorkerTransport()
+
+    if name == "worker" or name == "spawn":
+        return SpawnTransport()
+
+    if name == "fake":
+        from .fake import FakeITunes
+        return FakeITunes(config.FAKE_TRACKS, latency=config.FAKE_LATENCY,
+                jitter=config.FAKE_JITTER)
+
+    raise ValueError("Unknown transport: {0} (expected one of {1})".format(
+        name, ", ".join(config.TRANSPORTS)))
+
+def get_transport():
+    """
+    Return the current transport, creating it from `config` if needed.
+    """
+
+    global _transport
+
+    with _transport_lock:
+        if _transport is None:
+            _transport = make_transport()
+
+        return _transport
+
+def set_transport(transport):
+    """
+    Replace the current transport.
+
+    The previous transport is closed. Passing None makes the next call to
+    `get_transport` create a new one from `config`.
+
+    Parameters
+    ----------
+    transport : Transport or None
+        The transport to use from now on.
+
+    Returns
+    -------
+    Transport or None
+        The previous transport.
+    """
+
+    global _transport
+
+    with _transport_lock:
+        previous, _transport = _transport, transport
+
+    if previous is not None and previous is not transport:
+        previous.close()
+
+    return previous
+
+def run_steps(steps):
+    """
+    Run the script requests of an "API" generator on the current transport.
+
+    `steps` yields `(script, language)` pairs or parameterized scripts (see
+    scripts.py); each is run and its output is sent back in, or its `AppleScriptError` is thrown in. The generator's
+    return value is the result.
+
+    Parameters
+    ----------
+    steps : generator
+        The requests to run.
+
+    Returns
+    -------
+    object
+        What `steps` returned.
+    """
+
+    try:
+        request = next(steps)
+
+        while True:
+            try:
+                out = _send(get_transport(), request)
+            except AppleScriptError as error:
+                request = steps.throw(error)
+            else:
+                request = steps.send(out)
+    except StopIteration as stop:
+        return stop.value
+
+async def run_steps_async(steps):
+    """
+    Like `run_steps`, but run each script with the transport's `run_async`.
+
+    If the caller is cancelled, the script in flight is cancelled too and
+    `steps` is closed.
+    """
+
+    try:
+        request = next(steps)
+
+        while True:
+            try:
+                out = await _send_async(get_transport(), request)
+            except AppleScriptError as error:
+                request = steps.throw(error)
+            else:
+                request = steps.send(out)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+def _send(transport, request):
+    """
+    Run a request of `run_steps` on `transport`.
+    """
+
+    if isinstance(request, tuple):
+        return transport.run(*request)
+
+    return transport.run_script(request)
+
+async def _send_async(transport, request):
+    """
+    Run a request of `run_steps_async` on `transport`.
+    """
+
+    if isinstance(request, tuple):
+        return await transport.run_async(*request)
+
+    return await transport.run_script_async(request)
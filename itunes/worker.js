@@ -0,0 +1,134 @@
+// worker.js
+//
+// Copyright © 2026 Alex Danoff. All Rights Reserved.
+// 2026-10-16
+//
+// Persistent AppleScript interpreter used by worker.py. Run it with
+// `osascript -l JavaScript worker.js`. It reads framed scripts from stdin,
+// runs them with OSAKit and writes framed results (in the same source form as
+// `osascript -ss`) to stdout. Compiled scripts are kept, so a script that is
+// sent again is not compiled again.
+
+ObjC.import("Foundation");
+ObjC.import("OSAKit");
+
+var MAX_COMPILED = 64;
+
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+var language = $.OSALanguage.languageForName("AppleScript");
+var compiled = {};
+var compiledCount = 0;
+
+function readLine() {
+    var chars = [];
+
+    while (true) {
+        var data = stdin.readDataOfLength(1);
+
+        if (data.length === 0) {
+            return null;
+        }
+
+        var c = $.NSString.alloc.initWithDataEncoding(data,
+            $.NSASCIIStringEncoding).js;
+
+        if (c === "\n") {
+            return chars.join("");
+        }
+        chars.push(c);
+    }
+}
+
+function readText(length) {
+    var data = $.NSMutableData.data;
+
+    while (data.length < length) {
+        var chunk = stdin.readDataOfLength(length - data.length);
+
+        if (chunk.length === 0) {
+            return null;
+        }
+        data.appendData(chunk);
+    }
+
+    return $.NSString.alloc.initWithDataEncoding(data,
+        $.NSUTF8StringEncoding).js;
+}
+
+function respond(id, status, text) {
+    var data = $(text).dataUsingEncoding($.NSUTF8StringEncoding);
+    var header = id + " " + status + " " + data.length + "\n";
+
+    stdout.writeData($(header).dataUsingEncoding($.NSUTF8StringEncoding));
+    stdout.writeData(data);
+}
+
+function errorMessage(error) {
+    var info = error[0];
+
+    if (info === undefined || info.isNil()) {
+        return "unknown error";
+    }
+
+    var message = info.objectForKey($.OSAScriptErrorMessageKey);
+
+    if (message.isNil()) {
+        message = info.objectForKey("NSAppleScriptErrorMessage");
+    }
+
+    return message.isNil() ? "unknown error" : message.js;
+}
+
+function execute(source) {
+    var error = Ref();
+    var script = compiled[source];
+
+    if (script === undefined) {
+        script = $.OSAScript.alloc.initWithSourceLanguage(source, language);
+
+        if (!script.compileAndReturnError(error)) {
+            return ["error", errorMessage(error)];
+        }
+
+        if (compiledCount >= MAX_COMPILED) {
+            compiled = {};
+            compiledCount = 0;
+        }
+        compiled[source] = script;
+        compiledCount += 1;
+    }
+
+    var display = Ref();
+    var result = script.executeAndReturnDisplayValueError(display, error);
+
+    if (result.isNil()) {
+        return ["error", errorMessage(error)];
+    }
+
+    if (display[0] === undefined || display[0].isNil()) {
+        return ["ok", ""];
+    }
+
+    return ["ok", display[0].string.js];
+}
+
+function run() {
+    while (true) {
+        var header = readLine();
+
+        if (header === null) {
+            return;
+        }
+
+        var parts = header.split(" ");
+        var source = readText(parseInt(parts[1], 10));
+
+        if (source === null) {
+            return;
+        }
+
+        var result = execute(source);
+        respond(parts[0], result[0], result[1]);
+    }
+}
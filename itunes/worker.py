@@ -0,0 +1,285 @@
+"""
+worker.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file implements persistent script workers. A worker is a long-lived
+interpreter process (by default `worker.js` run by osascript) that reads
+scripts from its stdin and writes the results to its stdout, so running a
+script no longer costs a process spawn and, for repeated scripts, a compile.
+
+Requests and responses are framed with a header line followed by the payload:
+
+    request:  <id> <length>\n<script>
+    response: <id> <status> <length>\n<result or error message>
+
+where `length` is the payload size in bytes (UTF-8) and `status` is `ok` or
+`error`. A response must carry the id of the request it answers.
+"""
+
+from subprocess import Popen, PIPE, DEVNULL
+import atexit
+import itertools
+import os
+import queue
+import shlex
+import threading
+
+from . import config
+from .exceptions import AppleScriptError, WorkerError
+
+"""The worker script run by osascript by default."""
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        "worker.js")
+
+class Worker(object):
+    """
+    A single persistent interpreter process.
+
+    The process is started on the first call to `run` and restarted by the
+    next call after it crashes. A worker runs one script at a time; use a
+    `WorkerPool` to run scripts concurrently.
+
+    Parameters
+    ----------
+    command : list
+        The command (program and arguments) that starts the interpreter.
+
+    Attributes
+    ----------
+    starts : int
+        The number of times the interpreter process has been started.
+    """
+
+    def __init__(self, command):
+
+        self.command = list(command)
+        self.process = None
+        self.starts = 0
+        self._ids = itertools.count(1)
+
+    def alive(self):
+        """
+        Return whether the interpreter process is running.
+        """
+
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Start the interpreter process, stopping any previous one.
+
+        Raises
+        ------
+        OSError
+            If the interpreter cannot be started.
+        """
+
+        self.stop()
+        self.process = Popen(self.command, stdin=PIPE, stdout=PIPE,
+                stderr=DEVNULL)
+        self.starts += 1
+
+    def stop(self):
+        """
+        Stop the interpreter process if it is running.
+        """
+
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        if process.poll() is None:
+            process.terminate()
+
+        process.wait()
+        process.stdout.close()
+
+    def run(self, script):
+        """
+        Run `script` in the interpreter.
+
+        Parameters
+        ----------
+        script : str
+            The script to run.
+
+        Returns
+        -------
+        tuple
+            The status (`ok` or `error`) and the payload of the response.
+
+        Raises
+        ------
+        WorkerError
+            If the interpreter dies or sends a malformed response. The process
+            is stopped, so the next call starts a fresh one.
+        OSError
+            If the interpreter cannot be started.
+        """
+
+        if not self.alive():
+            self.start()
+
+        request_id = next(self._ids)
+        data = script.encode("utf-8")
+
+        try:
+            self.process.stdin.write("{0} {1}\n".format(request_id,
+                len(data)).encode("ascii") + data)
+            self.process.stdin.flush()
+
+            header = self.process.stdout.readline().split()
+
+            if len(header) != 3:
+                raise WorkerError("Worker exited while running script",
+                        script)
+
+            response_id, status, length = header
+            length = int(length)
+            payload = self.process.stdout.read(length)
+
+            if int(response_id) != request_id or len(payload) != length:
+                raise WorkerError("Malformed response from worker", script)
+
+        except (OSError, ValueError) as error:
+            self.stop()
+            raise WorkerError("Worker failed: {0}".format(error), script)
+
+        except WorkerError:
+            self.stop()
+            raise
+
+        return status.decode("ascii"), payload.decode("utf-8")
+
+class WorkerPool(object):
+    """
+    A small pool of persistent workers.
+
+    Workers are started lazily, so the pool only grows to `size` processes if
+    that many scripts actually run at the same time. A script whose worker
+    crashes is retried once on a fresh process.
+
+    Parameters
+    ----------
+    command : list
+        The command that starts an interpreter.
+    size : int, optional
+        The maximum number of workers (default 2).
+    """
+
+    def __init__(self, command, size=2):
+
+        self.command = list(command)
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def run(self, script):
+        """
+        Run `script` on an idle worker, waiting for one if all are busy.
+
+        Parameters
+        ----------
+        script : str
+            The script to run.
+
+        Returns
+        -------
+        str
+            The result of the script.
+
+        Raises
+        ------
+        AppleScriptError
+            If the script fails, or its worker crashes twice in a row.
+        OSError
+            If a worker cannot be started.
+        """
+
+        worker = self._acquire()
+
+        try:
+            try:
+                status, payload = worker.run(script)
+            except WorkerError:
+                status, payload = worker.run(script)
+        finally:
+            self._idle.put(worker)
+
+        if status != "ok":
+            raise AppleScriptError("Error parsing script: {0}".format(payload),
+                    script)
+
+        return payload
+
+    def close(self):
+        """
+        Stop every worker in the pool.
+        """
+
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = Worker(self.command)
+                self._workers.append(worker)
+                return worker
+
+        return self._idle.get()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Return the shared worker pool, creating it from `config` if needed.
+
+    Returns
+    -------
+    WorkerPool
+        The pool used by `itunes.run_applescript`.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            if config.WORKER_COMMAND:
+                command = shlex.split(config.WORKER_COMMAND)
+            else:
+                command = ["osascript", "-l", "JavaScript", WORKER_SCRIPT]
+
+            _pool = WorkerPool(command, config.WORKERS)
+
+        return _pool
+
+def close_pool():
+    """
+    Stop the shared worker pool. A new one is created on the next use.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+atexit.register(close_pool)
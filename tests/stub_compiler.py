@@ -0,0 +1,38 @@
+"""
+stub_compiler.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+A stand-in for osacompile, so compiling scripts can be tested without macOS.
+It takes osacompile's `-o <file>` and `-e <line>` arguments and "compiles" the
+lines by writing them to the file as they are, which the fake iTunes can run.
+A line reading `syntax error` fails the compile.
+"""
+
+import sys
+
+def main():
+    args = sys.argv[1:]
+    output = None
+    lines = []
+
+    while args:
+        flag, value = args.pop(0), args.pop(0)
+
+        if flag == "-o":
+            output = value
+        elif flag == "-e":
+            lines.append(value)
+
+    if "syntax error" in lines:
+        sys.stderr.write("syntax error: Expected end of line.\n")
+        return 1
+
+    with open(output, "w", encoding="utf-8") as script_file:
+        script_file.write("\n".join(lines))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+stub_interpreter.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+A stand-in for the osascript worker that speaks the worker protocol, so the
+worker code can be tested without macOS. It answers every script with the
+script itself as an AppleScript string, except for these commands:
+
+    error         respond with an error
+    crash         exit without responding
+    crash once P  exit without responding unless the file P exists (and
+                  create it)
+    sleep S       wait S seconds, then respond with the process id
+    pid           respond with the process id
+"""
+
+import os
+import sys
+import time
+
+def main():
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    while True:
+        header = stdin.readline().split()
+
+        if not header:
+            return
+
+        request_id, length = header
+        script = stdin.read(int(length)).decode("utf-8")
+        status = b"ok"
+
+        if script == "error":
+            status, result = b"error", "stub error"
+        elif script == "crash":
+            os._exit(1)
+        elif script.startswith("crash once "):
+            marker = script[len("crash once "):]
+            if not os.path.exists(marker):
+                open(marker, "w").close()
+                os._exit(1)
+            result = "survived"
+        elif script.startswith("sleep "):
+            time.sleep(float(script[len("sleep "):]))
+            result = str(os.getpid())
+        elif script == "pid":
+            result = str(os.getpid())
+        else:
+            result = '"{0}"'.format(script.replace('"', '\\"'))
+
+        data = result.encode("utf-8")
+        stdout.write(request_id + b" " + status + b" " +
+                str(len(data)).encode("ascii") + b"\n" + data)
+        stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+test_aio.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the asyncio flavor of the iTunes "API" (itunes/aio.py).
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+
+from itunes import aio, config, itunes, transport
+from itunes.fake import FakeITunes
+from itunes.parser import parse_response
+from itunes.transport import SpawnTransport
+from itunes.exceptions import AppleScriptError, TrackError, PlaylistError
+
+FAKE_OSASCRIPT = [sys.executable, "-m", "itunes.fake", "--tracks", "50"]
+
+PLAYLIST_SCRIPT = 'tell application "iTunes"\n' \
+        'return properties of tracks in playlist named "Music"\nend tell'
+
+class AsyncTests(unittest.TestCase):
+    """
+    Test cases for the coroutines, checked against the blocking functions.
+    """
+
+    def setUp(self):
+        self.fake = FakeITunes(300)
+        transport.set_transport(self.fake)
+
+    def tearDown(self):
+        transport.set_transport(None)
+
+    def test_same_results(self):
+        for backend in config.BACKENDS:
+            old_backend, config.BACKEND = config.BACKEND, backend
+
+            try:
+                self.assertEqual(asyncio.run(aio.search("love", keys=["artist",
+                    "album"])), itunes.search("love", keys=["artist", "album"]))
+                self.assertEqual(asyncio.run(aio.get_playlist("Favorites",
+                    key="artist", fields=None)), itunes.get_playlist(
+                        "Favorites", key="artist", fields=None))
+            finally:
+                config.BACKEND = old_backend
+
+    def test_errors(self):
+        self.assertRaises(PlaylistError, asyncio.run, aio.get_playlist(
+            "No Such Playlist"))
+        self.assertRaises(TrackError, asyncio.run, aio.play_track(
+            "~~~~---`-`-`"))
+        self.assertRaises(AppleScriptError, asyncio.run, aio.run_applescript(
+            "not a script"))
+
+    def test_play_track(self):
+        title = self.fake.tracks[5]["name"]
+        asyncio.run(aio.play_track(title))
+        self.assertEqual(self.fake.state, "playing")
+
+    def test_cancel(self):
+        transport.set_transport(FakeITunes(300, latency=1))
+
+        async def cancelled():
+            task = asyncio.ensure_future(aio.search("love"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+            start = time.perf_counter()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return time.perf_counter() - start
+
+        self.assertLess(asyncio.run(cancelled()), 0.5)
+
+class SpawnTransportTests(unittest.TestCase):
+    """
+    Test cases for running spawned scripts under asyncio.
+    """
+
+    def test_run_async(self):
+        spawn = SpawnTransport(FAKE_OSASCRIPT)
+        out = asyncio.run(spawn.run_async(PLAYLIST_SCRIPT))
+        self.assertEqual(parse_response(out), parse_response(spawn.run(
+            PLAYLIST_SCRIPT)))
+        self.assertRaises(AppleScriptError, asyncio.run, spawn.run_async(
+            "not a script"))
+
+    def test_cancel_kills_process(self):
+        spawn = SpawnTransport(FAKE_OSASCRIPT + ["--latency", "5"])
+
+        async def cancelled():
+            task = asyncio.ensure_future(spawn.run_async(PLAYLIST_SCRIPT))
+            await asyncio.sleep(0.2)
+            task.cancel()
+
+            start = time.perf_counter()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return time.perf_counter() - start
+
+        self.assertLess(asyncio.run(cancelled()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
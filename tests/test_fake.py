@@ -0,0 +1,69 @@
+"""
+test_fake.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the fake iTunes and the transports that can reach it.
+"""
+
+import sys
+import time
+import unittest
+
+from itunes import config, transport
+from itunes.fake import FakeITunes
+from itunes.itunes import get_playlist, search
+from itunes.parser import parse_response
+from itunes.transport import SpawnTransport, make_transport
+from itunes.exceptions import AppleScriptError
+
+FAKE_OSASCRIPT = [sys.executable, "-m", "itunes.fake", "--tracks", "50"]
+
+class FakeITunesTests(unittest.TestCase):
+    """
+    Test cases for the fake iTunes.
+    """
+
+    def tearDown(self):
+        transport.set_transport(None)
+
+    def test_latency(self):
+        fake = FakeITunes(10, latency=0.05, jitter=0.01)
+        start = time.perf_counter()
+        fake.run('tell application "iTunes"\nplay\nend tell')
+        self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+        self.assertEqual(fake.calls, 1)
+
+    def test_same_tracks_for_both_backends(self):
+        fake = FakeITunes(100)
+        transport.set_transport(fake)
+        old_backend = config.BACKEND
+
+        try:
+            config.BACKEND = "jxa"
+            from_json = get_playlist("Favorites", key="name")
+            config.BACKEND = "applescript"
+            from_text = get_playlist("Favorites", key="name")
+        finally:
+            config.BACKEND = old_backend
+
+        self.assertEqual(from_json, from_text)
+
+    def test_spawned_executable(self):
+        spawn = SpawnTransport(FAKE_OSASCRIPT)
+        out = spawn.run('tell application "iTunes"\n' \
+            'return properties of tracks in playlist named "Music"\nend tell')
+        self.assertEqual(len(parse_response(out)), 50)
+        self.assertRaises(AppleScriptError, spawn.run, "not a script")
+
+    def test_make_transport(self):
+        old_tracks = config.FAKE_TRACKS
+        config.FAKE_TRACKS = 20
+        try:
+            transport.set_transport(make_transport("fake"))
+            self.assertEqual(len(search("")), 20)
+        finally:
+            config.FAKE_TRACKS = old_tracks
+
+        self.assertRaises(ValueError, make_transport, "telegraph")
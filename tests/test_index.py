@@ -0,0 +1,96 @@
+"""
+test_index.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the in-process search index (itunes/index.py).
+"""
+
+import unittest
+
+from itunes import transport
+from itunes.fake import FakeITunes, make_tracks, matches
+from itunes.index import SearchIndex
+from itunes.itunes import search
+
+"""Searches covering long and short words, case, punctuation and misses."""
+TERMS = ["love", "LOVE", "the national", "he", "a", "e l", "friend away",
+        "'", "just a friend", "blue 1", "tribe", "xyz", "", "  night  ",
+        "nat ional"]
+
+class SearchIndexTests(unittest.TestCase):
+    """
+    Test cases for the search index, checked against the fake iTunes' search.
+    """
+
+    def setUp(self):
+        self.tracks = make_tracks(500, nasty=True)
+        self.index = SearchIndex(self.tracks)
+
+    def expected(self, term, tracks=None):
+        words = term.lower().split()
+        return [track for track in tracks or self.tracks if matches(track,
+            words)]
+
+    def test_same_matches_as_itunes(self):
+        for term in TERMS:
+            self.assertEqual(self.index.search(term), self.expected(term),
+                    term)
+
+    def test_fields(self):
+        results = self.index.search("love", fields=("name", "artist"))
+        self.assertEqual(results, [{"name": track["name"], "artist":
+            track["artist"]} for track in self.expected("love")])
+
+    def test_update(self):
+        track = dict(self.tracks[3], name="Quixotic Zebra")
+        self.index.add([track])
+        self.tracks[3] = track
+
+        self.assertEqual(len(self.index), 500)
+        self.assertEqual(self.index.search("zebra"), [track])
+
+        for term in TERMS:
+            self.assertEqual(self.index.search(term), self.expected(term),
+                    term)
+
+    def test_add_and_remove(self):
+        new = dict(self.tracks[0], name="Quixotic Zebra")
+        new["persistent ID"] = "5A5AFFFFFFFFFFFF"
+        self.index.add([new])
+        self.index.remove([self.tracks[1]["persistent ID"], "unknown"])
+
+        tracks = [self.tracks[0]] + self.tracks[2:] + [new]
+
+        self.assertEqual(len(self.index), 500)
+        self.assertEqual(self.index.search("quixotic"), [new])
+
+        for term in TERMS:
+            self.assertEqual(self.index.search(term), self.expected(term,
+                tracks), term)
+
+    def test_itunes_search(self):
+        fake = FakeITunes(self.tracks)
+        transport.set_transport(fake)
+
+        fields = ("persistent ID", "name", "artist", "album")
+
+        try:
+            for term in TERMS:
+                results = search(term, keys=["artist", "album"], fields=fields,
+                        index=self.index)
+                self.assertEqual([{field: track[field] for field in fields} for
+                    track in results], search(term, keys=["artist", "album"],
+                        fields=fields))
+        finally:
+            transport.set_transport(None)
+
+    def test_covers(self):
+        self.assertTrue(self.index.covers(("name", "genre")))
+        self.assertFalse(self.index.covers(("name", "not a field")))
+        self.assertFalse(self.index.covers(None))
+        self.assertFalse(SearchIndex().covers(("name",)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,14 +10,27 @@ This file tests the functionality provided by the itunes module.
 import unittest
 from datetime import datetime
 
-from itunes.itunes import parse_value, run_applescript, play_track
-from itunes.exceptions import AppleScriptError, TrackError
+from itunes import config, transport
+from itunes.fake import FakeITunes
+from itunes.itunes import parse_value, run_applescript, play_track, search, \
+        get_playlist, playpause, iter_playlist, sort_tracks, DEFAULT_FIELDS
+from itunes.exceptions import AppleScriptError, TrackError, PlaylistError
 
 class ITunesTests(unittest.TestCase):
     """
     Test cases for iTunes functionality.
+
+    The tests run against a fake iTunes (see itunes/fake.py), so they don't
+    need macOS.
     """
 
+    def setUp(self):
+        self.fake = FakeITunes(300)
+        transport.set_transport(self.fake)
+
+    def tearDown(self):
+        transport.set_transport(None)
+
     def test_parse_value(self):
         self.assertEquals(parse_value("10"), 10)
         self.assertEquals(parse_value("1.0"), 1.0)
@@ -35,3 +48,67 @@ class ITunesTests(unittest.TestCase):
 
     def test_play_track(self):
         self.assertRaises(TrackError, play_track, "~~~~---`-`-`")
+
+    def test_play_track_by_id(self):
+        # two tracks with the same title: only the ID tells them apart
+        duplicate = self.fake.tracks[200]
+        duplicate["name"] = self.fake.tracks[100]["name"]
+
+        for backend in config.BACKENDS:
+            old_backend, config.BACKEND = config.BACKEND, backend
+
+            try:
+                play_track(duplicate["name"], duplicate["persistent ID"])
+                self.assertEqual(self.fake.current, 200)
+
+                # by title, the first track of that name plays
+                play_track(duplicate["name"])
+                self.assertLessEqual(self.fake.current, 100)
+
+                self.assertRaises(TrackError, play_track, "Nothing",
+                        "FFFFFFFFFFFFFFFF")
+            finally:
+                config.BACKEND = old_backend
+
+    def test_search(self):
+        results = search("love", keys=["artist"], fields=("name", "album",
+            "artist", "genre"))
+        self.assertTrue(results)
+        self.assertTrue(all("love" in " ".join(str(track[key]) for key in
+            ("name", "album", "artist", "genre")).lower() for track in results))
+        self.assertEqual([track["artist"] for track in results],
+                sorted(track["artist"] for track in results))
+
+    def test_get_playlist(self):
+        tracks = get_playlist("ITC", key="artist")
+        self.assertEqual(len(tracks), len(self.fake.playlists["ITC"]))
+        self.assertRaises(PlaylistError, get_playlist, "No Such Playlist")
+
+    def test_field_projection(self):
+        tracks = get_playlist("Favorites", key=None)
+        self.assertEqual(set(tracks[0]), set(DEFAULT_FIELDS))
+
+        full = get_playlist("Favorites", key=None, fields=None)
+        self.assertEqual([{key: track[key] for key in DEFAULT_FIELDS} for
+            track in full], tracks)
+
+        found = search("love", keys=[], fields=["name", "date added"])
+        self.assertEqual(found, [{"name": track["name"], "date added":
+            track["date added"]} for track in search("love", keys=[],
+                fields=None)])
+
+    def test_iter_playlist(self):
+        chunks = list(iter_playlist("Music", chunk_size=60))
+        self.assertEqual(len(chunks[0]), 60)
+        self.assertGreater(len(chunks), 1)
+
+        tracks = [track for chunk in chunks for track in chunk]
+        self.assertEqual(sort_tracks(tracks, "artist"), get_playlist("Music",
+            key="artist"))
+        self.assertRaises(PlaylistError, list, iter_playlist("No Such Playlist"))
+
+    def test_transport_controls(self):
+        play_track(self.fake.tracks[3]["name"])
+        self.assertEqual(self.fake.state, "playing")
+        playpause()
+        self.assertEqual(self.fake.state, "paused")
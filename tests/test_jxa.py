@@ -0,0 +1,56 @@
+"""
+test_jxa.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the JXA backend's response decoding.
+"""
+
+import time
+import unittest
+
+from itunes import config, itunes
+from itunes.jxa import parse_json_response
+from itunes.parser import parse_response
+from itunes.fake import make_tracks, format_response, \
+        format_json_response
+
+class JXATests(unittest.TestCase):
+    """
+    Test cases for the JXA backend.
+    """
+
+    def test_same_records_as_text_path(self):
+        tracks = make_tracks(200, nasty=True)
+
+        self.assertEqual(parse_json_response(format_json_response(tracks)),
+                parse_response(format_response(tracks)))
+
+    def test_empty_response(self):
+        self.assertEqual(parse_json_response("\n"), [])
+
+    def test_throughput(self):
+        tracks = make_tracks(5000)
+        text = format_response(tracks)
+        canned = format_json_response(tracks)
+
+        start = time.perf_counter()
+        parse_response(text)
+        text_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parse_json_response(canned)
+        json_time = time.perf_counter() - start
+
+        print("\n5000 tracks: text {0:.3f}s, json {1:.3f}s ({2:.0f} " \
+            "tracks/s)".format(text_time, json_time, len(tracks) / json_time))
+        self.assertLess(json_time, text_time)
+
+    def test_unknown_backend(self):
+        old_backend = config.BACKEND
+        config.BACKEND = "carrier pigeon"
+        try:
+            self.assertRaises(ValueError, itunes.play)
+        finally:
+            config.BACKEND = old_backend
@@ -0,0 +1,131 @@
+"""
+test_parser.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the `-ss` response parser.
+"""
+
+import pickle
+import unittest
+from datetime import datetime
+
+from itunes import parser
+from itunes.parser import parse_response, parse_literal, parse_value, \
+        zip_columns, parse_parallel, split_records
+from benchmarks import legacy
+from itunes.fake import make_tracks, format_response
+
+class ParserTests(unittest.TestCase):
+    """
+    Test cases for the response parser.
+    """
+
+    def test_matches_legacy_parser(self):
+        response = format_response(make_tracks(50))
+        self.assertEqual(parse_response(response),
+                legacy.parse_response(response))
+
+    def test_nasty_names(self):
+        tracks = make_tracks(30, nasty=True)
+        parsed = parse_response(format_response(tracks))
+
+        self.assertEqual(len(parsed), len(tracks))
+        for track, record in zip(tracks, parsed):
+            self.assertEqual(record["name"], track["name"])
+            self.assertEqual(record["date added"], track["date added"])
+
+    def test_nested_values(self):
+        response = ('{{name:"a {b}", kinds:{1, 2, {x:missing value}}, ' \
+            'empty:{}, |odd key|:none}}')
+        self.assertEqual(parse_response(response), [{"name": "a {b}",
+            "kinds": [1, 2, {"x": None}], "empty": [], "odd key": None}])
+
+    def test_single_and_empty(self):
+        self.assertEqual(parse_response('{name:"x"}\n'), [{"name": "x"}])
+        self.assertEqual(parse_response("{}"), [])
+        self.assertEqual(parse_response(""), [])
+        self.assertEqual(parse_literal('{"a", -2, 1.5E+3}'), ["a", -2, 1500.0])
+
+    def test_scalars(self):
+        self.assertEqual(parse_value('"say \\"hi\\" \\\\o/"'), 'say "hi" \\o/')
+        self.assertEqual(parse_value("file track"), "file track")
+        self.assertEqual(parse_value('date "Saturday, March 13, 2010 at ' \
+            '5:02:22 PM"'), datetime(2010, 3, 13, 17, 2, 22))
+
+    def test_malformed(self):
+        for response in ["{a:}", "{{a:1}", "{a:1}}", "{a:1, 2}", "a:1",
+                "{a:1 b:2}"]:
+            self.assertRaises(ValueError, parse_response, response)
+
+    def test_zip_columns(self):
+        columns = parse_literal('{{"a", "b"}, {1, 2}}')
+        self.assertEqual(zip_columns(["name", "id"], columns), [{"name": "a",
+            "id": 1}, {"name": "b", "id": 2}])
+        self.assertEqual(zip_columns(["name"], None), [])
+        self.assertRaises(ValueError, zip_columns, ["name"], columns)
+
+class ParallelTests(unittest.TestCase):
+    """
+    Test cases for splitting responses and parsing them in several processes.
+    """
+
+    def setUp(self):
+        self.response = format_response(make_tracks(300, nasty=True))
+
+    def test_split(self):
+        shards = split_records(self.response, 4)
+        self.assertEqual(len(shards), 4)
+
+        parsed = [record for shard in shards for record in
+                parse_literal(shard)]
+        self.assertEqual(parsed, parse_literal(self.response))
+
+    def test_split_nested(self):
+        response = ('{{name:"}, {", kinds:{1, {x:2}}}, {name:"{"}, ' \
+            '{name:«data utxt007D»}}')
+        self.assertEqual(split_records(response, 10), ['{{name:"}, {", ' \
+            'kinds:{1, {x:2}}}}', '{{name:"{"}}',
+            '{{name:«data utxt007D»}}'])
+
+    def test_unsplittable(self):
+        for response in ['{name:"x"}', "{}", "", "{{a:{{{1}}}}}", "{{a:1}",
+                "{{a:1}, 2}"]:
+            self.assertIsNone(split_records(response, 2))
+
+    def test_same_as_serial(self):
+        parsed = parse_parallel(self.response, workers=3)
+        self.assertTrue(parsed[-1]._pending)
+
+        self.assertEqual(parsed, parse_response(self.response))
+        self.assertEqual(parsed, parse_literal(self.response))
+
+        # tracks from other processes share this one's keys and strings
+        first, last = parsed[0], [track for track in parsed if
+                track["artist"] == parsed[0]["artist"]][-1]
+        self.assertIs(first._keys, last._keys)
+        self.assertIs(first["artist"], last["artist"])
+
+    def test_errors(self):
+        self.assertRaises(ValueError, parse_parallel, "{{a:1}, {b:}}",
+                workers=2)
+        self.assertEqual(parse_parallel('{name:"x"}', workers=2), [{"name":
+            "x"}])
+
+    def test_threshold(self):
+        old = parser.PARALLEL_THRESHOLD
+        parser.PARALLEL_THRESHOLD = 0
+
+        try:
+            self.assertEqual(parse_response(self.response), parse_literal(
+                self.response))
+        finally:
+            parser.PARALLEL_THRESHOLD = old
+
+    def test_pickle_pending(self):
+        tracks = parse_response(self.response)
+        copies = pickle.loads(pickle.dumps(tracks))
+
+        self.assertEqual(copies[0]._pending, tracks[0]._pending)
+        self.assertEqual(copies, tracks)
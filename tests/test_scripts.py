@@ -0,0 +1,174 @@
+"""
+test_scripts.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests parameterized and compiled AppleScript (itunes/scripts.py).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from itunes import config, itunes, scripts, transport
+from itunes.fake import FakeITunes, make_tracks
+from itunes.transport import SpawnTransport
+from itunes.exceptions import AppleScriptError
+
+FAKE_OSASCRIPT = [sys.executable, "-m", "itunes.fake", "--tracks", "50"]
+
+STUB_COMPILER = [sys.executable, os.path.join(os.path.dirname(__file__),
+    "stub_compiler.py")]
+
+"""Titles that would break (or change) a script pasted together with
+str.format."""
+NASTY_TITLES = ['Say "Hello", Goodbye', 'Back\\slash', 'Tabs\tand "quotes"',
+        '" & (do shell script "echo pwned") & "']
+
+class TemplateTests(unittest.TestCase):
+    """
+    Test cases for templates and their parameters.
+    """
+
+    def setUp(self):
+        self.template = scripts.template('tell playlist named {playlistName}\n'
+                'return {{tracks {firstIndex} thru {lastIndex}}}\nend tell',
+                itunes._RANGE)
+
+    def test_source(self):
+        self.assertEqual(self.template.source.split("\n"), [
+            "on run argv",
+            "set playlistName to item 1 of argv",
+            "set firstIndex to (item 2 of argv) as integer",
+            "set lastIndex to (item 3 of argv) as integer",
+            "tell playlist named playlistName",
+            "return {tracks firstIndex thru lastIndex}",
+            "end tell",
+            "end run"])
+
+    def test_bind(self):
+        script = self.template.bind(playlistName='My "Mix"', firstIndex=1,
+                lastIndex=50)
+
+        self.assertEqual(script.argv, ['My "Mix"', "1", "50"])
+        self.assertEqual(script.inline(), 'tell playlist named "My \\"Mix\\""'
+                '\nreturn {tracks 1 thru 50}\nend tell')
+        self.assertRaises(KeyError, self.template.bind, playlistName="Music")
+
+    def test_shared_and_hashed(self):
+        same = scripts.template(self.template.body, itunes._RANGE)
+        other = scripts.template(self.template.body + "\n", itunes._RANGE)
+
+        self.assertIs(same, self.template)
+        self.assertNotEqual(other.digest, self.template.digest)
+
+    def test_quote(self):
+        self.assertEqual(scripts.quote('a "b" \\ c\n'),
+                '"a \\"b\\" \\\\ c\\n"')
+
+class InjectionTests(unittest.TestCase):
+    """
+    Test cases for user input that contains AppleScript syntax.
+    """
+
+    def setUp(self):
+        tracks = make_tracks(50)
+        for track, title in zip(tracks, NASTY_TITLES):
+            track["name"] = title
+
+        self.fake = FakeITunes(tracks)
+        transport.set_transport(self.fake)
+
+    def tearDown(self):
+        transport.set_transport(None)
+
+    def test_play_track(self):
+        for i, title in enumerate(NASTY_TITLES):
+            itunes.play_track(title)
+            self.assertEqual(self.fake.current, i)
+
+    def test_search(self):
+        for title in NASTY_TITLES:
+            results = itunes.search(title, fields=("name",))
+            self.assertIn({"name": title}, results)
+
+class CompileTests(unittest.TestCase):
+    """
+    Test cases for the compiled script cache, with a stub osacompile.
+    """
+
+    def setUp(self):
+        self.old_cache = config.SCRIPT_CACHE
+        config.SCRIPT_CACHE = tempfile.mkdtemp()
+        scripts._compiled.clear()
+
+    def tearDown(self):
+        transport.set_transport(None)
+        shutil.rmtree(config.SCRIPT_CACHE)
+        config.SCRIPT_CACHE = self.old_cache
+        scripts._compiled.clear()
+
+    def test_compiled_once(self):
+        template = scripts.template("play track {trackTitle}", itunes._TITLE)
+        path = scripts.compile_template(template, STUB_COMPILER)
+
+        self.assertEqual(os.path.basename(path), template.digest + ".scpt")
+        with open(path, encoding="utf-8") as script_file:
+            self.assertEqual(script_file.read(), template.source)
+
+        # a new process finds the file instead of compiling again
+        scripts._compiled.clear()
+        self.assertEqual(scripts.compile_template(template, ["false"]), path)
+
+    def test_changed_template(self):
+        first = scripts.compile_template(scripts.Template("play"),
+                STUB_COMPILER)
+        second = scripts.compile_template(scripts.Template("pause"),
+                STUB_COMPILER)
+
+        self.assertNotEqual(first, second)
+
+    def test_compile_error(self):
+        self.assertRaises(AppleScriptError, scripts.compile_template,
+                scripts.Template("syntax error"), STUB_COMPILER)
+        self.assertEqual(os.listdir(config.SCRIPT_CACHE), [])
+
+    def test_prune(self):
+        old = scripts.compile_template(scripts.Template("play"), STUB_COMPILER)
+        new = scripts.compile_template(scripts.Template("pause"), STUB_COMPILER)
+
+        month_ago = time.time() - 31 * 24 * 60 * 60
+        os.utime(old, (month_ago, month_ago))
+
+        self.assertEqual(scripts.prune(), 1)
+        self.assertEqual(os.listdir(config.SCRIPT_CACHE), [os.path.basename(
+            new)])
+
+    def test_spawned(self):
+        fake = FakeITunes(50)
+        transport.set_transport(fake)
+
+        title = fake.tracks[7]["name"]
+        fields = ("persistent ID", "name", "artist")
+        found = itunes.search(title, fields=fields)
+        playlist = [track for chunk in itunes.iter_playlist("ITC",
+            chunk_size=3) for track in chunk]
+
+        for compiler in (STUB_COMPILER, None):
+            transport.set_transport(SpawnTransport(FAKE_OSASCRIPT,
+                compiler=compiler))
+
+            self.assertEqual(itunes.search(title, fields=fields), found)
+            self.assertEqual([track for chunk in itunes.iter_playlist("ITC",
+                chunk_size=3) for track in chunk], playlist)
+            itunes.play_track(title)
+
+        # the search, count, chunk and play templates
+        self.assertEqual(len(os.listdir(config.SCRIPT_CACHE)), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+test_store.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the library cache and its sync engine (itunes/store.py).
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from itunes import transport
+from itunes.fake import FakeITunes
+from itunes.itunes import get_playlist, search
+from itunes.store import LibraryStore, sync, sync_playlist, FIELDS
+
+class StoreTests(unittest.TestCase):
+    """
+    Test cases for the library cache, synced from a fake iTunes.
+    """
+
+    def setUp(self):
+        self.fake = FakeITunes(300)
+        transport.set_transport(self.fake)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache", "library.sqlite3")
+        self.store = LibraryStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+        transport.set_transport(None)
+
+    def test_initial_sync(self):
+        self.assertFalse(self.store.synced)
+
+        result = sync(self.store)
+
+        self.assertEqual((result.added, result.changed, result.deleted),
+                (300, 0, 0))
+        self.assertTrue(self.store.synced)
+        self.assertEqual(len(self.store), 300)
+        self.assertEqual(self.store.playlist("Music", FIELDS),
+                get_playlist("Music", key=None, fields=FIELDS))
+
+    def test_sync_nothing_changed(self):
+        sync(self.store)
+        self.assertFalse(sync(self.store))
+
+    def test_sync_modified_track(self):
+        sync(self.store)
+        self.fake.modify_track(5, name="Brand New Name")
+
+        result = sync(self.store)
+
+        self.assertEqual((result.added, result.changed, result.deleted),
+                (0, 1, 0))
+        self.assertEqual(self.store.playlist("Music")[5]["name"],
+                "Brand New Name")
+
+    def test_sync_added_and_deleted_tracks(self):
+        sync(self.store)
+        removed = self.store.playlist("Music")[7]["persistent ID"]
+        self.fake.delete_track(7)
+        track = self.fake.tracks[0].copy()
+        track["persistent ID"] = "5A5AFFFFFFFFFFFF"
+        self.fake.add_track(track)
+
+        result = sync(self.store)
+
+        self.assertEqual((result.added, result.deleted), (1, 1))
+        self.assertEqual(len(self.store), 300)
+        self.assertNotIn(removed, self.store.modification_dates())
+        self.assertEqual(self.store.playlist("Music"), get_playlist("Music",
+            key=None))
+
+    def test_bulk_sync(self):
+        sync(self.store)
+
+        for i in range(250):
+            self.fake.modify_track(i, album="Reissue")
+
+        self.assertEqual(sync(self.store).changed, 250)
+        self.assertEqual(self.store.playlist("Music"), get_playlist("Music",
+            key=None))
+
+    def test_warm_start(self):
+        sync(self.store)
+        self.store.close()
+
+        # a new store on the same file answers without asking iTunes
+        self.store = LibraryStore(self.path)
+        transport.set_transport(FakeITunes(0))
+
+        self.assertEqual(len(self.store.playlist("Music")), 300)
+        self.assertEqual(len(get_playlist("Music", store=self.store)), 300)
+
+    def test_sync_playlist(self):
+        self.assertIsNone(self.store.playlist("Favorites"))
+
+        self.assertTrue(sync_playlist(self.store, "Favorites"))
+        self.assertFalse(sync_playlist(self.store, "Favorites"))
+
+        self.assertEqual(get_playlist("Favorites", key="artist",
+            store=self.store), get_playlist("Favorites", key="artist"))
+
+    def test_search(self):
+        sync(self.store)
+
+        for term in ("love", "the nat", "HEART away", "", "~~~~"):
+            self.assertEqual(search(term, keys=["artist", "album"],
+                store=self.store), search(term, keys=["artist", "album"]))
+
+    def test_uncovered_fields(self):
+        sync(self.store)
+
+        # fields the cache doesn't hold are fetched from iTunes
+        tracks = get_playlist("Music", fields=("name", "year"),
+                store=self.store)
+        self.assertEqual(len(tracks), 300)
+        self.assertIn("year", tracks[0])
+
+if __name__ == '__main__':
+    unittest.main()
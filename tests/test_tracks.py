@@ -0,0 +1,119 @@
+"""
+test_tracks.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the compact track records (itunes/tracks.py).
+"""
+
+import pickle
+import unittest
+
+from itunes.fake import make_tracks, format_response
+from itunes.parser import parse_date, parse_literal, parse_response
+from itunes.tracks import Track, from_records, from_rows
+
+class TrackTests(unittest.TestCase):
+    """
+    Test cases for tracks as read-only mappings.
+    """
+
+    def setUp(self):
+        self.records = make_tracks(20, nasty=True)
+        self.tracks = from_records(self.records)
+
+    def test_mapping(self):
+        for record, track in zip(self.records, self.tracks):
+            self.assertEqual(len(track), len(record))
+            self.assertEqual(list(track), list(record))
+            self.assertEqual(track["name"], record["name"])
+            self.assertEqual(track.get("album"), record["album"])
+            self.assertIsNone(track.get("not a property"))
+            self.assertEqual(track.get("not a property", 5), 5)
+            self.assertIn("artist", track)
+            self.assertNotIn("not a property", track)
+            self.assertRaises(KeyError, lambda: track["not a property"])
+
+    def test_equality(self):
+        self.assertEqual(self.tracks, self.records)
+        self.assertEqual(self.records, self.tracks)
+        self.assertEqual([dict(track) for track in self.tracks], self.records)
+        self.assertNotEqual(self.tracks[0], self.tracks[1])
+        self.assertNotEqual(self.tracks[0], dict(self.records[0], name="x"))
+
+    def test_shared_storage(self):
+        first, second = self.tracks[:2]
+        self.assertIs(first._keys, second._keys)
+
+        # equal repeated values are the same object
+        genres = ["".join(("Hip ", "Hop")) for _ in range(2)]
+        self.assertIsNot(genres[0], genres[1])
+
+        tracks = from_rows(("name", "genre"), [("a", genres[0]), ("b",
+            genres[1])])
+        self.assertIs(tracks[0]["genre"], tracks[1]["genre"])
+
+    def test_pickle(self):
+        copies = pickle.loads(pickle.dumps(self.tracks))
+        self.assertEqual(copies, self.tracks)
+        self.assertIs(copies[0]._keys, self.tracks[0]._keys)
+
+    def test_parsed(self):
+        response = format_response(self.records)
+        tracks = parse_response(response)
+
+        self.assertTrue(all(isinstance(track, Track) for track in tracks))
+        self.assertEqual(tracks, parse_literal(response))
+
+class LazyTests(unittest.TestCase):
+    """
+    Test cases for values decoded when they are first read.
+    """
+
+    def setUp(self):
+        self.records = make_tracks(20, nasty=True)
+        self.response = format_response(self.records)
+        self.tracks = parse_response(self.response)
+
+    def test_pending(self):
+        track = self.tracks[0]
+        self.assertTrue(track._pending)
+
+        # interned values are decoded right away
+        self.assertFalse(track._pending >> track._keys["artist"] & 1)
+        self.assertTrue(track._pending >> track._keys["name"] & 1)
+
+    def test_decoded_once(self):
+        track = self.tracks[0]
+        added = track["date added"]
+
+        self.assertEqual(added, self.records[0]["date added"])
+        self.assertFalse(track._pending >> track._keys["date added"] & 1)
+        self.assertIs(track["date added"], added)
+        self.assertIs(track.get("date added"), added)
+
+    def test_decode_all(self):
+        track = self.tracks[0]
+        self.assertEqual(dict(track), parse_literal(self.response)[0])
+
+        self.assertFalse(track._pending)
+        self.assertIsInstance(track._values, tuple)
+
+    def test_same_as_eager(self):
+        self.assertEqual(self.tracks, parse_literal(self.response))
+
+        # partly decoded tracks compare equal to untouched ones
+        self.tracks[1]["name"]
+        self.assertEqual(self.tracks, parse_response(self.response))
+
+    def test_date_cache(self):
+        date = 'Friday, October 16, 2026 at 9:30:00 AM'
+        parse_date(date)
+        hits = parse_date.cache_info().hits
+
+        self.assertIs(parse_date(date), parse_date(date))
+        self.assertEqual(parse_date.cache_info().hits, hits + 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+test_tui.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the parts of the TUI that don't need a terminal.
+"""
+
+import time
+import unittest
+
+from itunes.fake import make_tracks
+from itunes.itunes import sort_tracks
+from tui.tui import ListFilter, Motions, FILTER_FIELDS, HALF_PAGE_DOWN, \
+        HALF_PAGE_UP, PAGE_DOWN, PAGE_UP
+
+class ListFilterTests(unittest.TestCase):
+    """
+    Test cases for the `/` filter.
+    """
+
+    def setUp(self):
+        self.tracks = make_tracks(2000, nasty=True)
+
+    def expected(self, term):
+        words = term.lower().split()
+        return [track for track in self.tracks if all(word in "\n".join(
+            str(track[field] or "") for field in FILTER_FIELDS).lower() for
+            word in words)]
+
+    def test_narrowing(self):
+        list_filter = ListFilter(self.tracks)
+
+        for char in "Love  The n":
+            list_filter.type(char)
+            self.assertEqual(list_filter.tracks(),
+                    self.expected(list_filter.term), list_filter.term)
+            self.assertEqual(len(list_filter), len(list_filter.tracks()))
+
+    def test_backspace(self):
+        list_filter = ListFilter(self.tracks)
+        list_filter.type("he")
+        narrowed = list_filter.tracks()
+        list_filter.type("art")
+
+        list_filter.backspace()
+        list_filter.backspace()
+        list_filter.backspace()
+
+        self.assertEqual(list_filter.term, "he")
+        self.assertEqual(list_filter.tracks(), narrowed)
+
+        list_filter.backspace()
+        list_filter.backspace()
+        list_filter.backspace()
+
+        self.assertEqual(list_filter.term, "")
+        self.assertEqual(list_filter.tracks(), self.tracks)
+
+    def test_limit(self):
+        list_filter = ListFilter(self.tracks)
+        list_filter.type("a")
+
+        self.assertEqual(list_filter.tracks(10), self.expected("a")[:10])
+
+    def test_keystroke_latency(self):
+        list_filter = ListFilter(make_tracks(50000))
+        slowest = 0
+
+        for char in "love the nat":
+            start = time.perf_counter()
+            list_filter.type(char)
+            slowest = max(slowest, time.perf_counter() - start)
+
+        print("\n50000 tracks: slowest keystroke {0:.1f}ms".format(slowest *
+            1000))
+        self.assertLess(slowest, 0.016)
+
+class MotionsTests(unittest.TestCase):
+    """
+    Test cases for the vim-style motions.
+    """
+
+    ROWS = 20
+
+    def setUp(self):
+        self.tracks = sort_tracks(make_tracks(1000), "artist")
+        self.motions = Motions("artist")
+
+    def type(self, keys, cursor=0, top=0):
+        position = (cursor, top)
+
+        for key in keys:
+            position = self.motions.feed(key, position[0], position[1],
+                    self.ROWS, self.tracks)
+            self.assertIsNotNone(position, key)
+
+        return position
+
+    def test_counts(self):
+        self.assertEqual(self.type("j")[0], 1)
+        self.assertEqual(self.type("250j")[0], 250)
+        self.assertEqual(self.type("10k", cursor=250)[0], 240)
+        self.assertEqual(self.type("5000j")[0], 999)
+        self.assertEqual(self.type("5000k", cursor=3)[0], 0)
+
+    def test_top_and_bottom(self):
+        self.assertEqual(self.type("G")[0], 999)
+        self.assertEqual(self.type("gg", cursor=500)[0], 0)
+        self.assertEqual(self.type("40G")[0], 39)
+        self.assertEqual(self.type("40gg")[0], 39)
+
+    def test_pages(self):
+        self.assertEqual(self.type(HALF_PAGE_DOWN), (10, 10))
+        self.assertEqual(self.type(HALF_PAGE_UP, 15, 12), (5, 2))
+        self.assertEqual(self.type(PAGE_DOWN * 2), (40, 40))
+        self.assertEqual(self.type("3" + PAGE_DOWN), (60, 60))
+        self.assertEqual(self.type(PAGE_UP, 990, 980), (970, 960))
+        self.assertEqual(self.type(PAGE_DOWN, 990, 980), (999, 980))
+
+    def test_jump_to_letter(self):
+        cursor = self.type("fm")[0]
+        artists = [track["artist"] for track in self.tracks]
+        first = next(i for i, artist in enumerate(artists) if
+                artist.startswith("M"))
+        self.assertEqual(cursor, first)
+
+        # no artist starts with z
+        self.assertEqual(self.type("fz", cursor=7)[0], 7)
+
+        self.motions.column = None
+        self.assertEqual(self.type("fm", cursor=7)[0], 7)
+
+    def test_other_keys(self):
+        self.assertIsNone(self.motions.feed(":", 0, 0, self.ROWS, self.tracks))
+        self.assertIsNone(self.motions.feed("/", 0, 0, self.ROWS, self.tracks))
+
+        # another key cancels a count
+        self.type("25")
+        self.assertIsNone(self.motions.feed(":", 0, 0, self.ROWS, self.tracks))
+        self.assertEqual(self.type("j")[0], 1)
+
+    def test_empty_list(self):
+        self.tracks = []
+        self.assertEqual(self.type("jG" + PAGE_DOWN), (0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
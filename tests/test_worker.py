@@ -0,0 +1,90 @@
+"""
+test_worker.py
+
+Copyright © 2026 Alex Danoff. All Rights Reserved.
+2026-10-16
+
+This file tests the persistent worker protocol against a stub interpreter.
+"""
+
+import os
+import shlex
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from itunes import config, transport, worker
+from itunes.itunes import run_applescript
+from itunes.exceptions import AppleScriptError, WorkerError
+from itunes.worker import Worker, WorkerPool
+
+STUB = [sys.executable, os.path.join(os.path.dirname(__file__),
+    "stub_interpreter.py")]
+
+class WorkerTests(unittest.TestCase):
+    """
+    Test cases for persistent workers.
+    """
+
+    def setUp(self):
+        self.pool = WorkerPool(STUB, size=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_round_trip(self):
+        self.assertEqual(self.pool.run('say "hi" ü'), '"say \\"hi\\" ü"')
+
+    def test_process_is_reused(self):
+        self.assertEqual(self.pool.run("pid"), self.pool.run("pid"))
+
+    def test_error(self):
+        self.assertRaises(AppleScriptError, self.pool.run, "error")
+        self.assertEqual(self.pool.run("x"), '"x"')
+
+    def test_restart_on_crash(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = os.path.join(tmp, "crashed")
+            self.assertEqual(self.pool.run("crash once " + marker), "survived")
+
+    def test_repeated_crash(self):
+        self.assertRaises(WorkerError, self.pool.run, "crash")
+        self.assertEqual(self.pool.run("x"), '"x"')
+
+    def test_worker_restarts(self):
+        single = Worker(STUB)
+        try:
+            self.assertRaises(WorkerError, single.run, "crash")
+            self.assertEqual(single.run("x"), ("ok", '"x"'))
+            self.assertEqual(single.starts, 2)
+        finally:
+            single.stop()
+
+    def test_concurrent_calls(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.pool.run("sleep 0.5"))) for _ in range(2)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLess(time.perf_counter() - start, 0.9)
+        self.assertEqual(len(set(results)), 2)
+
+    def test_run_applescript(self):
+        old_command, old_workers = config.WORKER_COMMAND, config.WORKERS
+        config.WORKER_COMMAND = " ".join(shlex.quote(arg) for arg in STUB)
+        config.WORKERS = 1
+        transport.set_transport(transport.WorkerTransport())
+
+        try:
+            self.assertEqual(run_applescript("play"), '"play"')
+            self.assertRaises(AppleScriptError, run_applescript, "error")
+        finally:
+            transport.set_transport(None)
+            config.WORKER_COMMAND, config.WORKERS = old_command, old_workers
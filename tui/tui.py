@@ -7,14 +7,22 @@ Copyright © 2015 Alex Danoff. All Rights Reserved.
 This file implements the TUI functionality of the program.
 """
 
+import asyncio
+from bisect import bisect_left
 import curses
+import queue
+import sqlite3
+import sys
+import threading
 
 from enum import Enum
 
-from itunes import itunes
+from itunes import aio, config, itunes, store
+from itunes.index import SearchIndex
+from itunes.exceptions import ITunesError
 
 """Status codes returned by `command_mode` to indicate an action."""
-STATUS_CODES = Enum("StatusCodes", "EXIT ERROR SEARCH PLAYLIST")
+STATUS_CODES = Enum("StatusCodes", "EXIT ERROR SEARCH PLAYLIST SYNC")
 
 """Mapping of commands to actions."""
 COMMAND_MAP = {
@@ -23,7 +31,8 @@ COMMAND_MAP = {
         "s": STATUS_CODES.SEARCH,
         "search": STATUS_CODES.SEARCH,
         "p": STATUS_CODES.PLAYLIST,
-        "playlist": STATUS_CODES.PLAYLIST
+        "playlist": STATUS_CODES.PLAYLIST,
+        "sync": STATUS_CODES.SYNC
 }
 
 """Color pair codes for various types of output."""
@@ -36,12 +45,52 @@ COLOR_PAIRS = {
         "CURSOR": 5
 }
 
+"""Formats of the columns of the track list."""
+ROW_FORMATS = ["{i:5}: {name}", "{album}", "{artist}", "[{time}]"]
+
+"""Format of a line of the track list, given the column widths and strings."""
+LINE_FORMAT = (
+    "{1[0]:<{0[0]}.{0[0]}}" # song name
+    "{1[1]:<{0[1]}.{0[1]}}" # album
+    "{1[2]:<{0[2]}.{0[2]}}" # artist
+    "{1[3]:>{0[3]}.{0[3]}}" # duration
+)
+
+BUFFER = 2 #minimum spacing between cloumns
+
+"""How often (in milliseconds) to check for newly fetched tracks."""
+POLL_INTERVAL = 50
+
+"""The number of rows above and below the screen that are formatted ahead of
+time, so short scrolls don't have to format anything."""
+OVERSCAN = 20
+
+"""The maximum number of formatted rows kept by a track list view."""
+ROW_CACHE_SIZE = 4000
+
+"""Track properties matched by the `/` filter (the columns of the list)."""
+FILTER_FIELDS = ("name", "album", "artist")
+
+"""Control keys that scroll by half a page (Ctrl-D, Ctrl-U) or a full page
+(Ctrl-F, Ctrl-B)."""
+HALF_PAGE_DOWN = "\x04"
+HALF_PAGE_UP = "\x15"
+PAGE_DOWN = "\x06"
+PAGE_UP = "\x02"
+
+"""Keys that delete the last character of the filter."""
+BACKSPACE_KEYS = ("\x7f", "\b", "KEY_BACKSPACE")
+
 # TODO add ability to go to playlists
-def main(stdscr):
+async def main(stdscr):
     """
     Main controller function for the TUI.
 
-    This function provides the standard run loop for the application.
+    This coroutine provides the standard run loop for the application. It runs
+    on an asyncio event loop, which wakes it for keys, finished searches and
+    tracks played; searches and plays run as tasks, so the list stays usable
+    while iTunes answers. A newer search replaces one still running, and
+    Escape cancels whatever is in flight.
 
     Parameters
     ----------
@@ -76,39 +125,168 @@ def main(stdscr):
     stdscr.addstr(0, 0, "Welcome to iTunesTUI")
     stdscr.refresh()
 
-    status_message(command_win, "Fetching music...")
-    display_list = itunes.get_playlist("ITC", key="artist")
-    status_message(command_win, "Got music.")
+    library = open_store()
+    playlist = "ITC"
+    loader = None
+
+    # show the cached playlist right away and sync it in the background;
+    # without a cache, show the first chunk and add the rest as it arrives
+    display_list = cached_playlist(library, playlist, key="artist")
+
+    if display_list is None:
+        status_message(command_win, "Fetching music...")
+        loader = PlaylistLoader(playlist, key="artist",
+                chunk_size=curses.LINES)
+        display_list = loader.poll(block=True)
+
+    # searches are answered by an index of the cached library, built by the
+    # first sync
+    search_index = None
+    syncer = None
 
-    cursor_line = 1
+    if library is not None:
+        syncer = LibrarySync(playlist, build_index=True)
 
-    display_pad = load_list(display_list, TOP_LINE, LEFT, cols=RIGHT - LEFT)
-    display_pad.move(1, 0)
-    display_pad.refresh(0, 0, TOP_LINE, LEFT, BOTTOM_LINE, RIGHT)
+    # the view holds the cursor and scroll position; only the rows on screen
+    # are ever formatted and drawn
+    view = TrackListView(curses.newwin(BOTTOM_LINE - TOP_LINE + 1,
+        RIGHT - LEFT, TOP_LINE, LEFT), display_list)
 
-    pad_top = 0
-    pad_rows = BOTTOM_LINE - TOP_LINE
+    # the list is sorted by artist once it has all arrived
+    motions = Motions("artist" if loader is None else None)
 
-    cursor_bottom = len(display_list)
+    # searches and plays in flight
+    search_task = None
+    play_task = None
+
+    # woken by keys on stdin and by finished tasks
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    loop.add_reader(sys.stdin.fileno(), wake.set)
+    view.window.timeout(0)
 
     f = open("out.log", "w")
 
     # continue until quit command is given
     while command != STATUS_CODES.EXIT:
 
-        key = display_pad.getkey()
-        previous_line = cursor_line
-
-        offset = 2
-        current = display_pad.inch(cursor_line + offset, 0)
+        # add tracks that arrived in the background
+        if loader is not None:
+            new_tracks = loader.poll()
+
+            if new_tracks:
+                start = len(display_list)
+                display_list.extend(new_tracks)
+                view.extend(start)
+
+            # sort once everything is here
+            if loader.finished:
+                if loader.error is not None:
+                    status_message(command_win, str(loader.error),
+                            color=COLOR_PAIRS["ERROR"])
+                else:
+                    display_list = itunes.sort_tracks(display_list, loader.key)
+                    motions.column = loader.key
+                    view.set_tracks(display_list, cursor=view.cursor,
+                            top=view.top)
+                    status_message(command_win, "Got music.")
+
+                    # remember the playlist for the next time
+                    if library is not None and syncer is None:
+                        syncer = LibrarySync(loader.name, library=False)
+                loader = None
+
+        # show what a finished sync changed
+        if syncer is not None and syncer.finished:
+            if syncer.error is not None:
+                status_message(command_win, str(syncer.error),
+                        color=COLOR_PAIRS["ERROR"])
 
-        # convert arrow keys to their counterparts
-        if key == "":
-            next = display_pad.getkey() + display_pad.getkey()
-            if next == "[B":
-                key = "j"
-            elif next == "[A":
-                key = "k"
+            elif syncer.changed and loader is None and \
+                    syncer.playlist == playlist:
+                synced_list = cached_playlist(library, playlist, key="artist")
+
+                if synced_list is not None:
+                    display_list = synced_list
+                    view.set_tracks(display_list, cursor=view.cursor,
+                            top=view.top)
+
+            # keep the search index up to date
+            if syncer.index is not None:
+                search_index = syncer.index
+            elif search_index is not None and syncer.result is not None:
+                search_index.remove(syncer.result.removed)
+                search_index.add(library.tracks(syncer.result.updated))
+
+            if syncer.error is None and syncer.result is not None:
+                status_message(command_win, "Library synced ({0}).".format(
+                    syncer.result))
+            syncer = None
+
+        # show the results of a finished search
+        if search_task is not None and search_task.done():
+            try:
+                display_list = search_task.result()
+            except ITunesError as error:
+                status_message(command_win, str(error),
+                        color=COLOR_PAIRS["ERROR"])
+            else:
+                motions.column = "album"
+                view.set_tracks(display_list)
+                status_message(command_win, "{0} tracks found".format(
+                    len(display_list)))
+            search_task = None
+
+        if play_task is not None and play_task.done():
+            try:
+                play_task.result()
+            except ITunesError as error:
+                status_message(command_win, str(error),
+                        color=COLOR_PAIRS["ERROR"])
+            play_task = None
+
+        wake.clear()
+
+        try:
+            key = read_key(view.window)
+        except curses.error:
+            # nothing typed: wait for a key or a task, and poll the
+            # background threads while there are any
+            busy = loader is not None or syncer is not None
+
+            try:
+                await asyncio.wait_for(wake.wait(), POLL_INTERVAL / 1000 if
+                        busy else None)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        target = motions.feed(key, view.cursor, view.top, view.rows,
+                display_list)
+
+        if target is not None:
+            # fold the keys that are already waiting (e.g. from key repeat)
+            # into the same move, so it is drawn once
+            view.window.timeout(0)
+
+            while True:
+                try:
+                    key = read_key(view.window)
+                except curses.error:
+                    break
+
+                following = motions.feed(key, target[0], target[1], view.rows,
+                        display_list)
+
+                if following is None:
+                    # leave it for the next turn of the loop
+                    if len(key) == 1:
+                        curses.unget_wch(key)
+                    break
+                target = following
+
+            view.move_cursor(*target)
+            continue
 
         # user wants to enter a command
         if key == ":":
@@ -122,20 +300,22 @@ def main(stdscr):
             elif command == STATUS_CODES.SEARCH:
                 search_term = prompt_mode(command_win,
                         prompt="Enter a search term: ")
-                display_list = itunes.search(search_term, keys=["artist",
-                    "album"])
-                #f.write("Search for '{0}' returned: {1}\n".format(search_term,
-                    #display_list))
-                display_pad.erase()
-                #f.write("Cleared\n")
-                cursor_bottom = len(display_list)
-                #f.write("Bottom: {}\n".format(cursor_bottom))
-                cursor_line = 1
-                previous_line = 1
-                display_pad.refresh(0, 0, TOP_LINE, LEFT, BOTTOM_LINE, RIGHT)
-                display_pad = load_list(display_list, TOP_LINE, LEFT, cols=RIGHT - LEFT)
-                display_pad.move(1, 0)
-                display_pad.refresh(0, 0, TOP_LINE, LEFT, BOTTOM_LINE, RIGHT)
+
+                # a playlist that is still loading would replace the results
+                if loader is not None:
+                    loader.cancel()
+                    loader = None
+
+                # the newer search wins
+                if search_task is not None:
+                    search_task.cancel()
+
+                playlist = None
+                status_message(command_win, "Searching...")
+                search_task = asyncio.ensure_future(aio.search(search_term,
+                    keys=["artist", "album"], store=library,
+                    index=search_index))
+                search_task.add_done_callback(lambda task: wake.set())
 
             elif command == STATUS_CODES.PLAYLIST:
                 pl_name = prompt_mode(command_win,
@@ -143,33 +323,73 @@ def main(stdscr):
 
                 if not pl_name:
                     pl_name = "Music"
-                display_list = itunes.get_playlist(pl_name, key="artist")
-                cursor_bottom = len(display_list)
-                display_pad.erase()
-                cursor_line = 1
-                previous_line = 1
-                display_pad.refresh(0, 0, TOP_LINE, LEFT, BOTTOM_LINE, RIGHT)
-                display_pad = load_list(display_list, TOP_LINE, LEFT, cols=RIGHT - LEFT)
-                display_pad.move(1, 0)
-                display_pad.refresh(0, 0, TOP_LINE, LEFT, BOTTOM_LINE, RIGHT)
-
-        elif key == "j": #move cursor down
-            #f.write("Recognized: {}\n".format(key))
-            if cursor_line < cursor_bottom:
-                cursor_line += 1
-
-        elif key == "k": #move cursor up
-            if cursor_line > 1:
-                cursor_line -= 1
-
-        # TODO jump to bottom/top of list
+
+                if loader is not None:
+                    loader.cancel()
+                    loader = None
+
+                # a search finishing later would replace the playlist
+                if search_task is not None:
+                    search_task.cancel()
+                    search_task = None
+
+                playlist = pl_name
+                display_list = cached_playlist(library, playlist,
+                        key="artist")
+
+                motions.column = "artist"
+
+                if display_list is None:
+                    status_message(command_win, "Fetching music...")
+                    loader = PlaylistLoader(playlist, key="artist",
+                            chunk_size=curses.LINES)
+                    display_list = loader.poll(block=True)
+                    motions.column = None
+                elif syncer is None:
+                    # check the cached copy in the background
+                    syncer = LibrarySync(playlist, library=False)
+
+                view.set_tracks(display_list)
+
+            elif command == STATUS_CODES.SYNC:
+                if library is None:
+                    status_message(command_win, "The library cache is off",
+                            color=COLOR_PAIRS["ERROR"])
+                elif syncer is not None:
+                    status_message(command_win, "Already syncing...")
+                else:
+                    status_message(command_win, "Syncing library...")
+                    syncer = LibrarySync(playlist,
+                            build_index=search_index is None)
+
+        # narrow the list as a filter is typed
+        elif key == "/":
+            cursor, top = view.cursor, view.top
+            filtered = filter_mode(command_win, display_list,
+                    lambda list_filter: view.set_tracks(list_filter.tracks(
+                        view.rows)))
+
+            if filtered is None:
+                command_win.clear()
+                command_win.refresh()
+                view.set_tracks(display_list, cursor=cursor, top=top)
+            else:
+                # the filtered list no longer follows the playlist
+                if loader is not None:
+                    loader.cancel()
+                    loader = None
+                playlist = None
+
+                status_message(command_win, "{0} of {1} tracks match".format(
+                    len(filtered), len(display_list)))
+                display_list = filtered
+                view.set_tracks(display_list)
 
         elif key == "\n": #play the song under the cursor
-            track_line = inchstr(display_pad, cursor_line, 0).strip()
-            #f.write("trying to match {}".format(track_line))
-            track_num = int(track_line[:track_line.find(":")]) - 1
+            track = view.current()
 
-            track = display_list[track_num]
+            if track is None:
+                continue
 
             title = track["name"]
             album = track["album"]
@@ -177,45 +397,698 @@ def main(stdscr):
             time = track["time"]
 
             f.write("Trying to play: {}\n".format(title))
-            itunes.play_track(title)
+
+            if play_task is not None:
+                play_task.cancel()
+            # the ID names this very track, even if others share its title
+            play_task = asyncio.ensure_future(aio.play_track(title,
+                track.get("persistent ID")))
+            play_task.add_done_callback(lambda task: wake.set())
+
             msg = 'Playing "{0}" -- "{1}"'.format(title, artist)
             status_message(command_win, "{0}".format(truncate(msg, RIGHT - LEFT)))
 
+        elif key == "\x1b": # cancel what is in flight
+            cancelled = [work for work in (search_task, play_task, loader) if
+                    work is not None]
+
+            for work in cancelled:
+                work.cancel()
+            search_task = play_task = loader = None
+
+            if cancelled:
+                status_message(command_win, "Cancelled.")
+
+        elif key == "KEY_RESIZE":
+            curses.update_lines_cols()
+            BOTTOM_LINE = curses.LINES - 2
+            RIGHT = curses.COLS - 1
+            COMMAND_LINE = curses.LINES - 1
+
+            stdscr.refresh()
+            command_win.resize(1, curses.COLS)
+            command_win.mvwin(COMMAND_LINE, LEFT)
+            view.window.resize(max(BOTTOM_LINE - TOP_LINE + 1, 1),
+                    max(RIGHT - LEFT, 1))
+            view.resize()
+
         else:
             #stdscr.addstr(0, 0, key)
             f.write("UNRECOGNIZED: {}\n".format(key))
 
-        #current = display_pad.inch(cursor_line + 1, 0)
         f.write("PRESSED: {}\n".format(key))
 
-        line_change = cursor_line - previous_line
+    for task in (search_task, play_task):
+        if task is not None:
+            task.cancel()
 
-        # only redraw if we moved the cursor
-        if line_change:
+    loop.remove_reader(sys.stdin.fileno())
+    f.close()
 
-            # if we're off the screen now, scroll
-            if cursor_line > pad_top + pad_rows or cursor_line < pad_top:
-                pad_top += line_change
+    if library is not None:
+        library.close()
 
-            #f.write("BELOW CURSOR: {1} ({0}) ({0:b})\n".format(current, chr(current
-                #& 0xFF)))
-            #f.write("curses.A_REVERSE: {0} ({0:b})\n".format(curses.A_REVERSE))
-            reversed = current & curses.A_REVERSE
-            #f.write("REVERSED: {0} ({0:b})\n".format(reversed))
+class TrackListView(object):
+    """
+    A virtualized track list, and the model behind it.
 
-            line_str = inchstr(display_pad, cursor_line - line_change, 0)
+    The view draws into a window the size of the screen area it covers, not
+    a pad holding every track: drawing formats and draws only the rows on
+    screen (plus `OVERSCAN` rows formatted ahead), so scrolling, replacing the
+    list and resizing cost the same for a hundred tracks as for 200k.
+    Formatted rows are cached by track index and column layout.
 
-            f.write("PREVIOUS LINE: {}\n".format(previous_line))
-            f.write("LINE CHANGE: {:+}\n".format(line_change))
-            f.write("CURSOR LINE: {}\n".format(cursor_line))
+    The cursor and scroll position live here too, so the screen never has to
+    be read back: moving the cursor repaints just the row it left and the row
+    it lands on (scrolling the window first if needed), and the track under
+    the cursor comes straight from the list.
 
-            # remove cursor and redraw on next line
-            display_pad.addstr(previous_line, 0, line_str, reversed)
-            display_pad.move(cursor_line, 0)
-            display_pad.chgat(-1, curses.color_pair(COLOR_PAIRS["CURSOR"]))
-            display_pad.refresh(pad_top, 0, TOP_LINE, LEFT, BOTTOM_LINE, RIGHT)
+    Parameters
+    ----------
+    window : curses.WindowObject
+        The window to draw in. Its first line holds the column titles.
+    track_list : list, optional
+        The tracks to show.
 
-    f.close()
+    Attributes
+    ----------
+    track_list : list
+        The tracks shown.
+    top : int
+        The index of the first track on screen.
+    cursor : int
+        The index of the track under the cursor.
+    """
+
+    def __init__(self, window, track_list=()):
+
+        self.window = window
+        self.track_list = track_list
+        self.top = 0
+        self.cursor = 0
+        self._rows = {}
+
+        self.resize()
+
+    @property
+    def rows(self):
+        """
+        The number of tracks that fit on screen.
+        """
+
+        return max(self.window.getmaxyx()[0] - 1, 0)
+
+    def resize(self):
+        """
+        Redraw the list after its window has been resized.
+        """
+
+        lines, self.cols = self.window.getmaxyx()
+        self.space = column_widths(self.cols)
+        self._layout = tuple(self.space)
+
+        # only the track rows scroll, the title stays
+        if lines > 1:
+            self.window.scrollok(True)
+            self.window.setscrreg(1, lines - 1)
+
+        self._follow()
+        self.draw()
+
+    def set_tracks(self, track_list, cursor=0, top=0):
+        """
+        Show a new list of tracks.
+
+        Parameters
+        ----------
+        track_list : list
+            The tracks to show.
+        cursor : int, optional
+            The index of the track to put the cursor on (default 0).
+        top : int, optional
+            The index of the track to show first, if the cursor is still on
+            screen (default 0).
+        """
+
+        self.track_list = track_list
+        self._rows.clear()
+        self.top = top
+        self.cursor = min(max(cursor, 0), max(len(track_list) - 1, 0))
+
+        self._follow()
+        self.draw()
+
+    def extend(self, start):
+        """
+        Show the tracks added to the end of the list from index `start` on.
+        """
+
+        # rows that aren't on screen are drawn when they scroll into view
+        if start < self.top + self.rows:
+            self.draw()
+
+    def current(self):
+        """
+        Return the track under the cursor, or None if the list is empty.
+        """
+
+        if self.cursor < len(self.track_list):
+            return self.track_list[self.cursor]
+
+        return None
+
+    def move_cursor(self, cursor, top=None):
+        """
+        Move the cursor to the track at index `cursor`, scrolling if needed.
+
+        Parameters
+        ----------
+        cursor : int
+            The index of the track to move to.
+        top : int, optional
+            The index of the track to show first (as long as the cursor stays
+            on screen). Defaults to None, which scrolls only as far as needed.
+        """
+
+        previous, old_top = self.cursor, self.top
+        self.cursor = min(max(cursor, 0), max(len(self.track_list) - 1, 0))
+
+        if top is not None:
+            self.top = top
+
+        if self.cursor == previous and self.top == old_top:
+            return
+
+        top = old_top
+
+        self._follow()
+        shift = self.top - top
+
+        # a long jump repaints the whole screen anyway
+        if abs(shift) >= self.rows:
+            self.draw()
+            return
+
+        if shift:
+            self.window.scroll(shift)
+
+            if shift > 0:
+                exposed = range(self.top + self.rows - shift, self.top +
+                        self.rows)
+            else:
+                exposed = range(self.top, top)
+
+            for i in exposed:
+                self.draw_row(i)
+
+        self.draw_row(previous)
+        self.draw_row(self.cursor)
+        self.window.refresh()
+
+        if shift:
+            self._overscan()
+
+    def draw_row(self, i):
+        """
+        Draw track `i`, if it is on screen. The window is not refreshed.
+        """
+
+        line = i - self.top + 1
+
+        if not self.top <= i < self.top + self.rows:
+            return
+
+        if i >= len(self.track_list):
+            self.window.move(line, 0)
+            self.window.clrtoeol()
+            return
+
+        reversed = (i % 2) * curses.A_REVERSE
+
+        # place the cursor on its line
+        if i == self.cursor:
+            reversed = curses.color_pair(COLOR_PAIRS["CURSOR"])
+
+        self.window.addstr(line, 0, self.row(i), reversed)
+
+    def row(self, i):
+        """
+        Return track `i` formatted for the current column layout.
+        """
+
+        key = (i, self._layout)
+        line = self._rows.get(key)
+
+        if line is None:
+            if len(self._rows) >= ROW_CACHE_SIZE:
+                self._rows.clear()
+
+            line = format_row(self.track_list[i], i, self.space, self.cols)
+            self._rows[key] = line
+
+        return line
+
+    def draw(self):
+        """
+        Draw the rows on screen.
+        """
+
+        window = self.window
+        end = min(self.top + self.rows, len(self.track_list))
+
+        window.erase()
+
+        title_line = LINE_FORMAT.format(self.space, ["    Name", "Album",
+            "Artist", "Time"])
+        window.addstr(0, 0, title_line[:self.cols - 1],
+                curses.color_pair(COLOR_PAIRS["TITLE"]))
+
+        for i in range(self.top, end):
+            self.draw_row(i)
+
+        window.refresh()
+        self._overscan()
+
+    def _overscan(self):
+        # format the rows just off screen ahead of time
+        end = min(self.top + self.rows, len(self.track_list))
+
+        for i in range(max(self.top - OVERSCAN, 0), self.top):
+            self.row(i)
+        for i in range(end, min(end + OVERSCAN, len(self.track_list))):
+            self.row(i)
+
+    def _follow(self):
+        # keep the cursor on screen
+        rows = max(self.rows, 1)
+
+        if self.cursor < self.top:
+            self.top = self.cursor
+        elif self.cursor >= self.top + rows:
+            self.top = self.cursor - rows + 1
+
+        self.top = max(min(self.top, len(self.track_list) - rows), 0)
+
+class Motions(object):
+    """
+    Turns vim-style motion keys into cursor moves.
+
+    Understood are `j` and `k`, `gg` and `G`, Ctrl-D and Ctrl-U (half a page),
+    Ctrl-F and Ctrl-B (a full page), all of which take a count (`250j`,
+    `40G`), and `f` followed by a character, which jumps to the first track
+    whose sort column starts with that character. Every motion computes its
+    target position directly, so it costs the same however far it goes.
+
+    Parameters
+    ----------
+    column : str or None
+        The item in the track dictionaries the list is sorted by, for `f`.
+        None (while the list isn't sorted yet) disables `f`.
+
+    Attributes
+    ----------
+    pending : str
+        The count and prefix keys (`g`, `f`) typed so far.
+    """
+
+    def __init__(self, column=None):
+
+        self.column = column
+        self.pending = ""
+
+    def feed(self, key, cursor, top, rows, track_list):
+        """
+        Handle a key.
+
+        Parameters
+        ----------
+        key : str
+            The key pressed.
+        cursor : int
+            The index of the track under the cursor.
+        top : int
+            The index of the first track on screen.
+        rows : int
+            The number of tracks on screen.
+        track_list : list
+            The tracks shown.
+
+        Returns
+        -------
+        tuple or None
+            The new cursor and top indices (unchanged after a count or prefix
+            key), or None if `key` isn't part of a motion.
+        """
+
+        pending, self.pending = self.pending, ""
+        digits = pending.rstrip("gf")
+        count = int(digits) if digits else None
+        last = max(len(track_list) - 1, 0)
+
+        if pending.endswith("f"):
+            return self._jump(key, cursor, top, track_list)
+
+        if key.isdigit() and (key != "0" or digits):
+            self.pending = pending + key
+            return cursor, top
+
+        if key in ("g", "f") and not pending.endswith("g"):
+            self.pending = pending + key
+            return cursor, top
+
+        if key == "j":
+            cursor += count or 1
+        elif key == "k":
+            cursor -= count or 1
+        elif key == "g" and pending.endswith("g"):
+            cursor = count - 1 if count else 0
+        elif key == "G":
+            cursor = count - 1 if count else last
+        elif key in (HALF_PAGE_DOWN, HALF_PAGE_UP, PAGE_DOWN, PAGE_UP):
+            if key in (HALF_PAGE_DOWN, HALF_PAGE_UP):
+                step = count or max(rows // 2, 1)
+            else:
+                step = max(rows, 1) * (count or 1)
+
+            if key in (HALF_PAGE_UP, PAGE_UP):
+                step = -step
+
+            cursor += step
+            top += step
+        else:
+            return None
+
+        cursor = min(max(cursor, 0), last)
+        top = min(max(top, 0), max(len(track_list) - rows, 0))
+
+        return cursor, top
+
+    def _jump(self, char, cursor, top, track_list):
+        if self.column is None or len(char) != 1:
+            return cursor, top
+
+        column = _SortColumn(track_list, self.column)
+
+        # the list is sorted case-sensitively, so look for both cases
+        for prefix in (char.upper(), char.lower()):
+            i = bisect_left(column, prefix)
+
+            if i < len(column) and column[i].startswith(prefix):
+                return i, top
+
+        return cursor, top
+
+class _SortColumn(object):
+    # the sort keys of a sorted track list, as a sequence for bisect
+
+    def __init__(self, track_list, key):
+        self.track_list = track_list
+        self.key = key
+
+    def __len__(self):
+        return len(self.track_list)
+
+    def __getitem__(self, i):
+        return str(self.track_list[i].get(self.key) or "")
+
+class PlaylistLoader(object):
+    """
+    Fetches a playlist chunk by chunk on a background thread.
+
+    Parameters
+    ----------
+    name : str
+        The name of the playlist to fetch.
+    key : str, optional
+        The item in the track dictionary the playlist should be sorted by once
+        it has arrived (default None).
+    chunk_size : int, optional
+        The number of tracks in the first chunk (see `itunes.iter_playlist`).
+
+    Attributes
+    ----------
+    finished : bool
+        Whether every chunk has been handed out by `poll`.
+    error : ITunesError or None
+        The error that stopped the fetch, if any.
+    """
+
+    def __init__(self, name, key=None, chunk_size=None):
+
+        self.name = name
+        self.key = key
+        self.finished = False
+        self.error = None
+        self._chunks = queue.Queue()
+        self._cancelled = threading.Event()
+
+        thread = threading.Thread(target=self._fetch, args=(chunk_size,))
+        thread.daemon = True
+        thread.start()
+
+    def _fetch(self, chunk_size):
+        try:
+            for chunk in itunes.iter_playlist(self.name,
+                    chunk_size=chunk_size):
+                if self._cancelled.is_set():
+                    return
+                self._chunks.put(chunk)
+        except ITunesError as error:
+            self.error = error
+
+        # marks the end of the playlist
+        self._chunks.put(None)
+
+    def poll(self, block=False):
+        """
+        Collect the tracks that have arrived since the last call.
+
+        Parameters
+        ----------
+        block : bool, optional
+            Whether to wait for the next chunk if none has arrived yet
+            (default False).
+
+        Returns
+        -------
+        list
+            The new tracks, in iTunes' order (possibly empty).
+        """
+
+        tracks = []
+
+        try:
+            chunk = self._chunks.get(block)
+
+            while chunk is not None:
+                tracks.extend(chunk)
+                chunk = self._chunks.get_nowait()
+
+            self.finished = True
+
+        except queue.Empty:
+            pass
+
+        return tracks
+
+    def cancel(self):
+        """
+        Stop fetching after the chunk currently being fetched.
+        """
+
+        self._cancelled.set()
+
+class LibrarySync(object):
+    """
+    Syncs the library cache (see itunes/store.py) on a background thread.
+
+    The thread uses its own connection to the cache.
+
+    Parameters
+    ----------
+    playlist : str or None
+        A playlist whose cached contents should be synced too.
+    library : bool, optional
+        Whether to sync the tracks of the whole library first (default True).
+    build_index : bool, optional
+        Whether to build a search index of the library once it is synced
+        (default False).
+
+    Attributes
+    ----------
+    finished : bool
+        Whether the sync is over.
+    changed : bool
+        Whether the sync changed the library or `playlist`.
+    result : SyncResult or None
+        What the library sync changed, if there was one.
+    index : SearchIndex or None
+        The search index, if one was built.
+    error : Exception or None
+        The error that stopped the sync, if any.
+    """
+
+    def __init__(self, playlist, library=True, build_index=False):
+
+        self.playlist = playlist
+        self.finished = False
+        self.changed = False
+        self.result = None
+        self.index = None
+        self.error = None
+
+        thread = threading.Thread(target=self._sync, args=(library,
+            build_index))
+        thread.daemon = True
+        thread.start()
+
+    def _sync(self, library, build_index):
+        try:
+            cache = store.LibraryStore()
+
+            try:
+                if library:
+                    self.result = store.sync(cache)
+                    self.changed = bool(self.result)
+
+                if build_index:
+                    self.index = SearchIndex(cache.playlist(
+                        config.LIBRARY_PLAYLIST, store.FIELDS) or [])
+
+                if self.playlist is not None:
+                    if store.sync_playlist(cache, self.playlist):
+                        self.changed = True
+            finally:
+                cache.close()
+
+        except (ITunesError, sqlite3.Error) as error:
+            self.error = error
+
+        self.finished = True
+
+class ListFilter(object):
+    """
+    Narrows a track list as a filter is typed, one character at a time.
+
+    A track matches if every word of the filter appears (ignoring case) in
+    its name, album or artist. Typing a character can only narrow the
+    results, so each step filters the results of the previous one, and only
+    by the last word (the others are already known to match). The results of
+    every step are kept, so deleting a character costs nothing.
+
+    Parameters
+    ----------
+    track_list : list
+        The tracks to filter.
+    fields : sequence, optional
+        The track properties to match (default `FILTER_FIELDS`).
+    """
+
+    def __init__(self, track_list, fields=FILTER_FIELDS):
+
+        self.track_list = track_list
+        self._texts = ["\n".join(str(track.get(field) or "") for field in
+            fields).lower() for track in track_list]
+
+        # (filter, indices of the matching tracks) for every step
+        self._steps = [("", range(len(track_list)))]
+
+    @property
+    def term(self):
+        """
+        The filter typed so far.
+        """
+
+        return self._steps[-1][0]
+
+    def __len__(self):
+        return len(self._steps[-1][1])
+
+    def type(self, text):
+        """
+        Add `text` to the end of the filter.
+        """
+
+        for char in text:
+            term, indices = self._steps[-1]
+            term += char
+
+            words = term.lower().split()
+
+            # a space only ends a word, so the matches stay the same
+            if words and not char.isspace():
+                word = words[-1]
+                texts = self._texts
+                indices = [i for i in indices if word in texts[i]]
+
+            self._steps.append((term, indices))
+
+    def backspace(self):
+        """
+        Delete the last character of the filter, if there is one.
+        """
+
+        if len(self._steps) > 1:
+            self._steps.pop()
+
+    def tracks(self, limit=None):
+        """
+        Return the matching tracks (at most `limit` of them), in list order.
+        """
+
+        indices = self._steps[-1][1]
+
+        if limit is not None:
+            indices = indices[:limit]
+
+        return [self.track_list[i] for i in indices]
+
+def open_store():
+    """
+    Open the library cache at `config.CACHE_PATH`.
+
+    Returns
+    -------
+    LibraryStore or None
+        The cache, or None if it is disabled or cannot be opened.
+    """
+
+    if not config.CACHE_PATH:
+        return None
+
+    try:
+        return store.LibraryStore(config.CACHE_PATH)
+    except (OSError, sqlite3.Error):
+        return None
+
+def cached_playlist(library, name, key=None):
+    """
+    Get a playlist from the library cache.
+
+    Parameters
+    ----------
+    library : LibraryStore or None
+        The cache, as returned by `open_store`.
+    name : str
+        The name of the playlist.
+    key : str, optional
+        The item in the track dictionary to sort the tracks by.
+
+    Returns
+    -------
+    list or None
+        The sorted tracks, or None if the playlist isn't cached.
+    """
+
+    if library is None:
+        return None
+
+    track_list = library.playlist(name)
+
+    if track_list is None:
+        return None
+
+    return itunes.sort_tracks(track_list, key)
 
 def reset_cursor(func):
     """
@@ -245,6 +1118,34 @@ def reset_cursor(func):
 
     return inner
 
+def read_key(window):
+    """
+    Read a key from `window`, turning the up and down arrows into `k` and `j`.
+
+    Raises
+    ------
+    curses.error
+        If no key is pressed before the window's timeout.
+    """
+
+    key = window.getkey()
+
+    # convert arrow keys to their counterparts
+    if key == "\x1b":
+        window.timeout(0)
+
+        try:
+            next = window.getkey() + window.getkey()
+        except curses.error:
+            return key
+
+        if next == "[B":
+            key = "j"
+        elif next == "[A":
+            key = "k"
+
+    return key
+
 @reset_cursor
 def command_mode(window, line=0, col=0):
     """
@@ -347,168 +1248,142 @@ def status_message(window, message, color=COLOR_PAIRS["STATUS"], line=0, col=0):
     window.addstr(line, col, message, curses.color_pair(color))
     window.refresh()
 
-def load_list(track_list, pad=None, corner_y=0, corner_x=0, lines=0, cols=0):
+def filter_mode(window, track_list, preview, line=0, col=0):
     """
-    Load a list of tracks into a pad and display some of that pad.
+    Filter a track list as the user types, vim-style.
 
-    All the tracks provided are loaded into the pad, however they will not all
-    be visible at once (depending on provided dimensions).
+    Every keystroke narrows the list and `preview` is called to show the
+    result. Keys typed while the previous step was being drawn are handled
+    together, with a single call to `preview`, so fast typing never queues up
+    redraws. Enter accepts the filter; Escape, or deleting past the start of
+    the filter, cancels it.
 
     Parameters
     ----------
+    window : curses.WindowObject
+        The window in which to show the filter.
     track_list : list
-        A list of dictionaries, each of which represents a track to display.
-    pad : curses.WindowObject, optional
-        The pad to draw the list in. Defaults to None, which means a new pad
-        will be created to house the list.
-    corner_y : int, optional
-        The line on the screen at which to start the pad. Defaults to 0, which
-        is the top of the screen.
-    corner_x : int, optional
-        The column of the screen at which to start the pad. Defaults to 0, which
-        is the left of the screen.
-    lines : int, optional
-        The height of the pad in lines. Defaults to 0, which means the pad's
-        height should be determined by the number of tracks in `track_list`.
-    cols : int, optional
-        The width of the pad in columns. Defaults to 0, which means the pad will
-        be given the full width of the terminal (as given by `curses.COLS`).
+        The tracks to filter.
+    preview : function
+        Called with the `ListFilter` after every step, to show its results.
+    line : int, optional
+        The line in `window` on which to show the filter (default 0).
+    col : int, optional
+        The column in `line` at which to start the filter (default 0).
 
     Returns
     -------
-    curses.WindowObject
-        The pad that has now been displayed on the screen.
-
-    .. warning::Don't change the table formatting unless you REALLY know what
-    you're doing; it's a fickle beast.
+    list or None
+        The matching tracks, or None if the filter was cancelled.
     """
 
+    list_filter = ListFilter(track_list)
 
-    BUFFER = 2 #minimum spacing between cloumns
-
-    # add one for the title
-    if lines == 0:
-        lines = len(track_list) + 1
-
-    if cols == 0 or cols > curses.COLS:
-        cols = curses.COLS
-
-    pad = curses.newpad(lines + 1, cols) # +1 for the dummy
-
-    fmts = []
-
-    fmts.append("{i:5}: {name}")
-    fmts.append("{album}")
-    fmts.append("{artist}")
-    fmts.append("[{time}]")
-
-    line_fmt = (
-        "{1[0]:<{0[0]}.{0[0]}}" # song name
-        "{1[1]:<{0[1]}.{0[1]}}" # album
-        "{1[2]:<{0[2]}.{0[2]}}" # artist
-        "{1[3]:>{0[3]}.{0[3]}}" # duration
-    )
-
-    #f = open("out.log", "w")
-    #f.write("COLS: {0}\n".format(cols))
-
-    end_width = 7 # desired width of final column
-
-    num_strings = len(fmts)
-
-    space = [(cols - end_width) // (num_strings - 1)] * (num_strings - 1)
-    space.append(cols - 1 - sum(space))
+    window.clear()
+    window.addstr(line, col, "/")
+    window.refresh()
 
-    title_line = line_fmt.format(space, ["    Name", "Album", "Artist", "Time"])
-    pad.addstr(0, 0, title_line, curses.color_pair(COLOR_PAIRS["TITLE"]))
+    while True:
+        window.timeout(-1)
+        keys = [window.getkey()]
 
-    # add the tracks to the pad
-    for i, track in enumerate(track_list):
-        reversed = (i % 2) * curses.A_REVERSE
+        # collect the keys that are already waiting
+        window.timeout(0)
+        while True:
+            try:
+                keys.append(window.getkey())
+            except curses.error:
+                break
 
-        # place the cursor on the first line
-        if i == 0:
-            reversed = curses.color_pair(COLOR_PAIRS["CURSOR"])
+        for key in keys:
+            if key == "\n":
+                return list_filter.tracks()
 
-        strings = []
+            if key == "\x1b":
+                return None
 
-        # create formatted strings
-        for fmt in fmts:
-            strings.append(fmt.format(i=i+1, **track))
+            if key in BACKSPACE_KEYS:
+                if not list_filter.term:
+                    return None
+                list_filter.backspace()
 
-        total_length = len(''.join(strings))
+            elif len(key) == 1 and key.isprintable():
+                list_filter.type(key)
 
-        # if we're off by 1 or a couple, add space to ending string
-        while sum(space) < cols - 1:
-            #f.write("adding space...\n")
-            space[0] += 1
+        preview(list_filter)
 
-        # if we're over, subtract
-        while sum(space) > cols - 1:
-            space[-1] -= 1
+        count = "[{0} of {1}]".format(len(list_filter), len(track_list))
+        text = truncate("/" + list_filter.term, max(curses.COLS - col -
+            len(count) - 2, 1))
 
-        # truncate each field as necessary
-        for j in range(num_strings - 1):
+        window.clear()
+        window.addstr(line, col, text)
+        window.addstr(line, curses.COLS - len(count) - 1, count,
+                curses.color_pair(COLOR_PAIRS["STATUS"]))
+        window.move(line, col + len(text))
+        window.refresh()
 
-            # make it more clear that no album is given
-            if strings[j] == "None":
-                strings[j] = "-"
-            strings[j] = truncate(strings[j], space[j] - BUFFER)
-
-        #f.write("{0} : {1}\n".format(space, sum(space)))
-        #f.write("{0}\n".format(' '.join(strings)))
+def column_widths(cols):
+    """
+    Split the width of the track list between its columns.
 
-        #f.write("space: {0}\n{1}\n{2}\n".format(space //3 -3 , left_str + mid_str + right_str, 40 * '-'))
+    Parameters
+    ----------
+    cols : int
+        The width of the track list.
 
-        line_str = line_fmt.format(space, strings)
-        line_str = line_str[:cols]
+    Returns
+    -------
+    list
+        The width of each column in `ROW_FORMATS`, adding up to `cols - 1`.
+    """
 
-        pad.addstr(i + 1, 0, line_str, reversed)
+    end_width = 7 # desired width of final column
 
-    # add dummy row at the end
-    pad.addstr(len(track_list) + 1, 0, "")
+    num_strings = len(ROW_FORMATS)
 
-    #f.close()
+    space = [(cols - end_width) // (num_strings - 1)] * (num_strings - 1)
+    space.append(cols - 1 - sum(space))
 
-    return pad
+    return space
 
-@reset_cursor
-def inchstr(window, y, x):
+def format_row(track, i, space, cols):
     """
-    Read a string from curses display at y, x until EOL.
+    Format a track as a line of the track list.
 
     Parameters
     ----------
-    window : curses.WindowObject
-        The window to read from.
-    y : int
-        The row to read from in `window`.
-    x : int
-        The column to start reading from in row `y`
+    track : dict
+        The track to format.
+    i : int
+        The index of the track in the list.
+    space : list
+        The column widths, as returned by `column_widths`.
+    cols : int
+        The width of the track list.
 
     Returns
     -------
     str
-        The string read from the interface.
+        The formatted line, at most `cols` characters long.
     """
 
-    window.move(y, x)
-    result = []
-
-    in_char = ""
+    strings = []
 
-    x_off = 0
+    # create formatted strings
+    for fmt in ROW_FORMATS:
+        strings.append(fmt.format(i=i+1, **track))
 
-    # weird EOL character...
-    while in_char != "ÿ":
-        in_char = window.inch(y, x + x_off)
-        in_char = chr(in_char & 0xFF)
+    # truncate each field as necessary
+    for j in range(len(strings) - 1):
 
-        x_off += 1
+        # make it more clear that no album is given
+        if strings[j] == "None":
+            strings[j] = "-"
+        strings[j] = truncate(strings[j], space[j] - BUFFER)
 
-        result.append(in_char)
-
-    return ''.join(result[:-1])
+    line_str = LINE_FORMAT.format(space, strings)
+    return line_str[:cols]
 
 def truncate(text, max_len, fill="..."):
     """
@@ -549,5 +1424,12 @@ def truncate(text, max_len, fill="..."):
         raise AssertionError("{text} {max_len}".format(**locals()))
     return text
 
+def run(stdscr):
+    """
+    Run `main` on a new event loop; pass this to `curses.wrapper`.
+    """
+
+    asyncio.run(main(stdscr))
+
 if __name__ == '__main__':
-    curses.wrapper(main)
+    curses.wrapper(run)